@@ -1,14 +1,54 @@
 from diefpy.dief import dieft
 from diefpy.dief import diefk
 from diefpy.dief import diefk2
+from diefpy.dief import dieft_by
+from diefpy.dief import diefk_by
+from diefpy.dief import workload_trace
+from diefpy.dief import workload_dief
+from diefpy.dief import compress_trace
+from diefpy.dief import sketch_trace
+from diefpy.dief import dieft_approx
+from diefpy.dief import diefk_approx
+from diefpy.dief import diefk2_approx
+from diefpy.dief import dominance_intervals
+from diefpy.dief import crossover_times
+from diefpy.dief import dominance_matrix
+from diefpy.dief import time_to_k
+from diefpy.dief import answer_gaps
+from diefpy.dief import stall_intervals
+from diefpy.dief import answer_rate_profile
 from diefpy.dief import plot_answer_trace
 from diefpy.dief import plot_all_answer_traces
 from diefpy.dief import plot_execution_time
+from diefpy.dief import plot_answer_rate_profile
 from diefpy.dief import performance_of_approaches_with_dieft
 from diefpy.dief import continuous_efficiency_with_diefk
 from diefpy.dief import plot_all_performance_of_approaches_with_dieft
 from diefpy.dief import plot_performance_of_approaches_with_dieft
 from diefpy.dief import plot_all_continuous_efficiency_with_diefk
 from diefpy.dief import plot_continuous_efficiency_with_diefk
+from diefpy.dief import leaderboard
 from diefpy.dief import load_trace
+from diefpy.dief import load_trace_jsonl
 from diefpy.dief import load_metrics
+from diefpy.dief import pivot_metrics
+from diefpy.dief import save_trace
+from diefpy.dief import save_metrics
+from diefpy.profiling import Profiler
+from diefpy.live import LiveMetrics
+from diefpy.live import LiveMetricsServer
+from diefpy.live import TraceTail
+from diefpy.recorder import TraceRecorder
+from diefpy.store import ResultStore
+from diefpy.aggregate import TraceAggregate
+from diefpy.experiment import Experiment
+from diefpy.report import build_report
+from diefpy.service import DiefService
+from diefpy.regression import compare_datasets
+from diefpy.regression import find_regressions
+from diefpy.regression import format_regressions
+from diefpy.svg import svg_answer_trace
+from diefpy.svg import svg_execution_time
+from diefpy.svg import svg_performance_of_approaches_with_dieft
+from diefpy.svg import svg_continuous_efficiency_with_diefk
+from diefpy.svg import html_page
@@ -0,0 +1,5 @@
+import sys
+
+from diefpy.cli import main
+
+sys.exit(main())
@@ -0,0 +1,272 @@
+"""
+Mergeable partial aggregates of answer traces for distributed evaluation.
+
+A :class:`TraceAggregate` summarizes chunks of answer traces, e.g., the rows of some tests or the answers produced
+within a time range, by the area under the curve, the number of answers, and the first and last answer of each test
+and approach. Aggregates of different chunks can be computed independently, e.g., in several processes or on
+several machines, and merged in any grouping; the merged aggregate yields the exact **dief@t**, **dief@k**, and
+conventional metrics of the complete answer traces.
+
+**dief@t** can be obtained for the maximum execution time of a test and for the points in time given when building
+the aggregates; **dief@k** for the numbers of answers given when building the aggregates.
+"""
+import numpy as np
+
+from diefpy.backends import get_backend
+from diefpy.dief import _key_records, _unique_keys
+
+_SCALARS = ('count', 'auc', 'first_time', 'first_answer', 'last_time', 'last_answer')
+_PER_TIME = ('t_count', 't_auc', 't_last_time', 't_last_answer')
+_PER_ANSWER = ('k_auc',)
+
+
+def _pad(values: np.ndarray) -> np.ndarray:
+    """Appends a row of zeros, which is selected by the index -1."""
+    return np.concatenate([values, np.zeros((1,) + values.shape[1:])])
+
+
+def _column(mask: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Reshapes a mask over the keys such that it broadcasts against the values."""
+    return mask.reshape((-1,) + (1,) * (values.ndim - 1))
+
+
+class TraceAggregate:
+    """
+    Partial aggregate of answer traces that can be merged with the aggregates of other chunks.
+
+    The rows of each test and approach within a chunk are expected in the order they were produced, as in the answer
+    trace files. Chunks of the same test and approach must not overlap in time. Merging is associative, i.e., the
+    chunks can be merged in any grouping as long as only chunks adjacent in time are merged, e.g., the aggregates of
+    consecutive time ranges or of consecutive parts of a trace file. Chunks of different tests and approaches can be
+    merged in any order.
+
+    :param times: Points in time to compute dief@t for in addition to the maximum execution time.
+    :param answers: Numbers of answers to compute dief@k for.
+
+    **Examples**
+
+    >>> chunks = [traces[:5000], traces[5000:10000], traces[10000:]]
+    >>> parts = [TraceAggregate.from_trace(chunk, times=[7.5], answers=[100]) for chunk in chunks]
+    >>> aggregate = TraceAggregate.merge_all(parts)
+    >>> aggregate.dieft("Q9.sparql", 7.5)
+    >>> aggregate.diefk("Q9.sparql", 100)
+    """
+
+    def __init__(self, times=(), answers=()):
+        self.times = np.asarray(times, dtype=float).ravel()
+        self.answers = np.asarray(answers, dtype=float).ravel()
+        self.keys = []
+        self._data = self._empty(0)
+
+    def _empty(self, n: int) -> dict:
+        data = {name: np.zeros(n) for name in _SCALARS}
+        data.update({name: np.zeros((n, len(self.times))) for name in _PER_TIME})
+        data.update({name: np.zeros((n, len(self.answers))) for name in _PER_ANSWER})
+        return data
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __add__(self, other):
+        return self.merge(other)
+
+    @classmethod
+    def from_trace(cls, inputtrace: np.ndarray, times=(), answers=()):
+        """
+        Aggregates a chunk of answer traces.
+
+        :param inputtrace: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
+        :param times: Points in time to compute dief@t for in addition to the maximum execution time.
+        :param answers: Numbers of answers to compute dief@k for.
+        :return: The aggregate of the chunk.
+        """
+        aggregate = cls(times, answers)
+        if len(inputtrace) == 0:
+            return aggregate
+        first, codes = _unique_keys([inputtrace['test'], inputtrace['approach']])
+        keys = _key_records(inputtrace, ('test', 'approach'), first)
+        backend = get_backend()
+        order, starts = backend.group(codes, len(keys))
+        time = inputtrace['time'][order]
+        answer = inputtrace['answer'][order]
+        first, last = starts[:-1], starts[1:] - 1
+
+        data = aggregate._data = {
+            'count': np.diff(starts).astype(float),
+            'auc': backend.segment_auc(time, answer, starts),
+            'first_time': time[first].astype(float),
+            'first_answer': answer[first].astype(float),
+            'last_time': time[last].astype(float),
+            'last_answer': answer[last].astype(float)
+        }
+        prefix = backend.prefix_auc(time, answer, starts)
+
+        # Number of answers and AUC up to each point in time.
+        segments = np.repeat(np.arange(len(keys)), len(aggregate.times))
+        position = backend.segment_searchsorted(time, starts, segments, np.tile(aggregate.times, len(keys)), 'right')
+        position = position.reshape(len(keys), len(aggregate.times))
+        data['t_count'] = (position - first[:, None]).astype(float)
+        found = data['t_count'] > 0
+        idx = np.maximum(position - 1, 0)
+        data['t_auc'] = np.where(found, prefix[idx], 0.0)
+        data['t_last_time'] = np.where(found, time[idx], 0.0)
+        data['t_last_answer'] = np.where(found, answer[idx], 0.0)
+
+        # AUC of the answers up to each number of answers.
+        segments = np.repeat(np.arange(len(keys)), len(aggregate.answers))
+        position = backend.segment_searchsorted(answer, starts, segments, np.tile(aggregate.answers, len(keys)), 'right')
+        position = position.reshape(len(keys), len(aggregate.answers))
+        data['k_auc'] = np.where(position > first[:, None], prefix[np.maximum(position - 1, 0)], 0.0)
+
+        aggregate.keys = [tuple(k) for k in keys.tolist()]
+        return aggregate
+
+    def merge(self, other):
+        """
+        Merges two aggregates; the operation is associative.
+
+        For the tests and approaches in both aggregates, the chunk starting later in time is appended to the other;
+        the chunks are expected to be adjacent, i.e., no other chunk of the same test and approach lies in between.
+
+        :param other: Aggregate of another chunk built for the same points in time and numbers of answers.
+        :return: The merged aggregate.
+        """
+        if not (np.array_equal(self.times, other.times) and np.array_equal(self.answers, other.answers)):
+            raise ValueError('aggregates with different points in time or numbers of answers cannot be merged')
+        keys = sorted(set(self.keys) | set(other.keys))
+        index_a = dict(zip(self.keys, range(len(self.keys))))
+        index_b = dict(zip(other.keys, range(len(other.keys))))
+        ia = np.array([index_a.get(k, -1) for k in keys], dtype=np.intp)
+        ib = np.array([index_b.get(k, -1) for k in keys], dtype=np.intp)
+        in_a, in_b = ia >= 0, ib >= 0
+
+        # Align both aggregates; for keys in both, a holds the earlier and b the later chunk.
+        a = {name: _pad(values)[ia] for name, values in self._data.items()}
+        b = {name: _pad(values)[ib] for name, values in other._data.items()}
+        swap = in_a & in_b & (b['first_time'] < a['first_time'])
+        for name in a:
+            mask = _column(swap, a[name])
+            a[name], b[name] = np.where(mask, b[name], a[name]), np.where(mask, a[name], b[name])
+        both = in_a & in_b
+        if (both & (a['last_time'] > b['first_time'])).any():
+            raise ValueError('chunks of the same test and approach overlap in time')
+
+        # Trapezoid between the last answer of the earlier and the first answer of the later chunk.
+        bridge = (b['first_time'] - a['last_time']) * (a['last_answer'] + b['first_answer']) / 2.0
+        merged = self._empty(len(keys))
+        merged['count'] = a['count'] + b['count']
+        merged['auc'] = a['auc'] + b['auc'] + bridge
+        merged['first_time'], merged['first_answer'] = a['first_time'], a['first_answer']
+        merged['last_time'], merged['last_answer'] = b['last_time'], b['last_answer']
+        later = b['t_count'] > 0
+        merged['t_count'] = a['t_count'] + b['t_count']
+        merged['t_auc'] = a['t_auc'] + b['t_auc'] + np.where(later, bridge[:, None], 0.0)
+        merged['t_last_time'] = np.where(later, b['t_last_time'], a['t_last_time'])
+        merged['t_last_answer'] = np.where(later, b['t_last_answer'], a['t_last_answer'])
+        merged['k_auc'] = (a['k_auc'] + b['k_auc'] +
+                           np.where(b['first_answer'][:, None] <= self.answers, bridge[:, None], 0.0))
+
+        # Keys of only one aggregate are taken as they are.
+        for name in merged:
+            merged[name] = np.where(_column(both, merged[name]), merged[name],
+                                    np.where(_column(in_a, a[name]), a[name], b[name]))
+
+        result = TraceAggregate(self.times, self.answers)
+        result.keys = keys
+        result._data = merged
+        return result
+
+    @staticmethod
+    def merge_all(aggregates):
+        """
+        Merges a sequence of aggregates pairwise as a balanced tree.
+
+        :param aggregates: Aggregates of the chunks in the order of the chunks; at least one is required.
+        :return: The merged aggregate.
+        """
+        aggregates = list(aggregates)
+        while len(aggregates) > 1:
+            aggregates = [aggregates[i].merge(aggregates[i + 1]) if i + 1 < len(aggregates) else aggregates[i]
+                          for i in range(0, len(aggregates), 2)]
+        return aggregates[0]
+
+    def tests(self) -> list:
+        """Returns the names of the tests."""
+        return sorted({test for test, _ in self.keys})
+
+    def _select(self, test: str):
+        rows = np.array([i for i, (t, _) in enumerate(self.keys) if t == test], dtype=np.intp)
+        approaches = [self.keys[i][1] for i in rows]
+        return rows, approaches
+
+    @staticmethod
+    def _result(test: str, approaches: list, name: str, values: np.ndarray) -> np.ndarray:
+        df = np.empty(len(approaches), dtype=[('test', 'U%d' % max(len(test), 1)),
+                                              ('approach', 'U%d' % max([len(a) for a in approaches] + [1])),
+                                              (name, float)])
+        df['test'] = test
+        df['approach'] = approaches
+        df[name] = values
+        return df
+
+    def dieft(self, test: str, t: float = -1.0, continue_to_end: bool = True) -> np.ndarray:
+        """
+        Computes the **dief@t** metric for a specific test like :func:`diefpy.dief.dieft`.
+
+        :param test: Specifies the specific test to analyze.
+        :param t: Point in time to compute dief@t for; one of the points in time of the aggregate.
+                  By default, the function computes the maximum of the execution time among the approaches.
+        :param continue_to_end: Indicates whether the AUC should be continued until the end of the time frame
+        :return: Dataframe with the dief@t values for each approach. Attributes of the dataframe: test, approach, dieft.
+        """
+        rows, approaches = self._select(test)
+        d = self._data
+        if t == -1:
+            t = d['last_time'][rows].max() if len(rows) else 0.0
+            n, auc, last_time, last_answer = d['count'][rows], d['auc'][rows], d['last_time'][rows], d['last_answer'][rows]
+        else:
+            i = np.flatnonzero(self.times == t)
+            if len(i) == 0:
+                raise ValueError('dief@t for t=%s requires the point in time when building the aggregates' % t)
+            i = i[0]
+            n, auc = d['t_count'][rows, i], d['t_auc'][rows, i]
+            last_time, last_answer = d['t_last_time'][rows, i], d['t_last_answer'][rows, i]
+        dief = auc.copy()
+        if continue_to_end:
+            # A single answer 0 indicates that the approach did not produce any answer.
+            extend = (n > 0) & ~((n == 1) & (last_answer == 0))
+            dief[extend] += (t - last_time[extend]) * (last_answer[extend] + n[extend]) / 2.0
+        return self._result(test, approaches, 'dieft', dief)
+
+    def diefk(self, test: str, k: int = -1) -> np.ndarray:
+        """
+        Computes the **dief@k** metric for a specific test like :func:`diefpy.dief.diefk`.
+
+        :param test: Specifies the specific test to analyze.
+        :param k: Number of answers to compute dief@k for; one of the numbers of answers of the aggregate.
+                  By default, the minimum of the total number of answers produced by the approaches, which also has
+                  to be one of the numbers of answers of the aggregate.
+        :return: Dataframe with the dief@k values for each approach. Attributes of the dataframe: test, approach, diefk.
+        """
+        rows, approaches = self._select(test)
+        if k == -1:
+            k = self._data['count'][rows].min() if len(rows) else 0
+        i = np.flatnonzero(self.answers == k)
+        if len(i) == 0:
+            raise ValueError('dief@k for k=%s requires the number of answers when building the aggregates' % k)
+        return self._result(test, approaches, 'diefk', self._data['k_auc'][rows, i[0]])
+
+    def metrics(self) -> np.ndarray:
+        """
+        Returns the conventional metrics of all tests and approaches.
+
+        :return: Dataframe with the metrics. Attributes of the dataframe: test, approach, tfft, totaltime, comp.
+        """
+        d = self._data
+        return np.array([(test, approach, d['first_time'][i], d['last_time'][i], int(d['last_answer'][i]))
+                         for i, (test, approach) in enumerate(self.keys)],
+                        dtype=[('test', 'U%d' % max([len(k[0]) for k in self.keys] + [1])),
+                               ('approach', 'U%d' % max([len(k[1]) for k in self.keys] + [1])),
+                               ('tfft', float),
+                               ('totaltime', float),
+                               ('comp', int)])
@@ -0,0 +1,266 @@
+"""
+Compute backends for the core kernels of diefpy.
+
+The computation of **dief@t** and **dief@k** boils down to a few kernels operating on answer traces
+that are grouped into contiguous segments, e.g., one segment per approach:
+
+* *group*: stable grouping of rows by integer group codes,
+* *segment_auc*: area under the curve (trapezoidal rule) per segment,
+* *prefix_auc*: running area under the curve within each segment,
+* *segment_searchsorted*: binary search within sorted segments.
+
+The :class:`NumpyBackend` implements the kernels with vectorized numpy operations and is used by default.
+If `Numba <https://numba.pydata.org>`_ is installed, the :class:`NumbaBackend` can be selected instead.
+It compiles the kernels to loops, which avoids the overhead of numpy calls for many short segments. The compiled
+kernels are cached on disk, but the first call in a process still has to load them, which only pays off for large
+answer traces. The backend can be chosen with :func:`set_backend` or the environment variable ``DIEFPY_BACKEND``.
+
+If the answer traces use integer times, e.g., nanoseconds from ``time.perf_counter_ns``, *segment_auc* accumulates
+twice the area exactly in the integer domain whenever no overflow can occur, and falls back to floats otherwise.
+"""
+import os
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def _exact_integer(x: np.ndarray, y: np.ndarray) -> bool:
+    """Checks whether the AUC of integer values can be accumulated in int64 without overflow."""
+    if x.dtype.kind not in 'iu' or y.dtype.kind not in 'iu' or len(x) < 2:
+        return False
+    # Each segment sums dx * (y0 + y1); bound the total over all segments.
+    bound = float(np.abs(np.diff(x.astype(np.int64))).sum()) * 2.0 * float(np.abs(y).max())
+    return bound < 2.0 ** 62
+
+
+class NumpyBackend:
+    """Implementation of the kernels using vectorized numpy operations."""
+    name = 'numpy'
+
+    def group(self, codes: np.ndarray, ngroups: int):
+        """
+        Groups rows by their integer group code while preserving the order of the rows within a group.
+
+        :param codes: Group code in [0, ngroups) for each row.
+        :param ngroups: Number of groups.
+        :return: Tuple (order, starts) such that rows ``order[starts[g]:starts[g+1]]`` belong to group *g*.
+        """
+        codes = np.asarray(codes, dtype=np.intp)
+        order = np.argsort(codes, kind='stable')
+        starts = np.zeros(ngroups + 1, dtype=np.intp)
+        np.cumsum(np.bincount(codes, minlength=ngroups), out=starts[1:])
+        return order, starts
+
+    @staticmethod
+    def _trapezoids(x: np.ndarray, y: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        # Area of the trapezoids between consecutive points; those spanning two segments are zero.
+        area = np.diff(x) * ((y[1:] + y[:-1]) / 2.0)
+        boundaries = starts[1:-1] - 1
+        area[boundaries[(boundaries >= 0) & (boundaries < len(area))]] = 0
+        return area
+
+    def segment_auc(self, x: np.ndarray, y: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        """
+        Computes the area under the curve of each segment using the trapezoidal rule.
+
+        :param x: Values on the x-axis, e.g., the time.
+        :param y: Values on the y-axis, e.g., the answer.
+        :param starts: Offsets of the segments; segment *g* spans ``starts[g]:starts[g+1]``.
+        :return: AUC per segment; segments with less than two points have an AUC of zero.
+        """
+        auc = np.zeros(len(starts) - 1, dtype=float)
+        if len(x) < 2:
+            return auc
+        valid = np.diff(starts) > 1
+        if not valid.any():
+            return auc
+        if _exact_integer(x, y):
+            x = x.astype(np.int64)
+            y = y.astype(np.int64)
+            area2 = np.diff(x) * (y[1:] + y[:-1])
+            boundaries = starts[1:-1] - 1
+            area2[boundaries[(boundaries >= 0) & (boundaries < len(area2))]] = 0
+            auc[valid] = np.add.reduceat(area2, starts[:-1][valid]) / 2.0
+        else:
+            auc[valid] = np.add.reduceat(self._trapezoids(x, y, starts), starts[:-1][valid])
+        return auc
+
+    def prefix_auc(self, x: np.ndarray, y: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        """
+        Computes the running area under the curve within each segment.
+
+        :param x: Values on the x-axis, e.g., the time.
+        :param y: Values on the y-axis, e.g., the answer.
+        :param starts: Offsets of the segments; segment *g* spans ``starts[g]:starts[g+1]``.
+        :return: For each point, the AUC from the first point of its segment up to the point.
+        """
+        prefix = np.zeros(len(x), dtype=float)
+        if len(x) < 2:
+            return prefix
+        np.cumsum(self._trapezoids(x, y, starts), out=prefix[1:])
+        lengths = np.diff(starts)
+        prefix -= np.repeat(prefix[starts[:-1][lengths > 0]], lengths[lengths > 0])
+        return prefix
+
+    def segment_searchsorted(self, a: np.ndarray, starts: np.ndarray, segments: np.ndarray, v: np.ndarray,
+                             side: str = 'left') -> np.ndarray:
+        """
+        Finds the indices where the values *v* would be inserted into their sorted segment of *a*.
+
+        :param a: Values sorted in ascending order within each segment.
+        :param starts: Offsets of the segments; segment *g* spans ``starts[g]:starts[g+1]``.
+        :param segments: Segment to search in for each value.
+        :param v: Values to search for.
+        :param side: 'left' or 'right' as in ``numpy.searchsorted``.
+        :return: Absolute insertion indices into *a*.
+        """
+        segments = np.asarray(segments, dtype=np.intp)
+        v = np.asarray(v)
+        lo = starts[segments].copy()
+        hi = starts[segments + 1].copy()
+        # Vectorized binary search over all queries at once.
+        while True:
+            active = lo < hi
+            if not active.any():
+                return lo
+            mid = (lo + hi) // 2
+            probe = a[np.minimum(mid, len(a) - 1)]
+            go_right = active & ((probe <= v) if side == 'right' else (probe < v))
+            lo = np.where(go_right, mid + 1, lo)
+            hi = np.where(active & ~go_right, mid, hi)
+
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _nb_group(codes, ngroups):
+        starts = np.zeros(ngroups + 1, dtype=np.intp)
+        for c in codes:
+            starts[c + 1] += 1
+        for g in range(ngroups):
+            starts[g + 1] += starts[g]
+        position = starts[:-1].copy()
+        order = np.empty(len(codes), dtype=np.intp)
+        for i in range(len(codes)):
+            c = codes[i]
+            order[position[c]] = i
+            position[c] += 1
+        return order, starts
+
+    @numba.njit(cache=True)
+    def _nb_segment_auc(x, y, starts):
+        auc = np.zeros(len(starts) - 1, dtype=np.float64)
+        for g in range(len(starts) - 1):
+            total = 0.0
+            for i in range(starts[g] + 1, starts[g + 1]):
+                total += (x[i] - x[i - 1]) * ((y[i] + y[i - 1]) / 2.0)
+            auc[g] = total
+        return auc
+
+    @numba.njit(cache=True)
+    def _nb_segment_auc_int(x, y, starts):
+        auc = np.zeros(len(starts) - 1, dtype=np.float64)
+        for g in range(len(starts) - 1):
+            total = np.int64(0)
+            for i in range(starts[g] + 1, starts[g + 1]):
+                total += (x[i] - x[i - 1]) * (y[i] + y[i - 1])
+            auc[g] = total / 2.0
+        return auc
+
+    @numba.njit(cache=True)
+    def _nb_prefix_auc(x, y, starts):
+        prefix = np.zeros(len(x), dtype=np.float64)
+        for g in range(len(starts) - 1):
+            total = 0.0
+            for i in range(starts[g] + 1, starts[g + 1]):
+                total += (x[i] - x[i - 1]) * ((y[i] + y[i - 1]) / 2.0)
+                prefix[i] = total
+        return prefix
+
+    @numba.njit(cache=True)
+    def _nb_segment_searchsorted(a, starts, segments, v, right):
+        result = np.empty(len(v), dtype=np.intp)
+        for j in range(len(v)):
+            lo = starts[segments[j]]
+            hi = starts[segments[j] + 1]
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if a[mid] < v[j] or (right and a[mid] == v[j]):
+                    lo = mid + 1
+                else:
+                    hi = mid
+            result[j] = lo
+        return result
+
+
+class NumbaBackend(NumpyBackend):
+    """Implementation of the kernels as loops compiled with Numba; requires Numba to be installed."""
+    name = 'numba'
+
+    def __init__(self):
+        if numba is None:
+            raise ImportError('The numba backend requires Numba to be installed.')
+
+    def group(self, codes: np.ndarray, ngroups: int):
+        return _nb_group(np.asarray(codes, dtype=np.intp), ngroups)
+
+    def segment_auc(self, x: np.ndarray, y: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        if _exact_integer(x, y):
+            return _nb_segment_auc_int(np.ascontiguousarray(x, dtype=np.int64), np.ascontiguousarray(y, dtype=np.int64),
+                                       starts)
+        return _nb_segment_auc(np.ascontiguousarray(x), np.ascontiguousarray(y), starts)
+
+    def prefix_auc(self, x: np.ndarray, y: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        return _nb_prefix_auc(np.ascontiguousarray(x), np.ascontiguousarray(y), starts)
+
+    def segment_searchsorted(self, a: np.ndarray, starts: np.ndarray, segments: np.ndarray, v: np.ndarray,
+                             side: str = 'left') -> np.ndarray:
+        segments = np.asarray(segments, dtype=np.intp)
+        v = np.asarray(v)
+        # Compare in the common type of both arrays, e.g., fractional values in integer answers.
+        dtype = np.result_type(a.dtype, v.dtype)
+        v = np.broadcast_to(v.astype(dtype, copy=False), segments.shape)
+        return _nb_segment_searchsorted(np.ascontiguousarray(a, dtype=dtype), starts, segments,
+                                        np.ascontiguousarray(v), side == 'right')
+
+
+BACKENDS = {'numpy': NumpyBackend, 'numba': NumbaBackend}
+"""Available compute backends by name."""
+
+
+def available_backends() -> list:
+    """Returns the names of the backends that can be used in the current environment."""
+    return ['numpy'] + (['numba'] if numba is not None else [])
+
+
+def set_backend(name: str = None):
+    """
+    Selects the compute backend used by diefpy.
+
+    :param name: Name of the backend, i.e., 'numpy' or 'numba'. By default, the backend given by the environment
+                 variable ``DIEFPY_BACKEND`` is used, otherwise numpy.
+    :return: The selected backend.
+
+    **Examples**
+
+    >>> set_backend('numba')
+    """
+    global _backend
+    if name is None:
+        name = os.environ.get('DIEFPY_BACKEND') or 'numpy'
+    if name not in BACKENDS:
+        raise ValueError("unknown backend '%s'; choose from %s" % (name, ', '.join(BACKENDS)))
+    _backend = BACKENDS[name]()
+    return _backend
+
+
+def get_backend():
+    """Returns the compute backend currently used by diefpy."""
+    return _backend
+
+
+_backend = None
+set_backend()
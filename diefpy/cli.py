@@ -0,0 +1,63 @@
+"""
+Command line interface of diefpy.
+
+The interface is invoked with ``python -m diefpy``. The command *compare* checks a candidate for performance
+regressions against a baseline and exits with the status 1 if a regression is found::
+
+    python -m diefpy compare release/traces.csv build/traces.csv \\
+        --baseline-metrics release/metrics.csv --candidate-metrics build/metrics.csv --threshold dieft=0.05
+"""
+import argparse
+import sys
+
+from diefpy.dief import load_metrics, load_trace
+from diefpy.regression import REGRESSION_METRICS, compare_datasets, find_regressions, format_regressions
+
+
+def _threshold(value: str):
+    metric, _, limit = value.partition('=')
+    if metric not in dict(REGRESSION_METRICS) or not limit:
+        raise argparse.ArgumentTypeError("expected <metric>=<threshold> with a metric of %s, got '%s'"
+                                         % (', '.join(m for m, _ in REGRESSION_METRICS), value))
+    return metric, None if limit.lower() == 'none' else float(limit)
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m diefpy', description='Diefficiency metrics dief@t and dief@k.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    compare = commands.add_parser('compare', help='check a candidate for performance regressions against a baseline',
+                                  description='Compares dief@t, dief@k, and the other metrics of a candidate with a '
+                                              'baseline and exits with the status 1 if a metric regressed.')
+    compare.add_argument('baseline', help='answer traces of the baseline')
+    compare.add_argument('candidate', help='answer traces of the candidate')
+    compare.add_argument('--baseline-metrics', help='other metrics of the baseline')
+    compare.add_argument('--candidate-metrics', help='other metrics of the candidate')
+    compare.add_argument('--threshold', type=_threshold, action='append', default=[], metavar='METRIC=VALUE',
+                         help='tolerated relative change of a metric, e.g., dieft=0.05; "none" disables the check')
+    compare.add_argument('--no-continue-to-end', dest='continue_to_end', action='store_false',
+                         help='do not continue the AUC of dief@t until the end of the time frame')
+    return parser
+
+
+def main(argv: list = None) -> int:
+    """
+    Runs the command line interface.
+
+    :param argv: Command line arguments; by default, the arguments of the process.
+    :return: Exit status, i.e., 0 on success and 1 if a regression was found.
+    """
+    args = _parser().parse_args(argv)
+    if args.command == 'compare':
+        if (args.baseline_metrics is None) != (args.candidate_metrics is None):
+            print('error: the metrics of the baseline and the candidate have to be given together', file=sys.stderr)
+            return 2
+        comparison = compare_datasets(
+            load_trace(args.baseline), load_trace(args.candidate),
+            None if args.baseline_metrics is None else load_metrics(args.baseline_metrics),
+            None if args.candidate_metrics is None else load_metrics(args.candidate_metrics),
+            args.continue_to_end)
+        regressions = find_regressions(comparison, dict(args.threshold))
+        print(format_regressions(regressions))
+        return 1 if len(regressions) else 0
+    return 2
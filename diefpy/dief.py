@@ -6,21 +6,316 @@ an elapsed time period *t* or while *k* answers are produced, respectively.
 **dief@t** and **dief@k** rely on the computation of the area under the curve (AUC) of
 answer traces, and thus capturing the answer rate concentration over a time interval.
 """
+import bz2
+import contextlib
+import gzip
+import json
+import logging
+import lzma
+import os
 import re
 
-import matplotlib.lines as mlines
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mticker
+from typing import TYPE_CHECKING
+
 import numpy as np
-from matplotlib.figure import Figure
+import numpy.lib.recfunctions as rfn
+
+from diefpy.backends import get_backend
+from diefpy.profiling import stage
 
-from diefpy.radaraxes import radar_factory
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+logger = logging.getLogger('diefpy')
 
 DEFAULT_COLORS = ("#ECC30B", "#D56062", "#84BCDA")
 """Default colors for printing plots: yellow, red, blue"""
 
+KEYS = ('test', 'approach')
+"""Default attributes identifying an answer trace; the last key identifies the compared approaches."""
+
+_COMPRESSION_MAGIC = {b'\x1f\x8b': gzip, b'BZh': bz2, b'\xfd7zXZ\x00': lzma}
+_COMPRESSION_EXTENSIONS = {'.gz': gzip, '.bz2': bz2, '.xz': lzma, '.lzma': lzma}
+
+
+def _group_approaches(results: np.ndarray, approaches: np.ndarray):
+    """
+    Groups the rows of an answer trace by approach while preserving their order.
+
+    :param results: Dataframe with the answer trace of a single test.
+    :param approaches: Sorted names of the approaches to group by.
+    :return: Tuple (order, starts) such that rows ``results[order[starts[i]:starts[i+1]]]`` belong to ``approaches[i]``.
+    """
+    codes = np.searchsorted(approaches, results['approach'])
+    return get_backend().group(codes, len(approaches))
+
+
+def _answer_counts(results: np.ndarray, approaches: np.ndarray) -> np.ndarray:
+    """Returns the number of answers of each approach in an answer trace, which may be run-length compressed."""
+    codes = np.searchsorted(approaches, results['approach'])
+    weights = results['count'] if 'count' in results.dtype.names else None
+    return np.bincount(codes, weights=weights, minlength=len(approaches)).astype(int)
+
+
+def _segment_sum(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Sums the values within each segment ``starts[g]:starts[g+1]``."""
+    cumsum = np.zeros(len(values) + 1, dtype=values.dtype)
+    np.cumsum(values, out=cumsum[1:])
+    return cumsum[starts[1:]] - cumsum[starts[:-1]]
+
+
+def _expand_runs(answer: np.ndarray, time: np.ndarray, count: np.ndarray, starts: np.ndarray):
+    """
+    Expands runs of answers produced at the same time into the first and the last point of each run.
+
+    The points within a run share the same time, hence, the AUC of the expanded trace equals the AUC of
+    the uncompressed trace.
+
+    :return: Tuple (answer, time, starts) of the expanded segments.
+    """
+    expanded = np.empty(2 * len(answer), dtype=answer.dtype)
+    expanded[0::2] = answer - count + 1
+    expanded[1::2] = answer
+    return expanded, np.repeat(time, 2), 2 * starts
+
+
+def _encode(column: np.ndarray):
+    """
+    Numbers the distinct values of a column in sorted order.
+
+    Only the first value of each run of equal values is sorted, i.e., columns of contiguous groups, such as the tests
+    of an answer trace, are encoded in linear time.
+
+    :return: Tuple (first, codes) with the first row of each distinct value and the number of the value of each row.
+    """
+    if len(column) == 0:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    heads = np.flatnonzero(np.r_[True, column[1:] != column[:-1]])
+    _, first, codes = np.unique(column[heads], return_index=True, return_inverse=True)
+    return heads[first], np.repeat(codes.ravel(), np.diff(np.r_[heads, len(column)]))
+
+
+def _unique_keys(columns: list):
+    """
+    Numbers the distinct combinations of the values of key columns in lexicographically sorted order.
+
+    Like ``np.unique`` of the structured records of the keys, but each column is encoded on its own and the codes are
+    combined into a single integer; no records are compared.
+
+    :param columns: Columns of the keys with the same length.
+    :return: Tuple (first, codes) with the first row of each distinct combination and the number of the combination of
+             each row.
+    """
+    codes, size = np.zeros(len(columns[0]), dtype=np.int64), 1
+    for column in columns:
+        first, column_codes = _encode(column)
+        if size * len(first) >= 2 ** 62:
+            # Renumber the combinations seen so far before the combined code might overflow.
+            first_combined, codes = _encode(codes)
+            size = len(first_combined)
+        codes = codes * len(first) + column_codes
+        size *= len(first)
+    return _encode(codes)
+
+
+def _key_records(inputtrace: np.ndarray, keys: tuple, rows: np.ndarray) -> np.ndarray:
+    """Returns the values of the key attributes of the given rows as dataframe."""
+    df = np.empty(len(rows), dtype=[(key, inputtrace[key].dtype) for key in keys])
+    for key in keys:
+        df[key] = inputtrace[key][rows]
+    return df
+
+
+def _group_traces(inputtrace: np.ndarray, keys: tuple = KEYS):
+    """
+    Groups the rows of answer traces by the key attributes while preserving their order.
+
+    The groups are obtained with a single sort of the integer codes of the key attributes (see ``_unique_keys``);
+    no keys are concatenated into strings.
 
-def dieft(inputtrace: np.ndarray, inputtest: str, t: float = -1.0, continue_to_end: bool = True) -> np.ndarray:
+    :param keys: Attributes identifying a group, e.g., test and approach.
+    :return: Tuple (groups, order, starts) with the sorted unique values of the keys such that rows
+             ``inputtrace[order[starts[i]:starts[i+1]]]`` belong to ``groups[i]``.
+    """
+    first, codes = _unique_keys([inputtrace[key] for key in keys])
+    order, starts = get_backend().group(codes, len(first))
+    return _key_records(inputtrace, keys, first), order, starts
+
+
+def _grouped(inputtrace: np.ndarray, keys: tuple):
+    """
+    Groups answer traces by the key attributes and numbers the groups compared with each other.
+
+    Groups are compared with each other if they share all keys but the last one, e.g., the approaches of a test.
+    As the groups are sorted, the compared groups are contiguous.
+
+    :return: Tuple (groups, compared, answer, time, count, starts) with the groups, the number of the compared groups
+             of each group, and the grouped answers, times, and run lengths (``None`` if the trace is not compressed).
+    """
+    groups, order, starts = _group_traces(inputtrace, keys)
+    if len(keys) > 1:
+        compared = _unique_keys([groups[key] for key in keys[:-1]])[1]
+    else:
+        compared = np.zeros(len(groups), dtype=np.intp)
+    count = inputtrace['count'][order] if 'count' in inputtrace.dtype.names else None
+    return groups, compared, inputtrace['answer'][order], inputtrace['time'][order], count, starts
+
+
+def _reduce_compared(ufunc, values: np.ndarray, compared: np.ndarray) -> np.ndarray:
+    """Reduces the values of the compared groups with *ufunc* and returns the result for each group."""
+    if len(values) == 0:
+        return values
+    return ufunc.reduceat(values, np.flatnonzero(np.r_[True, compared[1:] != compared[:-1]]))[compared]
+
+
+def _keyed_result(inputtrace: np.ndarray, keys: tuple, groups: np.ndarray, fields: list, repeat: int = 1) -> np.ndarray:
+    """Creates a dataframe with the key attributes of each group (repeated *repeat* times) and the given fields."""
+    df = np.empty(len(groups) * repeat, dtype=[(key, inputtrace[key].dtype) for key in keys] + fields)
+    for key in keys:
+        df[key] = np.repeat(groups[key], repeat)
+    return df
+
+
+def _join(left: np.ndarray, right: np.ndarray, keys: tuple):
+    """
+    Finds the rows of *right* with the same values of the keys as the rows of *left*.
+
+    :return: Tuple (idx, found) such that ``right[idx]`` are the rows matching ``left[found]``.
+    """
+    combined = _unique_keys([np.concatenate([left[key], right[key]]) for key in keys])[1]
+    order = np.argsort(combined[len(left):], kind='stable')
+    idx, found = _lookup(combined[len(left):][order], combined[:len(left)])
+    return order[idx[found]], found
+
+
+def _dieft_groups(answer: np.ndarray, time: np.ndarray, count: np.ndarray, starts: np.ndarray, t: np.ndarray,
+                  continue_to_end: bool, last_answer: bool = False) -> np.ndarray:
+    """
+    Computes dief@t of grouped answer traces until the time *t* of each group.
+
+    Like ``dieft``, the answer traces are continued until *t* with the number of answers produced; if *last_answer*
+    is set, they are continued with their last answer instead, e.g., for weighted answers.
+    """
+    ngroups = len(starts) - 1
+    group = np.repeat(np.arange(ngroups), np.diff(starts))
+    keep = time <= t[group]
+    answer, time = answer[keep], time[keep]
+    starts = np.zeros(ngroups + 1, dtype=np.intp)
+    np.cumsum(np.bincount(group[keep], minlength=ngroups), out=starts[1:])
+    n = np.diff(starts)
+    if count is not None:
+        count = count[keep]
+        n = _segment_sum(count, starts)
+        answer, time, starts = _expand_runs(answer, time, count, starts)
+
+    dief = get_backend().segment_auc(time, answer, starts)
+    if continue_to_end:
+        # Continue the answer trace until t with the number of answers produced.
+        # A single answer 0 indicates that the approach did not produce any answer.
+        produced = np.flatnonzero(n > 0)
+        last = starts[produced + 1] - 1
+        keep = ~((n[produced] == 1) & (answer[last] == 0))
+        produced, last = produced[keep], last[keep]
+        end = answer[last] if last_answer else n[produced]
+        dief[produced] += (t[produced] - time[last]) * ((answer[last] + end) / 2.0)
+    return dief
+
+
+def _diefk_groups(answer: np.ndarray, time: np.ndarray, count: np.ndarray, starts: np.ndarray,
+                  k: np.ndarray) -> np.ndarray:
+    """Computes dief@k of grouped answer traces for the first *k* answers of each group."""
+    ngroups = len(starts) - 1
+    group = np.repeat(np.arange(ngroups), np.diff(starts))
+    if count is None:
+        keep = answer <= k[group]
+    else:
+        # Keep the runs starting with one of the first k answers and cut them at k.
+        keep = answer - count + 1 <= k[group]
+    answer, time = answer[keep], time[keep]
+    starts = np.zeros(ngroups + 1, dtype=np.intp)
+    np.cumsum(np.bincount(group[keep], minlength=ngroups), out=starts[1:])
+    if count is not None:
+        count = count[keep]
+        cut = np.minimum(answer, np.floor(k[group[keep]])).astype(answer.dtype)
+        answer, time, starts = _expand_runs(cut, time, count - (answer - cut), starts)
+    return get_backend().segment_auc(time, answer, starts)
+
+
+def _result(inputtest: str, approaches: np.ndarray, metric: str, values: np.ndarray, inputtrace: np.ndarray) -> np.ndarray:
+    """
+    Assembles the dataframe with the values of a metric per approach for a single test.
+
+    :return: Dataframe with the metric for each approach. Attributes of the dataframe: test, approach, *metric*.
+    """
+    with stage('assemble', inputtest, len(approaches)):
+        df = np.empty(shape=len(approaches), dtype=[('test', inputtrace['test'].dtype),
+                                                    ('approach', inputtrace['approach'].dtype),
+                                                    (metric, float)])
+        df['test'] = inputtest
+        df['approach'] = approaches
+        df[metric] = values
+    return df
+
+
+def _pivot(df: np.ndarray, fields: list, tests: np.ndarray = None, approaches: np.ndarray = None):
+    """
+    Arranges the attributes of a dataframe with one row per test and approach as a dense array.
+
+    :param df: Dataframe with the attributes test, approach, and *fields*.
+    :param fields: Attributes to include.
+    :param tests: (optional) Sorted names of the tests; by default, the tests in the dataframe.
+    :param approaches: (optional) Sorted names of the approaches; by default, the approaches in the dataframe.
+    :return: Tuple (tests, approaches, cube) where cube has the shape (tests, approaches, fields);
+             combinations of test and approach without a row are NaN.
+    """
+    if tests is None:
+        tests = np.unique(df['test'])
+    if approaches is None:
+        approaches = np.unique(df['approach'])
+    cube = np.full((len(tests), len(approaches), len(fields)), np.nan)
+    ti, known_tests = _lookup(tests, df['test'])
+    ai, known_approaches = _lookup(approaches, df['approach'])
+    known = known_tests & known_approaches
+    for m, field in enumerate(fields):
+        cube[ti[known], ai[known], m] = df[field][known]
+    return tests, approaches, cube
+
+
+def _lookup(names: np.ndarray, values: np.ndarray):
+    """Returns the indices of the values in the sorted names and whether the values were found."""
+    idx = np.searchsorted(names, values)
+    if len(names) == 0:
+        return idx, np.zeros(len(idx), dtype=bool)
+    found = (idx < len(names)) & (names[np.minimum(idx, len(names) - 1)] == values)
+    return idx, found
+
+
+def pivot_metrics(metrics: np.ndarray):
+    """
+    Arranges the other metrics as dense matrices with one row per test and one column per approach.
+
+    The pivot is built once and replaces looking up the row of each test and approach in the metrics.
+
+    :param metrics: Dataframe with the other metrics. Attributes of the dataframe: test, approach, tfft, totaltime, comp.
+    :return: Tuple (tests, approaches, pivot) with the sorted names of the tests and approaches and the matrix with the
+             attributes tfft, totaltime, and comp with the shape (tests, approaches);
+             combinations of test and approach without metrics are NaN.
+
+    **Examples**
+
+    >>> tests, approaches, pivot = pivot_metrics(metrics)
+    >>> pivot['totaltime'][tests == "Q9.sparql"]
+    """
+    fields = ['tfft', 'totaltime', 'comp']
+    tests, approaches, cube = _pivot(metrics, fields)
+    pivot = np.empty(cube.shape[:2], dtype=[(field, float) for field in fields])
+    for m, field in enumerate(fields):
+        pivot[field] = cube[:, :, m]
+    return tests, approaches, pivot
+
+
+def dieft(inputtrace: np.ndarray, inputtest: str, t: float = -1.0, continue_to_end: bool = True,
+          time_scale: float = 1.0) -> np.ndarray:
     """
     Computes the **dief@t** metric for a specific test at a given time point *t*.
 
@@ -34,57 +329,55 @@ def dieft(inputtrace: np.ndarray, inputtest: str, t: float = -1.0, continue_to_e
     :param t: Point in time to compute dief@t for. By default, the function computes the maximum of the execution time
               among the approaches in the answer trace.
     :param continue_to_end: Indicates whether the AUC should be continued until the end of the time frame
+    :param time_scale: Factor converting the time unit of the answer trace into the time unit of the result,
+                       e.g., 1e-9 for answer traces in integer nanoseconds and dief@t in answers times seconds.
     :return: Dataframe with the dief@t values for each approach. Attributes of the dataframe: test, approach, dieft.
 
     **Examples**
 
     >>> dieft(traces, "Q9.sparql")
     >>> dieft(traces, "Q9.sparql", 7.5)
+    >>> dieft(traces_ns, "Q9.sparql", time_scale=1e-9)
     """
-    # Initialize output structure.
-    df = np.empty(shape=0, dtype=[('test', inputtrace['test'].dtype),
-                                  ('approach', inputtrace['approach'].dtype),
-                                  ('dieft', float)])
-
     # Obtain test and approaches to compare.
-    results = inputtrace[inputtrace['test'] == inputtest]
-    approaches = np.unique(results['approach'])
+    with stage('filter', inputtest) as s:
+        results = inputtrace[inputtrace['test'] == inputtest]
+        approaches = np.unique(results['approach'])
+        s.add_rows(len(inputtrace))
 
     # Obtain maximum t over all approaches if t is not set.
     if t == -1:
         t = np.max(results['time'])
 
+    # Group the answers produced until t per approach.
+    with stage('group', inputtest, len(results)):
+        subtrace = results[results['time'] <= t]
+        order, starts = _group_approaches(subtrace, approaches)
+        answer = subtrace['answer'][order]
+        time = subtrace['time'][order]
+        n = np.diff(starts)
+        if 'count' in subtrace.dtype.names:
+            count = subtrace['count'][order]
+            n = _segment_sum(count, starts)
+            answer, time, starts = _expand_runs(answer, time, count, starts)
+
     # Compute dieft per approach.
-    for a in approaches:
-        dief = 0
-        subtrace = results[(results['approach'] == a) & (results['time'] <= t)]
+    with stage('auc', inputtest, len(subtrace)):
+        dief = get_backend().segment_auc(time, answer, starts)
 
         if continue_to_end:
-            com = np.array([(inputtest, a, len(subtrace), t)],
-                           dtype=[('test', subtrace['test'].dtype),
-                                  ('approach', subtrace['approach'].dtype),
-                                  ('answer', int),
-                                  ('time', float)]
-                           )
-
-            if len(subtrace) == 1 and subtrace['answer'] == 0:
-                pass
-            else:
-                subtrace = np.concatenate((subtrace, com), axis=0)
+            # Continue the answer trace until t with the number of answers produced.
+            # A single answer 0 indicates that the approach did not produce any answer.
+            produced = np.flatnonzero(n > 0)
+            last = starts[produced + 1] - 1
+            keep = ~((n[produced] == 1) & (answer[last] == 0))
+            produced, last = produced[keep], last[keep]
+            dief[produced] += (t - time[last]) * ((answer[last] + n[produced]) / 2.0)
 
-        if len(subtrace) > 1:
-            dief = np.trapz(subtrace['answer'], subtrace['time'])
+    return _result(inputtest, approaches, 'dieft', dief * time_scale, inputtrace)
 
-        res = np.array([(inputtest, a, dief)],
-                       dtype=[('test', subtrace['test'].dtype),
-                              ('approach', subtrace['approach'].dtype),
-                              ('dieft', float)])
-        df = np.append(df, res, axis=0)
-
-    return df
 
-
-def diefk(inputtrace: np.ndarray, inputtest: str, k: int = -1) -> np.ndarray:
+def diefk(inputtrace: np.ndarray, inputtest: str, k: int = -1, time_scale: float = 1.0) -> np.ndarray:
     """
     Computes the **dief@k** metric for a specific test at a given number of answers *k*.
 
@@ -96,6 +389,8 @@ def diefk(inputtrace: np.ndarray, inputtest: str, k: int = -1) -> np.ndarray:
     :param inputtest: Specifies the specific test to analyze from the answer trace.
     :param k: Number of answers to compute dief@k for. By default, the function computes the minimum of the total number
               of answers produced by the approaches.
+    :param time_scale: Factor converting the time unit of the answer trace into the time unit of the result,
+                       e.g., 1e-9 for answer traces in integer nanoseconds and dief@k in answers times seconds.
     :return: Dataframe with the dief@k values for each approach. Attributes of the dataframe: test, approach, diefk.
 
     **Examples**
@@ -103,39 +398,40 @@ def diefk(inputtrace: np.ndarray, inputtest: str, k: int = -1) -> np.ndarray:
     >>> diefk(traces, "Q9.sparql")
     >>> diefk(traces, "Q9.sparql", 1000)
     """
-    # Initialize output structure.
-    df = np.empty(shape=0, dtype=[('test', inputtrace['test'].dtype),
-                                  ('approach', inputtrace['approach'].dtype),
-                                  ('diefk', float)])
-
     # Obtain test and approaches to compare.
-    results = inputtrace[inputtrace['test'] == inputtest]
-    approaches = np.unique(results['approach'])
+    with stage('filter', inputtest) as s:
+        results = inputtrace[inputtrace['test'] == inputtest]
+        approaches = np.unique(results['approach'])
+        s.add_rows(len(inputtrace))
 
     # Obtain k per approach.
     if k == -1:
-        n = []
-        for a in approaches:
-            x = results[results['approach'] == a]
-            n.append(len(x))
-        k = min(n)
+        k = _answer_counts(results, approaches).min()
+
+    # Group the first k answers per approach.
+    with stage('group', inputtest, len(results)):
+        if 'count' in results.dtype.names:
+            # Keep the runs starting with one of the first k answers and cut them at k.
+            subtrace = results[results['answer'] - results['count'] + 1 <= k]
+            order, starts = _group_approaches(subtrace, approaches)
+            answer = subtrace['answer'][order]
+            count = subtrace['count'][order]
+            cut = np.minimum(answer, np.floor(k)).astype(answer.dtype)
+            answer, time, starts = _expand_runs(cut, subtrace['time'][order], count - (answer - cut), starts)
+        else:
+            subtrace = results[results['answer'] <= k]
+            order, starts = _group_approaches(subtrace, approaches)
+            answer = subtrace['answer'][order]
+            time = subtrace['time'][order]
 
     # Compute diefk per approach.
-    for a in approaches:
-        dief = 0
-        subtrace = results[(results['approach'] == a) & (results['answer'] <= k)]
-        if len(subtrace) > 1:
-            dief = np.trapz(subtrace['answer'], subtrace['time'])
-        res = np.array([(inputtest, a, dief)],
-                       dtype=[('test', inputtrace['test'].dtype),
-                              ('approach', inputtrace['approach'].dtype),
-                              ('diefk', float)])
-        df = np.append(df, res, axis=0)
+    with stage('auc', inputtest, len(subtrace)):
+        dief = get_backend().segment_auc(time, answer, starts)
 
-    return df
+    return _result(inputtest, approaches, 'diefk', dief * time_scale, inputtrace)
 
 
-def diefk2(inputtrace: np.ndarray, inputtest: str, kp: float = -1.0) -> np.ndarray:
+def diefk2(inputtrace: np.ndarray, inputtest: str, kp: float = -1.0, time_scale: float = 1.0) -> np.ndarray:
     """
     Computes the **dief@k** metric for a specific test at a given percentage of answers *kp*.
 
@@ -148,6 +444,7 @@ def diefk2(inputtrace: np.ndarray, inputtest: str, kp: float = -1.0) -> np.ndarr
     :param inputtest: Specifies the specific test to analyze from the answer trace.
     :param kp: Ratio of answers to compute dief@k for (kp in [0.0;1.0]). By default and when kp=1.0, this function behaves
                the same as diefk. It computes the kp portion of the minimum number of answers produced by the approaches.
+    :param time_scale: Factor converting the time unit of the answer trace into the time unit of the result.
     :return: Dataframe with the dief@k values for each approach. Attributes of the dataframe: test, approach, diefk.
 
     **Examples**
@@ -160,21 +457,834 @@ def diefk2(inputtrace: np.ndarray, inputtest: str, kp: float = -1.0) -> np.ndarr
     approaches = np.unique(results['approach'])
 
     # Obtain k per approach.
-    n = []
-    for a in approaches:
-        x = results[results['approach'] == a]
-        n.append(len(x))
-    k = min(n)
+    k = _answer_counts(results, approaches).min()
     if kp > -1:
         k = k * kp
 
     # Compute diefk.
-    df = diefk(inputtrace, inputtest, k)
+    df = diefk(inputtrace, inputtest, k, time_scale)
+
+    return df
+
+
+def dieft_by(inputtrace: np.ndarray, keys: tuple = KEYS, t: float = -1.0, continue_to_end: bool = True,
+             time_scale: float = 1.0) -> np.ndarray:
+    """
+    Computes the **dief@t** metric for every combination of the key attributes at once.
+
+    The answer traces are grouped by the key attributes, e.g., test, configuration, run, and approach, with a single
+    sort. The last key identifies the approaches compared with each other, i.e., by default, *t* is the maximum of
+    the execution time among the groups that share all other keys. With the default keys, the result equals
+    ``dieft`` computed for each test.
+
+    :param inputtrace: Dataframe with the answer trace. Attributes of the dataframe: *keys*, answer, time.
+                       The answer trace may be compressed with ``compress_trace``.
+    :param keys: Attributes identifying an answer trace; the last key identifies the compared approaches.
+    :param t: Point in time to compute dief@t for. By default, the function computes the maximum of the execution time
+              among the compared approaches.
+    :param continue_to_end: Indicates whether the AUC should be continued until the end of the time frame
+    :param time_scale: Factor converting the time unit of the answer trace into the time unit of the result.
+    :return: Dataframe with the dief@t values for each group. Attributes of the dataframe: *keys*, dieft.
+
+    **Examples**
+
+    >>> dieft_by(traces)
+    >>> dieft_by(traces, ("test", "scale", "run", "approach"), 7.5)
+    """
+    with stage('dieft', rows=len(inputtrace)):
+        groups, compared, answer, time, count, starts = _grouped(inputtrace, keys)
+        if t == -1:
+            end = np.maximum.reduceat(time, starts[:-1]) if len(time) else time
+            t = _reduce_compared(np.maximum, end, compared)
+        else:
+            t = np.full(len(groups), t)
+        dief = _dieft_groups(answer, time, count, starts, t, continue_to_end)
+        df = _keyed_result(inputtrace, keys, groups, [('dieft', float)])
+        df['dieft'] = dief * time_scale
+    return df
+
+
+def diefk_by(inputtrace: np.ndarray, keys: tuple = KEYS, k: float = -1, kp: float = -1.0,
+             time_scale: float = 1.0) -> np.ndarray:
+    """
+    Computes the **dief@k** metric for every combination of the key attributes at once.
+
+    The answer traces are grouped by the key attributes, e.g., test, configuration, run, and approach, with a single
+    sort. The last key identifies the approaches compared with each other, i.e., by default, *k* is the minimum of the
+    number of answers produced by the groups that share all other keys. With the default keys, the result equals
+    ``diefk`` (or ``diefk2`` if *kp* is given) computed for each test.
+
+    :param inputtrace: Dataframe with the answer trace. Attributes of the dataframe: *keys*, answer, time.
+                       The answer trace may be compressed with ``compress_trace``.
+    :param keys: Attributes identifying an answer trace; the last key identifies the compared approaches.
+    :param k: Number of answers to compute dief@k for. By default, the function computes the minimum of the total number
+              of answers produced by the compared approaches.
+    :param kp: Ratio of *k* to compute dief@k for (kp in [0.0;1.0]).
+    :param time_scale: Factor converting the time unit of the answer trace into the time unit of the result.
+    :return: Dataframe with the dief@k values for each group. Attributes of the dataframe: *keys*, diefk.
+
+    **Examples**
+
+    >>> diefk_by(traces)
+    >>> diefk_by(traces, ("test", "scale", "run", "approach"), kp=0.25)
+    """
+    with stage('diefk', rows=len(inputtrace)):
+        groups, compared, answer, time, count, starts = _grouped(inputtrace, keys)
+        if k == -1:
+            produced = np.diff(starts) if count is None else _segment_sum(count, starts)
+            k = _reduce_compared(np.minimum, produced, compared).astype(float)
+        else:
+            k = np.full(len(groups), k, dtype=float)
+        if kp > -1:
+            k = k * kp
+        dief = _diefk_groups(answer, time, count, starts, k)
+        df = _keyed_result(inputtrace, keys, groups, [('diefk', float)])
+        df['diefk'] = dief * time_scale
+    return df
+
+
+def workload_trace(inputtrace: np.ndarray, offsets: dict = None, weights: dict = None,
+                   workload: str = 'workload') -> np.ndarray:
+    """
+    Merges the answer traces of all tests into a single answer trace of the workload per approach.
+
+    The tests of a workload, e.g., a mix of queries submitted together, are executed concurrently. The answers of
+    all tests are shifted by the start offset of their test and merged in the order of time; the answer of the
+    workload is the (weighted) number of answers produced by all tests until then. The answer traces of the tests
+    are sorted by time, hence, the merge is a single stable sort that merges the sorted runs.
+    A run of a compressed answer trace is expanded into its first and its last answer, such that the workload
+    trace is not compressed. As the answers are weighted and runs are expanded, the answer of the workload is not
+    the number of rows; use ``workload_dief`` to compute the metrics of the workload.
+
+    :param inputtrace: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
+                       The answer trace may be compressed with ``compress_trace``.
+    :param offsets: (optional) Mapping from the tests to the points in time when they were submitted;
+                    by default, all tests are submitted at time 0.
+    :param weights: (optional) Mapping from the tests to the weight of each of their answers; by default, 1.
+    :param workload: Name of the workload used as test in the resulting answer trace.
+    :return: Dataframe with the answer trace of the workload. Attributes of the dataframe: test, approach, answer, time.
+
+    **Examples**
 
+    >>> workload = workload_trace(traces)
+    >>> workload = workload_trace(traces, offsets={"Q14.sparql": 2.5}, weights={"Q9.sparql": 0.01})
+    """
+    with stage('workload', rows=len(inputtrace)):
+        tests, test_codes = np.unique(inputtrace['test'], return_inverse=True)
+        test_codes = test_codes.ravel()
+        offset = np.array([(offsets or {}).get(t, 0) for t in tests.tolist()])
+        weight = np.array([(weights or {}).get(t, 1) for t in tests.tolist()])
+        time = inputtrace['time'] + offset[test_codes] if len(tests) else inputtrace['time']
+
+        # Answers produced by each row; a single answer 0 indicates that no answer was produced.
+        unit = np.where(inputtrace['answer'] > 0, weight[test_codes] if len(tests) else 1, 0)
+        produced = unit * (inputtrace['count'] if 'count' in inputtrace.dtype.names else 1)
+
+        # Merge the sorted answer traces of the tests in the order of time, then group them by approach.
+        approaches, approach_codes = np.unique(inputtrace['approach'], return_inverse=True)
+        merged = np.argsort(time, kind='stable')
+        order, starts = get_backend().group(approach_codes.ravel()[merged], len(approaches))
+        order = merged[order]
+        time, produced, unit = time[order], produced[order], unit[order]
+        cumsum = np.cumsum(produced)
+        answer = cumsum - np.repeat(np.concatenate([[0], cumsum])[starts[:-1]], np.diff(starts))
+
+        # Keep the rows producing answers; approaches without answers keep a single answer 0 at their last time.
+        group = np.repeat(np.arange(len(approaches)), np.diff(starts))
+        keep = produced > 0
+        empty = np.flatnonzero(np.bincount(group[keep], minlength=len(approaches)) == 0)
+        keep[starts[empty + 1] - 1] = True
+
+        # Expand runs of several answers into their first and last answer at the same time.
+        runs = keep & (produced > unit)
+        repeats = keep.astype(np.intp) + runs
+        rows = np.repeat(np.arange(len(keep)), repeats)
+        answer = answer[rows]
+        answer[(np.cumsum(repeats) - repeats)[runs]] -= (produced - unit)[runs]
+
+        df = np.empty(len(rows), dtype=[('test', 'U%d' % max(len(workload), 1)),
+                                        ('approach', inputtrace['approach'].dtype),
+                                        ('answer', answer.dtype),
+                                        ('time', time.dtype)])
+        df['test'] = workload
+        df['approach'] = approaches[group[rows]]
+        df['answer'] = answer
+        df['time'] = time[rows]
+    return df
+
+
+def workload_dief(inputtrace: np.ndarray, offsets: dict = None, weights: dict = None, t: float = -1.0, k: float = -1,
+                  continue_to_end: bool = True, workload: str = 'workload') -> np.ndarray:
+    """
+    Computes **dief@t** and **dief@k** of a workload per approach.
+
+    The answer traces of the tests are merged into the answer trace of the workload with ``workload_trace``.
+    The answer traces of the workload are continued until *t* with their last (weighted) answer.
+
+    :param inputtrace: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
+    :param offsets: (optional) Mapping from the tests to the points in time when they were submitted.
+    :param weights: (optional) Mapping from the tests to the weight of each of their answers.
+    :param t: Point in time to compute dief@t for. By default, the function computes the maximum of the execution time
+              of the workload among the approaches.
+    :param k: Number of (weighted) answers to compute dief@k for. By default, the function computes the minimum of the
+              answers of the workload produced by the approaches.
+    :param continue_to_end: Indicates whether the AUC should be continued until the end of the time frame
+    :param workload: Name of the workload used as test in the result.
+    :return: Dataframe with the metrics for each approach. Attributes of the dataframe: test, approach, dieft, diefk.
+
+    **Examples**
+
+    >>> workload_dief(traces)
+    >>> workload_dief(traces, offsets={"Q14.sparql": 2.5}, t=10.0)
+    """
+    trace = workload_trace(inputtrace, offsets, weights, workload)
+    with stage('workload', rows=len(trace)):
+        groups, _, answer, time, _, starts = _grouped(trace, KEYS)
+        ngroups = len(groups)
+        # The number of answers of an approach is its last answer.
+        last = answer[starts[1:] - 1] if len(answer) else answer
+        if t == -1:
+            t = time.max() if len(time) else 0.0
+        if k == -1:
+            k = last.min() if len(last) else 0
+        df = _keyed_result(trace, KEYS, groups, [('dieft', float), ('diefk', float)])
+        df['dieft'] = _dieft_groups(answer, time, None, starts, np.full(ngroups, t), continue_to_end, last_answer=True)
+        df['diefk'] = _diefk_groups(answer, time, None, starts, np.full(ngroups, k, dtype=float))
     return df
 
 
-def plot_answer_trace(inputtrace: np.ndarray, inputtest: str, colors: list = DEFAULT_COLORS) -> Figure:
+def compress_trace(inputtrace: np.ndarray) -> np.ndarray:
+    """
+    Compresses answer traces by storing runs of consecutive answers produced at the same time as a single row.
+
+    Many engines produce answers in batches, i.e., consecutive answers share the same time.
+    A run is stored with the last answer of the run and the number of answers in the run.
+    ``dieft``, ``diefk``, and ``diefk2`` compute the exact same values for the compressed answer trace
+    as for the original one, but process one row per run instead of one row per answer.
+
+    :param inputtrace: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
+    :return: Dataframe with the compressed answer trace. Attributes of the dataframe: test, approach, answer, time, count.
+
+    **Examples**
+
+    >>> compressed = compress_trace(traces)
+    >>> dieft(compressed, "Q9.sparql")
+    """
+    with stage('compress', rows=len(inputtrace)):
+        first, codes = _unique_keys([inputtrace['test'], inputtrace['approach']])
+        order = get_backend().group(codes, len(first))[0]
+        codes, answer, time = codes[order], inputtrace['answer'][order], inputtrace['time'][order]
+
+        # A run ends before a new test or approach, a different time, or a gap in the answers.
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (codes[1:] != codes[:-1]) | (time[1:] != time[:-1]) | (answer[1:] != answer[:-1] + 1)
+        starts = np.flatnonzero(first)
+        ends = np.append(starts[1:], len(order)) - 1
+
+        df = np.empty(len(starts), dtype=[('test', inputtrace['test'].dtype),
+                                          ('approach', inputtrace['approach'].dtype),
+                                          ('answer', inputtrace['answer'].dtype),
+                                          ('time', inputtrace['time'].dtype),
+                                          ('count', int)])
+        for name in ('test', 'approach', 'answer', 'time'):
+            df[name] = inputtrace[name][order[ends]]
+        df['count'] = ends - starts + 1
+    return df
+
+
+def sketch_trace(inputtrace: np.ndarray, size: int = 1024) -> np.ndarray:
+    """
+    Reduces the answer traces to a deterministic subsample of at most *size* answers per test and approach.
+
+    The sketch keeps evenly spaced answers of each test and approach including the first and the last answer.
+    It is an answer trace itself and can be used for plotting, but metrics computed from it are approximations.
+    ``dieft_approx``, ``diefk_approx``, and ``diefk2_approx`` compute the metrics from the sketch
+    together with an error bound in time proportional to the size of the sketch.
+
+    :param inputtrace: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
+    :param size: Maximum number of answers per test and approach (at least 2).
+    :return: Dataframe with the sketch of the answer trace. Attributes of the dataframe: test, approach, answer, time.
+
+    **Examples**
+
+    >>> sketch = sketch_trace(traces)
+    >>> sketch = sketch_trace(traces, 100)
+    """
+    if size < 2:
+        raise ValueError('the size of the sketch must be at least 2')
+
+    with stage('sketch', rows=len(inputtrace)):
+        first, codes = _unique_keys([inputtrace['test'], inputtrace['approach']])
+        order, starts = get_backend().group(codes, len(first))
+
+        # Evenly spaced positions within each group; the first and last position are always included.
+        n = np.diff(starts)
+        m = np.minimum(n, size)
+        group = np.repeat(np.arange(len(first)), m)
+        j = np.arange(m.sum()) - np.repeat(np.cumsum(m) - m, m)
+        step = np.where(m > 1, (n - 1) / np.maximum(m - 1, 1), 0)
+        positions = starts[group] + np.rint(j * step[group]).astype(np.intp)
+
+        return inputtrace[np.sort(order[positions])]
+
+
+def _approx_group(answer: np.ndarray, time: np.ndarray, t: float = None, k: float = None,
+                  continue_to_end: bool = True):
+    """
+    Approximates the AUC of a single answer trace from its sketch until time *t* or answer *k*.
+
+    Between two points of the sketch, the exact answer trace is monotonic and lies within the rectangle
+    spanned by the two points. Hence, the trapezoid deviates from the exact area by at most half of the rectangle.
+    At the end of the time frame or when reaching *k* answers, the exact answer trace is interpolated linearly and the
+    error is bounded by the rectangle.
+
+    :return: Tuple (approximated AUC, error bound).
+    """
+    if k is None:
+        j = np.searchsorted(time, t, side='right')
+    else:
+        j = np.searchsorted(answer, k, side='right')
+    if j == 0:
+        return 0.0, 0.0
+
+    dief = np.trapz(answer[:j], time[:j]) if j > 1 else 0.0
+    error = np.sum(np.diff(time[:j]) * np.diff(answer[:j])) / 2.0
+
+    if j < len(time):
+        # The exact answer trace ends between two points of the sketch.
+        width = time[j] - time[j - 1]
+        if k is None:
+            gap = t - time[j - 1]
+            estimate = gap * (2 * answer[j - 1] + (answer[j] - answer[j - 1]) * gap / width) / 2.0
+            lower = answer[j - 1] * gap if continue_to_end else 0.0
+            upper = answer[j] * gap
+        elif answer[j - 1] < k:
+            gap = width * (k - answer[j - 1]) / (answer[j] - answer[j - 1])
+            estimate = gap * (answer[j - 1] + k) / 2.0
+            lower, upper = 0.0, k * width
+        else:
+            estimate = lower = upper = 0.0
+        dief += estimate
+        error += max(estimate - lower, upper - estimate)
+    elif k is None and continue_to_end and not (j == 1 and answer[0] == 0):
+        # The sketch contains the last answer, i.e., the number of answers produced is known.
+        dief += answer[j - 1] * (t - time[j - 1])
+
+    return float(dief), float(error)
+
+
+def _approx_result(inputtest: str, approaches: np.ndarray, metric: str, values: list, inputtrace: np.ndarray) -> np.ndarray:
+    """Assembles the dataframe with approximated values and error bounds per approach for a single test."""
+    df = np.empty(shape=len(approaches), dtype=[('test', inputtrace['test'].dtype),
+                                                ('approach', inputtrace['approach'].dtype),
+                                                (metric, float),
+                                                ('error', float)])
+    df['test'] = inputtest
+    df['approach'] = approaches
+    df[metric] = [v[0] for v in values]
+    df['error'] = [v[1] for v in values]
+    return df
+
+
+def dieft_approx(sketch: np.ndarray, inputtest: str, t: float = -1.0, continue_to_end: bool = True) -> np.ndarray:
+    """
+    Approximates the **dief@t** metric for a specific test at a given time point *t* from a sketch of the answer trace.
+
+    The approximation is computed from the sketch produced by ``sketch_trace``. Additionally, a guaranteed bound of the
+    absolute error w.r.t. ``dieft`` on the complete answer trace is reported. The error bound assumes that the answers of
+    each approach are numbered consecutively, as in answer traces recorded by query engines.
+
+    :param sketch: Dataframe with the sketch of the answer trace. Attributes of the dataframe: test, approach, answer, time.
+    :param inputtest: Specifies the specific test to analyze from the sketch.
+    :param t: Point in time to compute dief@t for. By default, the function computes the maximum of the execution time
+              among the approaches in the answer trace.
+    :param continue_to_end: Indicates whether the AUC should be continued until the end of the time frame
+    :return: Dataframe with the approximated dief@t values and their error bound for each approach.
+             Attributes of the dataframe: test, approach, dieft, error.
+
+    **Examples**
+
+    >>> dieft_approx(sketch_trace(traces), "Q9.sparql")
+    >>> dieft_approx(sketch_trace(traces, 100), "Q9.sparql", 7.5)
+    """
+    results = sketch[sketch['test'] == inputtest]
+    approaches = np.unique(results['approach'])
+    order, starts = _group_approaches(results, approaches)
+    answer = results['answer'][order]
+    time = results['time'][order]
+
+    if t == -1:
+        t = np.max(results['time'])
+
+    with stage('auc', inputtest, len(results)):
+        values = [_approx_group(answer[starts[i]:starts[i + 1]], time[starts[i]:starts[i + 1]],
+                                t=t, continue_to_end=continue_to_end) for i in range(len(approaches))]
+    return _approx_result(inputtest, approaches, 'dieft', values, sketch)
+
+
+def diefk_approx(sketch: np.ndarray, inputtest: str, k: int = -1) -> np.ndarray:
+    """
+    Approximates the **dief@k** metric for a specific test at a given number of answers *k* from a sketch of the answer trace.
+
+    The approximation is computed from the sketch produced by ``sketch_trace``. Additionally, a guaranteed bound of the
+    absolute error w.r.t. ``diefk`` on the complete answer trace is reported.
+
+    :param sketch: Dataframe with the sketch of the answer trace. Attributes of the dataframe: test, approach, answer, time.
+    :param inputtest: Specifies the specific test to analyze from the sketch.
+    :param k: Number of answers to compute dief@k for. By default, the function computes the minimum of the total number
+              of answers produced by the approaches.
+    :return: Dataframe with the approximated dief@k values and their error bound for each approach.
+             Attributes of the dataframe: test, approach, diefk, error.
+
+    **Examples**
+
+    >>> diefk_approx(sketch_trace(traces), "Q9.sparql")
+    >>> diefk_approx(sketch_trace(traces), "Q9.sparql", 1000)
+    """
+    results = sketch[sketch['test'] == inputtest]
+    approaches = np.unique(results['approach'])
+    order, starts = _group_approaches(results, approaches)
+    answer = results['answer'][order]
+    time = results['time'][order]
+
+    # The sketch contains the last answer of each approach, i.e., the total number of answers.
+    if k == -1:
+        k = np.min(answer[starts[1:] - 1])
+    if np.issubdtype(answer.dtype, np.integer):
+        k = np.floor(k)
+
+    with stage('auc', inputtest, len(results)):
+        values = [_approx_group(answer[starts[i]:starts[i + 1]], time[starts[i]:starts[i + 1]], k=k)
+                  for i in range(len(approaches))]
+    return _approx_result(inputtest, approaches, 'diefk', values, sketch)
+
+
+def diefk2_approx(sketch: np.ndarray, inputtest: str, kp: float = -1.0) -> np.ndarray:
+    """
+    Approximates the **dief@k** metric for a specific test at a given percentage of answers *kp* from a sketch.
+
+    :param sketch: Dataframe with the sketch of the answer trace. Attributes of the dataframe: test, approach, answer, time.
+    :param inputtest: Specifies the specific test to analyze from the sketch.
+    :param kp: Ratio of answers to compute dief@k for (kp in [0.0;1.0]). By default and when kp=1.0, this function behaves
+               the same as diefk_approx.
+    :return: Dataframe with the approximated dief@k values and their error bound for each approach.
+             Attributes of the dataframe: test, approach, diefk, error.
+
+    **Examples**
+
+    >>> diefk2_approx(sketch_trace(traces), "Q9.sparql", 0.25)
+    """
+    results = sketch[sketch['test'] == inputtest]
+    order, starts = _group_approaches(results, np.unique(results['approach']))
+    k = np.min(results['answer'][order][starts[1:] - 1])
+    if kp > -1:
+        k = k * kp
+    return diefk_approx(results, inputtest, k)
+
+
+def _interpolate(time: np.ndarray, answer: np.ndarray, grid: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    """
+    Evaluates the answer trace at the points of *grid*, where ``idx`` is the number of answers before the point.
+
+    The answer trace is linearly interpolated between the answers, zero before the first answer,
+    and constant after the last answer.
+    """
+    n = len(time)
+    lower = np.clip(idx - 1, 0, n - 1)
+    upper = np.clip(idx, 0, n - 1)
+    width = time[upper] - time[lower]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = np.where(width > 0, (grid - time[lower]) / width, 1.0)
+    values = answer[lower] + (answer[upper] - answer[lower]) * fraction
+    values[idx == 0] = 0
+    values[idx >= n] = answer[-1]
+    return values
+
+
+def _dominance(time1: np.ndarray, answer1: np.ndarray, time2: np.ndarray, answer2: np.ndarray, end: float):
+    """
+    Computes the pieces of the time frame in which one of two answer traces is ahead of the other.
+
+    Both answer traces are sorted by time. They are merged in linear time; between two consecutive points of the merged
+    traces, both answer traces are linear, hence, their difference changes its sign at most once.
+
+    :return: Tuple (start, end, sign) of the pieces; sign is 1 if the first answer trace is ahead, -1 if the second one
+             is ahead, and 0 if both are equal. Consecutive pieces have a different sign.
+    """
+    # Merge the two sorted answer traces; the stable sort of two sorted runs is a linear merge.
+    times = np.concatenate((time1, time2))
+    order = np.argsort(times, kind='stable')
+    times = times[order]
+    first = order < len(time1)
+    count1 = np.cumsum(first)
+    count2 = np.cumsum(~first)
+
+    # Number of answers before (left) and until (right) each distinct point in time.
+    new = np.r_[True, times[1:] != times[:-1]]
+    last = np.r_[new[1:], True]
+    grid = times[new]
+    right1, right2 = count1[last], count2[last]
+    left1 = np.r_[0, right1[:-1]]
+    left2 = np.r_[0, right2[:-1]]
+
+    # Difference of the answer traces right after and right before each point in time.
+    diff_right = _interpolate(time1, answer1, grid, right1) - _interpolate(time2, answer2, grid, right2)
+    diff_left = _interpolate(time1, answer1, grid, left1) - _interpolate(time2, answer2, grid, left2)
+
+    # Between consecutive points, the difference is linear from diff_right[i] to diff_left[i+1].
+    d0, d1 = diff_right[:-1], diff_left[1:]
+    t0, t1 = grid[:-1], grid[1:]
+    crossing = np.sign(d0) * np.sign(d1) < 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tc = np.where(crossing, t0 + d0 / (d0 - d1) * (t1 - t0), t1)
+    sign_before = np.where(d0 != 0, np.sign(d0), np.sign(d1))
+
+    starts = np.stack((t0, tc), axis=1).ravel()
+    ends = np.stack((tc, t1), axis=1).ravel()
+    signs = np.stack((sign_before, np.where(crossing, np.sign(d1), sign_before)), axis=1).ravel()
+    starts = np.r_[starts, grid[-1]]
+    ends = np.r_[ends, max(end, grid[-1])]
+    signs = np.r_[signs, np.sign(diff_right[-1])]
+
+    # Drop empty pieces and merge consecutive pieces with the same sign.
+    keep = ends > starts
+    starts, ends, signs = starts[keep], ends[keep], signs[keep]
+    if len(signs) == 0:
+        return starts, ends, signs.astype(int)
+    change = np.r_[True, signs[1:] != signs[:-1]]
+    idx = np.flatnonzero(change)
+    return starts[idx], np.r_[starts[idx[1:]], ends[-1]], signs[idx].astype(int)
+
+
+def _pairs(results: np.ndarray):
+    """Yields (approach1, approach2, time1, answer1, time2, answer2) for all pairs of approaches of a single test."""
+    approaches = np.unique(results['approach'])
+    order, starts = _group_approaches(results, approaches)
+    time = results['time'][order]
+    answer = results['answer'][order]
+    segments = [slice(starts[i], starts[i + 1]) for i in range(len(approaches))]
+    for i in range(len(approaches)):
+        for j in range(i + 1, len(approaches)):
+            yield approaches[i], approaches[j], time[segments[i]], answer[segments[i]], time[segments[j]], answer[segments[j]]
+
+
+def dominance_intervals(inputtrace: np.ndarray, inputtest: str) -> np.ndarray:
+    """
+    Computes the intervals in which an approach produced more answers than another approach for a specific test.
+
+    For every pair of approaches, the time frame of the test is split into the intervals in which one of the
+    approaches is ahead, i.e., its answer trace is above the answer trace of the other approach.
+    As for **dief@t**, the answer traces are linearly interpolated between the answers and continued until the end of
+    the time frame, i.e., until the slowest approach finishes. Intervals in which both answer traces are equal are omitted.
+
+    :param inputtrace: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
+    :param inputtest: Specifies the specific test to analyze from the answer trace.
+    :return: Dataframe with the intervals. Attributes of the dataframe: test, approach1, approach2, start, end, leader.
+
+    **Examples**
+
+    >>> dominance_intervals(traces, "Q9.sparql")
+    """
+    results = inputtrace[inputtrace['test'] == inputtest]
+    end = np.max(results['time'])
+
+    rows = []
+    with stage('auc', inputtest, len(results)):
+        for a1, a2, t1, y1, t2, y2 in _pairs(results):
+            starts, ends, signs = _dominance(t1, y1, t2, y2, end)
+            rows.extend((inputtest, a1, a2, s, e, a1 if sign > 0 else a2)
+                        for s, e, sign in zip(starts, ends, signs) if sign != 0)
+
+    return np.array(rows, dtype=[('test', inputtrace['test'].dtype),
+                                 ('approach1', inputtrace['approach'].dtype),
+                                 ('approach2', inputtrace['approach'].dtype),
+                                 ('start', float),
+                                 ('end', float),
+                                 ('leader', inputtrace['approach'].dtype)])
+
+
+def crossover_times(inputtrace: np.ndarray, inputtest: str) -> np.ndarray:
+    """
+    Computes the points in time when an approach overtakes another approach for a specific test.
+
+    For every pair of approaches, a crossover happens when the approach that produced fewer answers so far
+    starts producing more answers than the other approach. The answer traces are linearly interpolated between the
+    answers, hence, the crossover times are exact w.r.t. the answer traces used for computing **dief@t**.
+
+    :param inputtrace: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
+    :param inputtest: Specifies the specific test to analyze from the answer trace.
+    :return: Dataframe with the crossovers. Attributes of the dataframe: test, approach1, approach2, time, leader.
+             The leader is the approach that is ahead after the crossover.
+
+    **Examples**
+
+    >>> crossover_times(traces, "Q9.sparql")
+    """
+    intervals = dominance_intervals(inputtrace, inputtest)
+    same_pair = np.r_[False, (intervals['approach1'][1:] == intervals['approach1'][:-1]) &
+                             (intervals['approach2'][1:] == intervals['approach2'][:-1])]
+    overtake = same_pair & np.r_[False, intervals['leader'][1:] != intervals['leader'][:-1]]
+    crossovers = intervals[overtake]
+
+    df = np.empty(shape=len(crossovers), dtype=[('test', inputtrace['test'].dtype),
+                                                ('approach1', inputtrace['approach'].dtype),
+                                                ('approach2', inputtrace['approach'].dtype),
+                                                ('time', float),
+                                                ('leader', inputtrace['approach'].dtype)])
+    for field in ['test', 'approach1', 'approach2', 'leader']:
+        df[field] = crossovers[field]
+    df['time'] = crossovers['start']
+    return df
+
+
+def dominance_matrix(inputtrace: np.ndarray):
+    """
+    Summarizes the pairwise dominance of the approaches across all tests.
+
+    For each pair of approaches *i* and *j*, the matrix contains the share of the time frames of all tests
+    in which approach *i* produced more answers than approach *j* (attribute *lead*) as well as the total
+    number of times approach *i* overtook approach *j* (attribute *crossovers*).
+    Only tests for which both approaches have an answer trace are considered.
+
+    :param inputtrace: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
+    :return: Tuple (approaches, matrix) with the sorted names of the approaches and the square matrix with the
+             attributes lead and crossovers.
+
+    **Examples**
+
+    >>> approaches, matrix = dominance_matrix(traces)
+    >>> matrix['lead']
+    """
+    approaches = np.unique(inputtrace['approach'])
+    n = len(approaches)
+    lead = np.zeros((n, n), dtype=float)
+    crossovers = np.zeros((n, n), dtype=int)
+    duration = np.zeros((n, n), dtype=float)
+
+    for test in np.unique(inputtrace['test']):
+        results = inputtrace[inputtrace['test'] == test]
+        end = np.max(results['time'])
+        for a1, a2, t1, y1, t2, y2 in _pairs(results):
+            i, j = np.searchsorted(approaches, [a1, a2])
+            starts, ends, signs = _dominance(t1, y1, t2, y2, end)
+            lengths = ends - starts
+            lead[i, j] += lengths[signs > 0].sum()
+            lead[j, i] += lengths[signs < 0].sum()
+            duration[i, j] = duration[j, i] = duration[i, j] + lengths.sum()
+            leaders = signs[signs != 0]
+            overtakes = np.flatnonzero(leaders[1:] != leaders[:-1]) + 1
+            crossovers[i, j] += (leaders[overtakes] > 0).sum()
+            crossovers[j, i] += (leaders[overtakes] < 0).sum()
+
+    matrix = np.zeros((n, n), dtype=[('lead', float), ('crossovers', int)])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        matrix['lead'] = np.where(duration > 0, lead / duration, 0.0)
+    matrix['crossovers'] = crossovers
+    return approaches, matrix
+
+
+def time_to_k(inputtrace: np.ndarray, k=None, fractions=None, keys: tuple = KEYS) -> np.ndarray:
+    """
+    Computes the time when each approach produced its *k*-th answer for all tests at once.
+
+    This is the inverse of the answer trace. Either numbers of answers *k* or completeness *fractions* are given;
+    a fraction refers to the number of answers produced by the approach in the test, e.g., 0.5 for the time when half
+    of its answers were produced. If an approach did not produce *k* answers, the time is NaN. A fractional *k* is
+    rounded up to the next answer.
+
+    :param inputtrace: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
+                       The answer trace may be compressed with ``compress_trace``.
+    :param k: Number or list of numbers of answers.
+    :param fractions: Fraction or list of fractions of the answers in [0.0;1.0].
+    :param keys: Attributes identifying an answer trace.
+    :return: Dataframe with one row per answer trace and value of *k* or *fractions*.
+             Attributes of the dataframe: *keys*, k (or fraction), time.
+
+    **Examples**
+
+    >>> time_to_k(traces, k=[1, 10, 100])
+    >>> time_to_k(traces, fractions=[0.1, 0.5, 0.9])
+    """
+    if (k is None) == (fractions is None):
+        raise ValueError('either k or fractions has to be given')
+    values = np.atleast_1d(np.asarray(k if fractions is None else fractions, dtype=float))
+
+    with stage('time_to_k', rows=len(inputtrace)):
+        groups, order, starts = _group_traces(inputtrace, keys)
+        answer = inputtrace['answer'][order]
+        time = inputtrace['time'][order]
+        ngroups, nvalues = len(groups), len(values)
+
+        segments = np.repeat(np.arange(ngroups), nvalues)
+        targets = np.tile(values, ngroups)
+        if fractions is not None:
+            # The number of answers of a group is its last answer.
+            produced = answer[np.maximum(starts[1:] - 1, 0)]
+            targets = np.maximum(np.ceil(targets * produced[segments] - 1e-9), 1)
+        elif np.issubdtype(answer.dtype, np.integer):
+            # The k-th answer for a fractional k is the next whole answer, e.g., the third for k=2.5.
+            targets = np.ceil(targets)
+
+        # The k-th answer is the first row with an answer of at least k.
+        position = get_backend().segment_searchsorted(answer, starts, segments, targets, 'left')
+        reached = position < starts[segments + 1]
+
+        column = 'k' if fractions is None else 'fraction'
+        df = _keyed_result(inputtrace, keys, groups, [(column, float), ('time', float)], nvalues)
+        df[column] = np.tile(values, ngroups)
+        df['time'] = np.where(reached, time[np.minimum(position, len(time) - 1)] if len(time) else np.nan, np.nan)
+    return df
+
+
+def _gaps(inputtrace: np.ndarray, keys: tuple = KEYS):
+    """
+    Computes the gaps between consecutive answers of each answer trace.
+
+    :return: Tuple (groups, gap_starts, group, start, end) with the sorted values of the keys, the offsets of the gaps
+             of each group, and for each gap its group as well as the times of the answers before and after the gap.
+    """
+    groups, order, starts = _group_traces(inputtrace, keys)
+    time = inputtrace['time'][order].astype(float)
+    group = np.repeat(np.arange(len(groups)), np.diff(starts))
+    # Gaps within a group; the differences between the last and first answer of two groups are dropped.
+    within = group[1:] == group[:-1] if len(time) else np.zeros(0, dtype=bool)
+    gap_starts = np.concatenate([[0], np.cumsum(np.maximum(np.diff(starts) - 1, 0))]).astype(np.intp)
+    return groups, gap_starts, group[1:][within], time[:-1][within], time[1:][within]
+
+
+def answer_gaps(inputtrace: np.ndarray, percentiles=(50, 90, 99), keys: tuple = KEYS) -> np.ndarray:
+    """
+    Summarizes the gaps between consecutive answers of each test and approach.
+
+    Long gaps indicate that an approach stalled, i.e., it did not produce answers for some time.
+    The percentiles of the gaps are interpolated linearly like ``numpy.percentile``.
+
+    :param inputtrace: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
+    :param percentiles: Percentiles of the gaps to compute.
+    :param keys: Attributes identifying an answer trace.
+    :return: Dataframe with one row per answer trace. Attributes of the dataframe: *keys*, gaps (number of
+             gaps), maxgap, maxgap_start (time of the answer before the longest gap), meangap, and gap<p> for each
+             percentile *p*, e.g., gap90.
+
+    **Examples**
+
+    >>> answer_gaps(traces)
+    >>> answer_gaps(traces, percentiles=[95, 99.9])
+    """
+    percentiles = np.atleast_1d(np.asarray(percentiles, dtype=float))
+    with stage('gaps', rows=len(inputtrace)):
+        groups, gap_starts, group, start, end = _gaps(inputtrace, keys)
+        gaps = end - start
+        n = np.diff(gap_starts)
+        has_gaps = n > 0
+
+        # Sort the gaps within each group; the groups are already contiguous.
+        order = np.lexsort((gaps, group))
+        sorted_gaps = gaps[order]
+
+        names = ['gap%s' % ('%g' % p).replace('.', '_') for p in percentiles]
+        df = _keyed_result(inputtrace, keys, groups, [('gaps', int),
+                                                      ('maxgap', float),
+                                                      ('maxgap_start', float),
+                                                      ('meangap', float)] + [(name, float) for name in names])
+        df['gaps'] = n
+        last = np.maximum(gap_starts[1:] - 1, 0)
+        df['maxgap'] = np.where(has_gaps, sorted_gaps[last] if len(gaps) else 0.0, np.nan)
+        df['maxgap_start'] = np.where(has_gaps, start[order][last] if len(gaps) else 0.0, np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            df['meangap'] = np.where(has_gaps, _segment_sum(gaps, gap_starts) / n, np.nan)
+        for p, name in zip(percentiles, names):
+            position = p / 100.0 * np.maximum(n - 1, 0)
+            lower = np.floor(position).astype(np.intp)
+            upper = np.minimum(lower + 1, np.maximum(n - 1, 0))
+            fraction = position - lower
+            if len(gaps):
+                low = sorted_gaps[np.minimum(gap_starts[:-1] + lower, len(gaps) - 1)]
+                high = sorted_gaps[np.minimum(gap_starts[:-1] + upper, len(gaps) - 1)]
+                df[name] = np.where(has_gaps, low + (high - low) * fraction, np.nan)
+            else:
+                df[name] = np.nan
+    return df
+
+
+def stall_intervals(inputtrace: np.ndarray, min_gap: float, top: int = None, keys: tuple = KEYS) -> np.ndarray:
+    """
+    Finds the intervals in which the approaches stalled, i.e., did not produce answers for at least *min_gap*.
+
+    :param inputtrace: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
+    :param min_gap: Minimum length of a gap between two answers to be reported as stall.
+    :param top: (optional) Only report the *top* longest stalls; by default, all stalls are reported in the order of
+                the answer traces and time.
+    :param keys: Attributes identifying an answer trace.
+    :return: Dataframe with the stalls. Attributes of the dataframe: *keys*, start, end, duration.
+
+    **Examples**
+
+    >>> stall_intervals(traces, 1.0)
+    >>> stall_intervals(traces, 0.5, top=10)
+    """
+    with stage('gaps', rows=len(inputtrace)):
+        groups, _, group, start, end = _gaps(inputtrace, keys)
+        stalls = np.flatnonzero(end - start >= min_gap)
+        if top is not None:
+            stalls = stalls[np.argsort(-(end - start)[stalls], kind='stable')[:top]]
+        df = _keyed_result(inputtrace, keys, groups[group[stalls]], [('start', float),
+                                                                     ('end', float),
+                                                                     ('duration', float)])
+        df['start'] = start[stalls]
+        df['end'] = end[stalls]
+        df['duration'] = end[stalls] - start[stalls]
+    return df
+
+
+def answer_rate_profile(inputtrace: np.ndarray, bins: int = 50, per_test: bool = False):
+    """
+    Computes the answer rate over time, i.e., the answers produced per time unit, for all tests and approaches.
+
+    The time frame of the tests is divided into *bins* bins of equal width starting at time 0.
+    By default, all tests share the same time grid which ends with the slowest test;
+    with *per_test*, the grid of each test ends when its slowest approach finishes.
+    The answers of all tests and approaches are counted in a single pass.
+
+    :param inputtrace: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
+                       The answer trace may be compressed with ``compress_trace``.
+    :param bins: Number of time bins.
+    :param per_test: Indicates whether each test uses its own time grid.
+    :return: Tuple (tests, approaches, edges, rates) with the sorted names of the tests and approaches, the bin edges
+             (shape (bins+1,) or (tests, bins+1) if per_test is set), and the answer rates with shape
+             (tests, approaches, bins).
+
+    **Examples**
+
+    >>> tests, approaches, edges, rates = answer_rate_profile(traces)
+    >>> tests, approaches, edges, rates = answer_rate_profile(traces, bins=100, per_test=True)
+    """
+    with stage('profile', rows=len(inputtrace)):
+        tests, test_codes = np.unique(inputtrace['test'], return_inverse=True)
+        approaches, approach_codes = np.unique(inputtrace['approach'], return_inverse=True)
+        time = inputtrace['time']
+
+        if per_test:
+            end = np.zeros(len(tests), dtype=float)
+            np.maximum.at(end, test_codes, time)
+        else:
+            end = np.full(len(tests), np.max(time) if len(time) else 0.0, dtype=float)
+        end[end <= 0] = 1.0
+        width = end / bins
+
+        # Assign each answer to its bin; answers produced at the end belong to the last bin.
+        b = np.minimum((time / width[test_codes]).astype(np.intp), bins - 1)
+        flat = (test_codes * len(approaches) + approach_codes) * bins + b
+        weights = inputtrace['count'] if 'count' in inputtrace.dtype.names else None
+        counts = np.bincount(flat, weights=weights, minlength=len(tests) * len(approaches) * bins)
+
+        rates = counts.reshape(len(tests), len(approaches), bins) / width[:, None, None]
+        edges = np.linspace(0, 1, bins + 1) * (end[:, None] if per_test else end[0])
+    return tests, approaches, edges, rates
+
+
+def plot_answer_trace(inputtrace: np.ndarray, inputtest: str, colors: list = DEFAULT_COLORS,
+                      stalls: float = None) -> 'Figure':
     """
     Plots the answer trace of a given test for all approaches.
 
@@ -185,13 +1295,17 @@ def plot_answer_trace(inputtrace: np.ndarray, inputtest: str, colors: list = DEF
     :param inputtrace: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
     :param inputtest: Specifies the specific test to analyze from the answer trace.
     :param colors: List of colors to use for the different approaches.
+    :param stalls: (optional) If set, the stalls of at least this length (see ``stall_intervals``) are highlighted.
     :return: Plot of the answer traces of each approach when evaluating the input test.
 
     **Examples**
 
     >>> plot_answer_trace(traces, "Q9.sparql")
     >>> plot_answer_trace(traces, "Q9.sparql", ["#ECC30B","#D56062","#84BCDA"])
+    >>> plot_answer_trace(traces, "Q9.sparql", stalls=0.5)
     """
+    import matplotlib.pyplot as plt
+
     # Obtain test and approaches to compare.
     results = inputtrace[inputtrace['test'] == inputtest]
     approaches = np.unique(inputtrace['approach'])
@@ -199,18 +1313,23 @@ def plot_answer_trace(inputtrace: np.ndarray, inputtest: str, colors: list = DEF
     color_map = dict(zip(approaches, colors))
 
     # Generate plot.
-    fig, ax = plt.subplots(figsize=(10, 6), dpi=100)
-    for a in approaches:
-        subtrace = results[results['approach'] == a]
-        if subtrace.size == 0:
-            continue
-        plt.plot(subtrace['time'], subtrace['answer'], color=color_map[a], label=a, marker='o', markeredgewidth=0.0, linestyle='None')
+    with stage('plot', inputtest, len(results)):
+        fig, ax = plt.subplots(figsize=(10, 6), dpi=100)
+        for a in approaches:
+            subtrace = results[results['approach'] == a]
+            if subtrace.size == 0:
+                continue
+            plt.plot(subtrace['time'], subtrace['answer'], color=color_map[a], label=a, marker='o', markeredgewidth=0.0, linestyle='None')
 
-    plt.xlabel('Time')
-    plt.ylabel('# Answers Produced')
-    plt.legend(loc='upper left')
-    plt.title(inputtest, fontsize=16, loc="center", pad=20)
-    plt.tight_layout()
+        if stalls is not None:
+            for stall in stall_intervals(results, stalls):
+                ax.axvspan(stall['start'], stall['end'], color=color_map[stall['approach']], alpha=0.2, linewidth=0)
+
+        plt.xlabel('Time')
+        plt.ylabel('# Answers Produced')
+        plt.legend(loc='upper left')
+        plt.title(inputtest, fontsize=16, loc="center", pad=20)
+        plt.tight_layout()
 
     return fig
 
@@ -267,7 +1386,7 @@ def sorted_alphanumeric(list_):
     return sorted(list_, key=alphanumeric_key)
 
 
-def plot_execution_time(metrics: np.ndarray, colors: list = DEFAULT_COLORS, log_scale: bool = False) -> Figure:
+def plot_execution_time(metrics: np.ndarray, colors: list = DEFAULT_COLORS, log_scale: bool = False) -> 'Figure':
     """
     Creates a bar chart with the overall *execution time* for all the tests and approaches in the metrics data.
 
@@ -286,59 +1405,144 @@ def plot_execution_time(metrics: np.ndarray, colors: list = DEFAULT_COLORS, log_
     >>> plot_execution_time(metrics, log_scale=True)
     >>> plot_execution_time(metrics, ["#ECC30B","#D56062","#84BCDA"], log_scale=True)
     """
+    import matplotlib.pyplot as plt
+
     # Obtain test and approaches to compare.
-    approaches = np.unique(metrics['approach'])
-    tests = sorted_alphanumeric(np.unique(metrics['test']))
+    tests, approaches, pivot = pivot_metrics(metrics)
+    order = np.searchsorted(tests, sorted_alphanumeric(tests))
+    tests = tests[order].tolist()
+    totaltime = np.nan_to_num(pivot['totaltime'][order])
 
     color_map = dict(zip(approaches, colors))
 
-    fig, ax = plt.subplots(figsize=(0.95*len(tests), 5), dpi=100)
-    fig.subplots_adjust(top=0.85, bottom=0.25, left=0.08)
+    with stage('plot', rows=len(metrics)):
+        fig, ax = plt.subplots(figsize=(0.95*len(tests), 5), dpi=100)
+        fig.subplots_adjust(top=0.85, bottom=0.25, left=0.08)
+
+        index = np.arange(len(tests))
+        bar_width = 0.8 / len(approaches)
+
+        # Compute x position of bar.
+        def compute_x_pos(number_approaches: int, approach_pos: int) -> float:
+            lower = -0.4 + bar_width / 2
+            upper = 0.4 - bar_width / 2
+            return lower + approach_pos*(upper - lower)/(number_approaches-1)
+
+        # Generate plot.
+        for a_num, a in enumerate(approaches):
+            offset = compute_x_pos(len(approaches), a_num)
+            ax.set_xlim(-0.4, len(tests)-0.6)
+            plt.bar(index + offset, totaltime[:, a_num], bar_width, color=color_map[a], label=a)
+
+        plt.xticks(range(0, len(tests)), tests, rotation=90)
+        ax.set_xlabel("Performed Test", fontsize='large', labelpad=10)
+        ax.set_ylabel("Execution Time [s]", fontsize='large')
+        ax.legend(approaches, bbox_to_anchor=(1, 1), loc="upper left", labelspacing=0.1, fontsize='medium', frameon=False)
+        plt.title("Execution Time for Performed Tests", fontsize=16, loc="center", pad=10)
+        if log_scale:
+            ax.set_yscale('log')
+        plt.tight_layout()
 
-    index = np.arange(len(tests))
-    bar_width = 0.8 / len(approaches)
+    return fig
 
-    # Compute x position of bar.
-    def compute_x_pos(number_approaches: int, approach_pos: int) -> float:
-        lower = -0.4 + bar_width / 2
-        upper = 0.4 - bar_width / 2
-        return lower + approach_pos*(upper - lower)/(number_approaches-1)
 
-    # Generate plot.
-    a_num = -1
-    for a in approaches:
-        a_num += 1
-        submetrics = metrics[metrics['approach'] == a]
-        tests_in_approach = np.unique(submetrics['test'])
-
-        results = []
-        for t in tests:
-            if t not in tests_in_approach:
-                results.append(0.0)
-            else:
-                results.append(submetrics[submetrics['test'] == t]['totaltime'][0])
+def plot_answer_rate_profile(tests: np.ndarray, approaches: np.ndarray, edges: np.ndarray, rates: np.ndarray) -> 'Figure':
+    """
+    Plots the answer rate profiles of all tests as heatmaps; one heatmap per approach.
+
+    Each row of a heatmap shows the answer rate of a test over time; dips in the throughput appear as dark areas.
+    If each test uses its own time grid, the x-axis shows the share of the time frame of the test.
 
-        offset = compute_x_pos(len(approaches), a_num)
-        ax.set_xlim(-0.4, len(tests)-0.6)
-        plt.bar(index + offset, results, bar_width, color=color_map[a], label=a)
+    :param tests: Names of the tests as returned by ``answer_rate_profile``.
+    :param approaches: Names of the approaches as returned by ``answer_rate_profile``.
+    :param edges: Bin edges as returned by ``answer_rate_profile``.
+    :param rates: Answer rates as returned by ``answer_rate_profile``.
+    :return: Plot with one heatmap per approach.
 
-    plt.xticks(range(0, len(tests)), tests, rotation=90)
-    ax.set_xlabel("Performed Test", fontsize='large', labelpad=10)
-    ax.set_ylabel("Execution Time [s]", fontsize='large')
-    ax.legend(approaches, bbox_to_anchor=(1, 1), loc="upper left", labelspacing=0.1, fontsize='medium', frameon=False)
-    plt.title("Execution Time for Performed Tests", fontsize=16, loc="center", pad=10)
-    if log_scale:
-        ax.set_yscale('log')
-    plt.tight_layout()
+    **Examples**
+
+    >>> plot_answer_rate_profile(*answer_rate_profile(traces))
+    """
+    import matplotlib.pyplot as plt
+
+    per_test = edges.ndim == 2
+    extent = [0, 1 if per_test else edges[-1], len(tests), 0]
+
+    with stage('plot', rows=rates.size):
+        fig, axes = plt.subplots(1, len(approaches), figsize=(5 * len(approaches), 1 + 0.4 * len(tests)),
+                                 dpi=100, sharey=True, squeeze=False)
+        image = None
+        for ax, a, r in zip(axes[0], approaches, np.moveaxis(rates, 1, 0)):
+            image = ax.imshow(r, aspect='auto', interpolation='nearest', extent=extent, vmin=0, vmax=rates.max())
+            ax.set_title(a, fontsize='large')
+            ax.set_xlabel('Share of Time' if per_test else 'Time')
+        axes[0][0].set_yticks(np.arange(len(tests)) + 0.5)
+        axes[0][0].set_yticklabels(tests)
+        if image is not None:
+            fig.colorbar(image, ax=axes[0].tolist(), label='Answers per Time Unit')
 
     return fig
 
 
+def open_file(filename: str, mode: str = 'rt'):
+    """
+    Opens a file that is possibly compressed with gzip, bzip2, or xz.
+
+    When reading, the compression is detected from the magic bytes at the beginning of the file.
+    When writing, the compression is chosen based on the file extension: *.gz*, *.bz2*, *.xz*, or *.lzma*.
+    The file is decompressed or compressed while streaming, i.e., no temporary files are created.
+
+    :param filename: Path to the file.
+    :param mode: Mode to open the file in, e.g., 'rt' or 'wt'.
+    :return: File object.
+
+    **Examples**
+
+    >>> open_file("data/traces.csv.gz")
+    >>> open_file("traces.csv.xz", "wt")
+    """
+    text = 'b' not in mode
+    kwargs = {'encoding': 'utf8'} if text else {}
+    if 'r' in mode:
+        with open(filename, 'rb') as f:
+            magic = f.read(max(len(m) for m in _COMPRESSION_MAGIC))
+        for m, module in _COMPRESSION_MAGIC.items():
+            if magic.startswith(m):
+                return module.open(filename, mode if text else 'rb', **kwargs)
+    else:
+        for extension, module in _COMPRESSION_EXTENSIONS.items():
+            if str(filename).endswith(extension):
+                return module.open(filename, mode, **kwargs)
+    return open(filename, mode, **kwargs)
+
+
+def _read_csv(filename) -> np.ndarray:
+    """Reads a (possibly compressed) CSV file with a header into a dataframe."""
+    # names=True is not an error, it is valid for reading the column names from the data
+    if not isinstance(filename, (str, os.PathLike)):
+        file = contextlib.nullcontext(filename)
+    else:
+        file = open_file(filename)
+    with file as f:
+        if np.__version__ >= '1.23.0':
+            return np.genfromtxt(f, delimiter=',', names=True, dtype=None, encoding="utf8", ndmin=1)
+        else:
+            return np.genfromtxt(f, delimiter=',', names=True, dtype=None, encoding="utf8")
+
+
+def _write_csv(df: np.ndarray, filename: str):
+    """Writes a dataframe to a CSV file with a header; compressed depending on the file extension."""
+    with open_file(filename, 'wt') as f:
+        f.write(','.join(df.dtype.names) + '\n')
+        np.savetxt(f, df, fmt='%s', delimiter=',')
+
+
 def load_trace(filename: str) -> np.ndarray:
     """
     Reads answer traces from a CSV file.
 
     Answer traces record the points in time when an approach produces an answer.
+    The file may be compressed with gzip, bzip2, or xz; it is decompressed while reading.
     The attribues of the file specified in the header are expected to be:
 
     * *test*: the name of the executed test
@@ -346,6 +1550,8 @@ def load_trace(filename: str) -> np.ndarray:
     * *answer*: the number of the answer produced
     * *time*: time elapsed from the start of the execution until the generation of the answer
 
+    Integer times, e.g., nanoseconds from ``time.perf_counter_ns``, are kept as int64 without loss of precision.
+
     :param filename: Path to the CSV file that contains the answer traces.
                      Attributes of the file specified in the header: test, approach, answer, time.
     :return: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
@@ -353,23 +1559,141 @@ def load_trace(filename: str) -> np.ndarray:
     **Examples**
 
     >>> load_trace("data/traces.csv")
+    >>> load_trace("data/traces.csv.gz")
     """
     # Loading data.
-    # names=True is not an error, it is valid for reading the column names from the data
-    if np.__version__ >= '1.23.0':
-        df = np.genfromtxt(filename, delimiter=',', names=True, dtype=None, encoding="utf8", ndmin=1)
-    else:
-        df = np.genfromtxt(filename, delimiter=',', names=True, dtype=None, encoding="utf8")
+    with stage('load_trace') as s:
+        df = _read_csv(filename)
+        s.add_rows(df.size)
 
     # Return dataframe in order.
     return df[['test', 'approach', 'answer', 'time']]
 
 
+def load_trace_jsonl(filename: str, fields: dict = None, where: dict = None, chunk_size: int = 65536) -> np.ndarray:
+    """
+    Reads answer traces from a log of answer events in the JSON Lines format.
+
+    Each line of the file is a JSON object describing an event. The attributes of the answer trace are extracted
+    from the events according to *fields*; nested attributes are given as dot-separated paths, e.g., *query.name*.
+    If the number of the answer is missing in an event, the answer is numbered in the order of the events per
+    test and approach, i.e., it follows the previous answer of the test and approach. Lines that are not valid JSON,
+    e.g., a line truncated by a crash while writing the log, are skipped with a warning.
+    The file may be compressed with gzip, bzip2, or xz; it is decompressed while reading.
+    Events are collected in preallocated chunks of numeric arrays; the names of tests and approaches are stored once.
+
+    :param filename: Path to the JSON Lines file with the answer events.
+    :param fields: (optional) Mapping from the attributes test, approach, answer, and time to the paths of the
+                   attributes in the events; by default, the attributes have the same names in the events.
+                   If answer is mapped to ``None``, the answers are numbered in the order of the events.
+    :param where: (optional) Mapping from paths to values; only events with these values are read,
+                  e.g., ``{"event": "answer"}``.
+    :param chunk_size: Number of events per preallocated chunk.
+    :return: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
+
+    **Examples**
+
+    >>> load_trace_jsonl("events.jsonl.gz")
+    >>> load_trace_jsonl("events.jsonl", {"test": "query.name", "approach": "engine", "answer": None, "time": "ts"},
+    ...                  where={"event": "answer"})
+    """
+    paths = {'test': 'test', 'approach': 'approach', 'answer': 'answer', 'time': 'time'}
+    paths.update(fields or {})
+    paths = {name: None if path is None else tuple(path.split('.')) for name, path in paths.items()}
+    conditions = [(tuple(path.split('.')), value) for path, value in (where or {}).items()]
+
+    def get(event, path):
+        for key in path:
+            event = event[key]
+        return event
+
+    names = {'test': {}, 'approach': {}}
+    chunks = []
+    codes = np.empty((chunk_size, 2), dtype=np.int64)
+    answer = np.empty(chunk_size, dtype=np.int64)
+    present = np.zeros(chunk_size, dtype=bool)
+    time = np.empty(chunk_size, dtype=np.int64)
+    integer_time = True
+    n = 0
+
+    with stage('load_trace') as s:
+        with open_file(filename) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    logger.warning('Ignoring malformed line in %s: %r', filename, line)
+                    continue
+                try:
+                    if any(get(event, path) != value for path, value in conditions):
+                        continue
+                    test = get(event, paths['test'])
+                    approach = get(event, paths['approach'])
+                    t = get(event, paths['time'])
+                except (KeyError, TypeError):
+                    # Not an answer event.
+                    continue
+                if paths['answer'] is not None:
+                    try:
+                        answer[n] = get(event, paths['answer'])
+                        present[n] = True
+                    except (KeyError, TypeError):
+                        present[n] = False
+                if integer_time and not isinstance(t, int):
+                    integer_time = False
+                    time = time.astype(float)
+                time[n] = t
+                codes[n, 0] = names['test'].setdefault(test, len(names['test']))
+                codes[n, 1] = names['approach'].setdefault(approach, len(names['approach']))
+                n += 1
+                if n == chunk_size:
+                    chunks.append((codes, answer, time, present))
+                    codes = np.empty((chunk_size, 2), dtype=np.int64)
+                    answer = np.empty(chunk_size, dtype=np.int64)
+                    present = np.zeros(chunk_size, dtype=bool)
+                    time = np.empty(chunk_size, dtype=time.dtype)
+                    n = 0
+        chunks.append((codes[:n], answer[:n], time[:n], present[:n]))
+        codes = np.concatenate([c[0] for c in chunks])
+        time = np.concatenate([c[2].astype(float if not integer_time else np.int64) for c in chunks])
+        s.add_rows(len(time))
+
+    tests = np.array(list(names['test']) or [''], dtype=str)
+    approaches = np.array(list(names['approach']) or [''], dtype=str)
+    df = np.empty(len(time), dtype=[('test', tests.dtype),
+                                    ('approach', approaches.dtype),
+                                    ('answer', int),
+                                    ('time', time.dtype)])
+    df['test'] = tests[codes[:, 0]]
+    df['approach'] = approaches[codes[:, 1]]
+    df['time'] = time
+    answer = np.concatenate([c[1] for c in chunks])
+    present = np.concatenate([c[3] for c in chunks])
+    if present.all():
+        df['answer'] = answer
+    else:
+        # Number the missing answers in the order of the events per test and approach, following the previous answer.
+        group = codes[:, 0] * len(approaches) + codes[:, 1]
+        order = np.argsort(group, kind='stable')
+        starts = np.flatnonzero(np.r_[True, group[order][1:] != group[order][:-1]])
+        first = np.repeat(starts, np.diff(np.r_[starts, len(group)]))
+        answer, present = answer[order], present[order]
+        position = np.arange(len(group))
+        previous = np.maximum.accumulate(np.where(present, position, -1))
+        found = previous >= first
+        numbered = np.where(found, answer[np.maximum(previous, 0)], 0) + position - np.where(found, previous, first - 1)
+        df['answer'][order] = np.where(present, answer, numbered)
+    return df
+
+
 def load_metrics(filename: str) -> np.ndarray:
     """
     Reads the other metrics from a CSV file.
 
     Conventional query performance measurements.
+    The file may be compressed with gzip, bzip2, or xz; it is decompressed while reading.
     The attribues of the file specified in the header are expected to be:
 
     * *test*: the name of the executed test
@@ -387,17 +1711,65 @@ def load_metrics(filename: str) -> np.ndarray:
     >>> load_trace("data/metrics.csv")
     """
     # Loading data.
-    # names=True is not an error, it is valid for reading the column names from the data
-    if np.__version__ >= '1.23.0':
-        df = np.genfromtxt(filename, delimiter=',', names=True, dtype=None, encoding="utf8", ndmin=1)
-    else:
-        df = np.genfromtxt(filename, delimiter=',', names=True, dtype=None, encoding="utf8")
+    with stage('load_metrics') as s:
+        df = _read_csv(filename)
+        s.add_rows(df.size)
 
     # Return dataframe in order.
     return df[['test', 'approach', 'tfft', 'totaltime', 'comp']]
 
 
-def performance_of_approaches_with_dieft(traces: np.ndarray, metrics: np.ndarray, continue_to_end: bool = True) -> np.ndarray:
+def save_trace(inputtrace: np.ndarray, filename: str):
+    """
+    Writes answer traces to a CSV file that can be read with ``load_trace``.
+
+    The file is compressed with gzip, bzip2, or xz if the file name ends with *.gz*, *.bz2*, or *.xz*, respectively.
+
+    :param inputtrace: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
+    :param filename: Path to the CSV file to write.
+
+    **Examples**
+
+    >>> save_trace(traces, "traces.csv")
+    >>> save_trace(traces, "traces.csv.xz")
+    """
+    with stage('save_trace', rows=len(inputtrace)):
+        _write_csv(inputtrace[['test', 'approach', 'answer', 'time']], filename)
+
+
+def save_metrics(metrics: np.ndarray, filename: str):
+    """
+    Writes the other metrics to a CSV file that can be read with ``load_metrics``.
+
+    The file is compressed with gzip, bzip2, or xz if the file name ends with *.gz*, *.bz2*, or *.xz*, respectively.
+
+    :param metrics: Dataframe with the other metrics. Attributes of the dataframe: test, approach, tfft, totaltime, comp.
+    :param filename: Path to the CSV file to write.
+
+    **Examples**
+
+    >>> save_metrics(metrics, "metrics.csv.gz")
+    """
+    with stage('save_metrics', rows=len(metrics)):
+        _write_csv(metrics[['test', 'approach', 'tfft', 'totaltime', 'comp']], filename)
+
+
+def _conventional_metrics(df: np.ndarray, submetric: np.ndarray, time_scale: float):
+    """Sets the conventional metrics and their inverses in *df*, converting the times with *time_scale*."""
+    tfft = submetric['tfft'] * time_scale
+    totaltime = submetric['totaltime'] * time_scale
+    df['tfft'] = tfft
+    df['totaltime'] = totaltime
+    df['comp'] = submetric['comp']
+    with np.errstate(divide='ignore'):
+        df['throughput'] = submetric['comp'] / totaltime
+        df['invtfft'] = 1 / tfft
+        df['invtotaltime'] = 1 / totaltime
+
+
+def performance_of_approaches_with_dieft(traces: np.ndarray, metrics: np.ndarray, continue_to_end: bool = True,
+                                         store=None, sketch_size: int = None, keys: tuple = KEYS,
+                                         time_scale: float = 1.0, sketch: np.ndarray = None) -> np.ndarray:
     """
     Compares **dief@t** with other conventional metrics used in query performance analysis.
 
@@ -409,61 +1781,109 @@ def performance_of_approaches_with_dieft(traces: np.ndarray, metrics: np.ndarray
     :param metrics: Metrics dataframe with the result of the other metrics.
                     The structure is as follows: test, approach, tfft, totaltime, comp.
     :param continue_to_end: Indicates whether the AUC should be continued until the end of the time frame
+    :param store: (optional) :class:`diefpy.store.ResultStore` to reuse the dief@t values of unchanged answer traces from.
+    :param sketch_size: (optional) If set, dief@t is approximated from a sketch with at most *sketch_size* answers per test
+                        and approach (see ``sketch_trace``) and the error bound is added as attribute *dieft_error*.
+    :param keys: Attributes identifying an answer trace in the answer traces and the metrics; the last key identifies
+                 the compared approaches (see ``dieft_by``). Other keys than test and approach cannot be combined with
+                 *store*, *sketch_size*, and *sketch*.
+    :param time_scale: Factor converting the time unit of the answer traces and the metrics into the time unit of the
+                       result, e.g., 1e-9 for times in nanoseconds; all times of the result are converted, including
+                       tfft and totaltime.
+    :param sketch: (optional) Sketch of the answer traces created with ``sketch_trace``; like *sketch_size*, dief@t is
+                   approximated, but from the given sketch instead of sketching *traces* on each call.
     :return: Dataframe with all the metrics.
              The structure is: test, approach, tfft, totaltime, comp, throughput, invtfft, invtotaltime, dieft
 
     **Examples**
 
     >>> performance_of_approaches_with_dieft(traces, metrics)
+    >>> performance_of_approaches_with_dieft(traces, metrics, store=ResultStore("results"))
+    >>> performance_of_approaches_with_dieft(traces, metrics, sketch_size=1000)
+    >>> performance_of_approaches_with_dieft(traces, metrics, sketch=sketch_trace(traces, 1000))
+    >>> performance_of_approaches_with_dieft(traces, metrics, keys=("test", "run", "approach"))
+    >>> performance_of_approaches_with_dieft(traces_ns, metrics_ns, time_scale=1e-9)
     """
+    tfft_dtype = np.result_type(metrics['tfft'], time_scale)
+    totaltime_dtype = np.result_type(metrics['totaltime'], time_scale)
+    approximate = sketch_size is not None or sketch is not None
+    if store is None and not approximate:
+        # Compute dief@t of all answer traces at once and join the metrics of the same keys.
+        dieft_res = dieft_by(traces, keys, continue_to_end=continue_to_end, time_scale=time_scale)
+        with stage('assemble', rows=len(dieft_res)):
+            # Answer traces without a row in the metrics are skipped.
+            j, found = _join(dieft_res, metrics, keys)
+            submetric = metrics[j]
+            df = _keyed_result(traces, keys, dieft_res[found], [('tfft', tfft_dtype),
+                                                                ('totaltime', totaltime_dtype),
+                                                                ('comp', metrics['comp'].dtype),
+                                                                ('throughput', float),
+                                                                ('invtfft', float),
+                                                                ('invtotaltime', float),
+                                                                ('dieft', float)])
+            _conventional_metrics(df, submetric, time_scale)
+            df['dieft'] = dieft_res['dieft'][found]
+        return df
+    if tuple(keys) != KEYS:
+        raise ValueError('results per %s cannot be stored or approximated' % ', '.join(keys))
+
     # Initialize output structure.
     df = np.empty(shape=0, dtype=[('test', traces['test'].dtype),
                                   ('approach', traces['approach'].dtype),
-                                  ('tfft', metrics['tfft'].dtype),
-                                  ('totaltime', metrics['totaltime'].dtype),
+                                  ('tfft', tfft_dtype),
+                                  ('totaltime', totaltime_dtype),
                                   ('comp', metrics['comp'].dtype),
                                   ('throughput', float),
                                   ('invtfft', float),
                                   ('invtotaltime', float),
                                   ('dieft', float)])
 
-    # Obtain tests and approaches.
+    # Obtain tests and approaches; the row of the metrics of each test and approach is looked up in a dense matrix.
     tests = np.unique(metrics['test'])
     approaches = np.unique(metrics['approach'])
+    pivot = np.full((len(tests), len(approaches)), -1, dtype=np.intp)
+    pivot[np.searchsorted(tests, metrics['test']), np.searchsorted(approaches, metrics['approach'])] = \
+        np.arange(len(metrics))
+
+    compute_dieft = dieft if store is None else store.dieft
+    if approximate:
+        if store is not None:
+            raise ValueError('approximated results cannot be stored')
+        traces = sketch if sketch is not None else sketch_trace(traces, sketch_size)
+        compute_dieft = dieft_approx
+    parts = [df]
+    errors = []
 
     # Compute metrics: dieft, throughput, inverse of execution time, inverse of time for the first tuple.
-    for t in tests:
-        subtrace = traces[traces['test'] == t]
-        dieft_res = dieft(subtrace, t, continue_to_end=continue_to_end)
-
-        for a in approaches:
-            if a not in np.unique(dieft_res['approach']):
-                continue
-
-            dieft_ = dieft_res[(dieft_res['approach'] == a) & (dieft_res['test'] == t)]['dieft'][0]
-            submetric = metrics[(metrics['approach'] == a) & (metrics['test'] == t)]
-
-            throughput = submetric['comp'][0] / submetric['totaltime'][0]
-            invtfft = 1 / submetric['tfft'][0]
-            invtotaltime = 1 / submetric['totaltime'][0]
-
-            res = np.array([(t, a, submetric['tfft'][0], submetric['totaltime'][0], submetric['comp'][0],
-                             throughput, invtfft, invtotaltime, dieft_)],
-                           dtype=[('test', submetric['test'].dtype),
-                                  ('approach', submetric['approach'].dtype),
-                                  ('tfft', submetric['tfft'].dtype),
-                                  ('totaltime', submetric['totaltime'].dtype),
-                                  ('comp', submetric['comp'].dtype),
-                                  ('throughput', float),
-                                  ('invtfft', float),
-                                  ('invtotaltime', float),
-                                  ('dieft', float)])
-            df = np.append(df, res, axis=0)
+    for i, t in enumerate(tests):
+        with stage('filter', t, len(traces)):
+            subtrace = traces[traces['test'] == t]
+        dieft_res = compute_dieft(subtrace, t, continue_to_end=continue_to_end)
+
+        with stage('assemble', t, len(dieft_res)):
+            # Join the dief@t values with the metrics of the same approach.
+            # Approaches without a row in the metrics are skipped.
+            j, found = _lookup(approaches, dieft_res['approach'])
+            found[found] = pivot[i, j[found]] >= 0
+            j, dieft_res = j[found], dieft_res[found]
+            submetric = metrics[pivot[i, j]]
+            res = np.empty(len(j), dtype=df.dtype)
+            res['test'] = t
+            res['approach'] = approaches[j]
+            _conventional_metrics(res, submetric, time_scale)
+            res['dieft'] = dieft_res['dieft'] * time_scale
+            if approximate:
+                errors.append(dieft_res['error'] * time_scale)
+            parts.append(res)
+    df = np.concatenate(parts)
+
+    if approximate:
+        df = rfn.append_fields(df, 'dieft_error', np.concatenate([np.empty(0)] + errors).astype(float), usemask=False)
 
     return df
 
 
-def plot_performance_of_approaches_with_dieft(allmetrics: np.ndarray, q: str, colors: list = DEFAULT_COLORS) -> Figure:
+def plot_performance_of_approaches_with_dieft(allmetrics: np.ndarray, q: str, colors: list = DEFAULT_COLORS) -> 'Figure':
     """
     Generates a radar plot that compares **dief@t** with conventional metrics for a specific test.
 
@@ -481,6 +1901,12 @@ def plot_performance_of_approaches_with_dieft(allmetrics: np.ndarray, q: str, co
     >>> plot_performance_of_approaches_with_dieft(extended_metrics, "Q9.sparql")
     >>> plot_performance_of_approaches_with_dieft(extended_metrics, "Q9.sparql", ["#ECC30B","#D56062","#84BCDA"])
     """
+    import matplotlib.lines as mlines
+    import matplotlib.pyplot as plt
+    import matplotlib.ticker as mticker
+
+    from diefpy.radaraxes import radar_factory
+
     # Initialize output structure.
     df = np.empty(shape=0, dtype=[('invtfft', allmetrics['invtfft'].dtype),
                                   ('invtotaltime', allmetrics['invtotaltime'].dtype),
@@ -521,30 +1947,31 @@ def plot_performance_of_approaches_with_dieft(allmetrics: np.ndarray, q: str, co
         row['dieft'] = row['dieft'] / maxs[4]
 
     # Plot metrics using spider plot.
-    df = df.tolist()
-    N = len(df[0])
-    theta = radar_factory(N, frame='polygon')
-    spoke_labels = ['(TFFT)^-1', '(ET)^-1       ', 'Comp', 'T', '     dief@t']
-    case_data = df
-    fig, ax = plt.subplots(figsize=(6, 6), subplot_kw=dict(projection='radar'))
-    fig.subplots_adjust(top=0.85, bottom=0.05)
-    ax.set_ylim(0, 1)
-    ticks_loc = ax.get_yticks()
-    ax.yaxis.set_major_locator(mticker.FixedLocator(ticks_loc))
-    ax.set_yticklabels("" for _ in ticks_loc)
-    legend_handles = []
-    for d, label in zip(case_data, labels):
-        legend_handles.append(mlines.Line2D([], [], color=color_map[label], ls='-', label=label))
-        ax.plot(theta, d, label=label, color=color_map[label], zorder=10, clip_on=False)
-        ax.fill(theta, d, label=label, facecolor=color_map[label], alpha=0.15)
-
-    ax.set_varlabels(spoke_labels)
-    ax.tick_params(labelsize=14)
-    ax.legend(handles=legend_handles, loc=(0.80, 0.90), labelspacing=0.1, fontsize='medium', frameon=False)
-
-    plt.setp(ax.spines.values(), color="grey")
-    plt.title(q, fontsize=16, loc="center", pad=30)
-    plt.tight_layout()
+    with stage('plot', q, len(labels)):
+        df = df.tolist()
+        N = len(df[0])
+        theta = radar_factory(N, frame='polygon')
+        spoke_labels = ['(TFFT)^-1', '(ET)^-1       ', 'Comp', 'T', '     dief@t']
+        case_data = df
+        fig, ax = plt.subplots(figsize=(6, 6), subplot_kw=dict(projection='radar'))
+        fig.subplots_adjust(top=0.85, bottom=0.05)
+        ax.set_ylim(0, 1)
+        ticks_loc = ax.get_yticks()
+        ax.yaxis.set_major_locator(mticker.FixedLocator(ticks_loc))
+        ax.set_yticklabels("" for _ in ticks_loc)
+        legend_handles = []
+        for d, label in zip(case_data, labels):
+            legend_handles.append(mlines.Line2D([], [], color=color_map[label], ls='-', label=label))
+            ax.plot(theta, d, label=label, color=color_map[label], zorder=10, clip_on=False)
+            ax.fill(theta, d, label=label, facecolor=color_map[label], alpha=0.15)
+
+        ax.set_varlabels(spoke_labels)
+        ax.tick_params(labelsize=14)
+        ax.legend(handles=legend_handles, loc=(0.80, 0.90), labelspacing=0.1, fontsize='medium', frameon=False)
+
+        plt.setp(ax.spines.values(), color="grey")
+        plt.title(q, fontsize=16, loc="center", pad=30)
+        plt.tight_layout()
 
     return fig
 
@@ -578,7 +2005,8 @@ def plot_all_performance_of_approaches_with_dieft(allmetrics: np.ndarray, colors
     return plots
 
 
-def continuous_efficiency_with_diefk(traces: np.ndarray) -> np.ndarray:
+def continuous_efficiency_with_diefk(traces: np.ndarray, store=None, sketch_size: int = None,
+                                    keys: tuple = KEYS, time_scale: float = 1.0, sketch: np.ndarray = None) -> np.ndarray:
     """
     Compares **dief@k** at different answer completeness percentages.
 
@@ -588,12 +2016,45 @@ def continuous_efficiency_with_diefk(traces: np.ndarray) -> np.ndarray:
     the first 25%, 50%, 75%, and 100% of the answers.
 
     :param traces: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
+    :param store: (optional) :class:`diefpy.store.ResultStore` to reuse the dief@k values of unchanged answer traces from.
+    :param sketch_size: (optional) If set, dief@k is approximated from a sketch with at most *sketch_size* answers per test
+                        and approach (see ``sketch_trace``) and the error bounds are added as attributes
+                        *diefk25_error*, *diefk50_error*, *diefk75_error*, and *diefk100_error*.
+    :param keys: Attributes identifying an answer trace; the last key identifies the compared approaches
+                 (see ``diefk_by``). Other keys than test and approach cannot be combined with *store*, *sketch_size*,
+                 and *sketch*.
+    :param time_scale: Factor converting the time unit of the answer traces into the time unit of the result,
+                       e.g., 1e-9 for times in nanoseconds.
+    :param sketch: (optional) Sketch of the answer traces created with ``sketch_trace``; like *sketch_size*, dief@k is
+                   approximated, but from the given sketch instead of sketching *traces* on each call.
     :return: Dataframe with all the metrics. The structure is: test, approach, diefk25, diefk50, diefk75, diefk100.
 
     **Examples**
 
     >>> continuous_efficiency_with_diefk(traces)
+    >>> continuous_efficiency_with_diefk(traces, store=ResultStore("results"))
+    >>> continuous_efficiency_with_diefk(traces, sketch_size=1000)
+    >>> continuous_efficiency_with_diefk(traces, sketch=sketch_trace(traces, 1000))
+    >>> continuous_efficiency_with_diefk(traces, keys=("test", "run", "approach"))
+    >>> continuous_efficiency_with_diefk(traces_ns, time_scale=1e-9)
     """
+    approximate = sketch_size is not None or sketch is not None
+    if store is None and not approximate:
+        # Group all answer traces once and compute dief@k for each percentage on the groups.
+        with stage('diefk', rows=len(traces)):
+            groups, compared, answer, time, count, starts = _grouped(traces, keys)
+            produced = np.diff(starts) if count is None else _segment_sum(count, starts)
+            k = _reduce_compared(np.minimum, produced, compared).astype(float)
+            df = _keyed_result(traces, keys, groups, [('diefk25', float),
+                                                      ('diefk50', float),
+                                                      ('diefk75', float),
+                                                      ('diefk100', float)])
+            for field, kp in (('diefk25', 0.25), ('diefk50', 0.50), ('diefk75', 0.75), ('diefk100', 1.00)):
+                df[field] = _diefk_groups(answer, time, count, starts, k * kp) * time_scale
+        return df
+    if tuple(keys) != KEYS:
+        raise ValueError('results per %s cannot be stored or approximated' % ', '.join(keys))
+
     # Initialize output structure.
     df = np.empty(shape=0, dtype=[('test', traces['test'].dtype),
                                   ('approach', traces['approach'].dtype),
@@ -602,17 +2063,26 @@ def continuous_efficiency_with_diefk(traces: np.ndarray) -> np.ndarray:
                                   ('diefk75', float),
                                   ('diefk100', float)])
 
+    compute_diefk2 = diefk2 if store is None else store.diefk2
+    if approximate:
+        if store is not None:
+            raise ValueError('approximated results cannot be stored')
+        traces = sketch if sketch is not None else sketch_trace(traces, sketch_size)
+        compute_diefk2 = diefk2_approx
+    errors = []
+
     # Obtain tests and approaches.
-    tests = np.unique(traces['test'])
-    approaches = np.unique(traces['approach'])
+    tests = traces['test'][_encode(traces['test'])[0]]
+    approaches = traces['approach'][_encode(traces['approach'])[0]]
 
     # Compute diefk for different k%: 25, 50, 75, 100.
     for t in tests:
-        subtrace = traces[traces['test'] == t]
-        k25DF = diefk2(subtrace, t, 0.25)
-        k50DF = diefk2(subtrace, t, 0.50)
-        k75DF = diefk2(subtrace, t, 0.75)
-        k100DF = diefk2(subtrace, t, 1.00)
+        with stage('filter', t, len(traces)):
+            subtrace = traces[traces['test'] == t]
+        k25DF = compute_diefk2(subtrace, t, 0.25)
+        k50DF = compute_diefk2(subtrace, t, 0.50)
+        k75DF = compute_diefk2(subtrace, t, 0.75)
+        k100DF = compute_diefk2(subtrace, t, 1.00)
 
         for a in approaches:
             if a not in np.unique(k25DF['approach']) \
@@ -621,24 +2091,33 @@ def continuous_efficiency_with_diefk(traces: np.ndarray) -> np.ndarray:
                     or a not in np.unique(k100DF['approach']):
                 continue
 
-            diefk25 = k25DF[k25DF['approach'] == a]['diefk'][0]
-            diefk50 = k50DF[k50DF['approach'] == a]['diefk'][0]
-            diefk75 = k75DF[k75DF['approach'] == a]['diefk'][0]
-            diefk100 = k100DF[k100DF['approach'] == a]['diefk'][0]
-
-            res = np.array([(t, a, diefk25, diefk50, diefk75, diefk100)],
-                           dtype=[('test', traces['test'].dtype),
-                                  ('approach', traces['approach'].dtype),
-                                  ('diefk25', float),
-                                  ('diefk50', float),
-                                  ('diefk75', float),
-                                  ('diefk100', float)])
-            df = np.append(df, res, axis=0)
+            with stage('assemble', t, 1):
+                diefk25 = k25DF[k25DF['approach'] == a]['diefk'][0]
+                diefk50 = k50DF[k50DF['approach'] == a]['diefk'][0]
+                diefk75 = k75DF[k75DF['approach'] == a]['diefk'][0]
+                diefk100 = k100DF[k100DF['approach'] == a]['diefk'][0]
+                if approximate:
+                    errors.append([kDF[kDF['approach'] == a]['error'][0] for kDF in (k25DF, k50DF, k75DF, k100DF)])
+
+                res = np.array([(t, a, diefk25 * time_scale, diefk50 * time_scale, diefk75 * time_scale,
+                                 diefk100 * time_scale)],
+                               dtype=[('test', traces['test'].dtype),
+                                      ('approach', traces['approach'].dtype),
+                                      ('diefk25', float),
+                                      ('diefk50', float),
+                                      ('diefk75', float),
+                                      ('diefk100', float)])
+                df = np.append(df, res, axis=0)
+
+    if approximate:
+        errors = np.array(errors, dtype=float).reshape(-1, 4) * time_scale
+        df = rfn.append_fields(df, ['diefk25_error', 'diefk50_error', 'diefk75_error', 'diefk100_error'],
+                               [errors[:, i] for i in range(4)], usemask=False)
 
     return df
 
 
-def plot_continuous_efficiency_with_diefk(diefkDF: np.ndarray, q: str, colors: list = DEFAULT_COLORS) -> Figure:
+def plot_continuous_efficiency_with_diefk(diefkDF: np.ndarray, q: str, colors: list = DEFAULT_COLORS) -> 'Figure':
     """
     Generates a radar plot that compares **dief@k** at different answer completeness percentages for a specific test.
 
@@ -657,6 +2136,12 @@ def plot_continuous_efficiency_with_diefk(diefkDF: np.ndarray, q: str, colors: l
     >>> plot_continuous_efficiency_with_diefk(diefkDF, "Q9.sparql")
     >>> plot_continuous_efficiency_with_diefk(diefkDF, "Q9.sparql", ["#ECC30B","#D56062","#84BCDA"])
     """
+    import matplotlib.lines as mlines
+    import matplotlib.pyplot as plt
+    import matplotlib.ticker as mticker
+
+    from diefpy.radaraxes import radar_factory
+
     # Initialize output structure.
     df = np.empty(shape=0, dtype=[('diefk25', float),
                                   ('diefk50', float),
@@ -696,30 +2181,31 @@ def plot_continuous_efficiency_with_diefk(diefkDF: np.ndarray, q: str, colors: l
         row['diefk100'] = row['diefk100'] / maxs[3]
 
     # Plot metrics using spider plot.
-    df = df.tolist()
-    N = len(df[0])
-    theta = radar_factory(N, frame='polygon')
-    spoke_labels = ['k=25%', 'k=50%      ', 'k=75%', '        k=100%']
-    case_data = df
-    fig, ax = plt.subplots(figsize=(6, 6), subplot_kw=dict(projection='radar'))
-    fig.subplots_adjust(top=0.85, bottom=0.05)
-    ax.set_ylim(0, 1)
-    ticks_loc = ax.get_yticks()
-    ax.yaxis.set_major_locator(mticker.FixedLocator(ticks_loc))
-    ax.set_yticklabels("" for _ in ticks_loc)
-    legend_handles = []
-    for d, label in zip(case_data, labels):
-        legend_handles.append(mlines.Line2D([], [], color=color_map[label], ls='-', label=label))
-        ax.plot(theta, d, color=color_map[label], zorder=10, clip_on=False)
-        ax.fill(theta, d, facecolor=color_map[label], alpha=0.15)
-    ax.set_varlabels(spoke_labels)
-    ax.tick_params(labelsize=14, zorder=0)
-
-    ax.legend(handles=legend_handles, loc=(0.80, 0.90), labelspacing=0.1, fontsize='medium', frameon=False)
-
-    plt.setp(ax.spines.values(), color="grey")
-    plt.title(q, fontsize=16, loc="center", pad=30)
-    plt.tight_layout()
+    with stage('plot', q, len(labels)):
+        df = df.tolist()
+        N = len(df[0])
+        theta = radar_factory(N, frame='polygon')
+        spoke_labels = ['k=25%', 'k=50%      ', 'k=75%', '        k=100%']
+        case_data = df
+        fig, ax = plt.subplots(figsize=(6, 6), subplot_kw=dict(projection='radar'))
+        fig.subplots_adjust(top=0.85, bottom=0.05)
+        ax.set_ylim(0, 1)
+        ticks_loc = ax.get_yticks()
+        ax.yaxis.set_major_locator(mticker.FixedLocator(ticks_loc))
+        ax.set_yticklabels("" for _ in ticks_loc)
+        legend_handles = []
+        for d, label in zip(case_data, labels):
+            legend_handles.append(mlines.Line2D([], [], color=color_map[label], ls='-', label=label))
+            ax.plot(theta, d, color=color_map[label], zorder=10, clip_on=False)
+            ax.fill(theta, d, facecolor=color_map[label], alpha=0.15)
+        ax.set_varlabels(spoke_labels)
+        ax.tick_params(labelsize=14, zorder=0)
+
+        ax.legend(handles=legend_handles, loc=(0.80, 0.90), labelspacing=0.1, fontsize='medium', frameon=False)
+
+        plt.setp(ax.spines.values(), color="grey")
+        plt.title(q, fontsize=16, loc="center", pad=30)
+        plt.tight_layout()
 
     return fig
 
@@ -752,3 +2238,84 @@ def plot_all_continuous_efficiency_with_diefk(diefkDF: np.ndarray, colors: list
         plots.append(plot_continuous_efficiency_with_diefk(diefkDF, t, colors))
 
     return plots
+
+
+LEADERBOARD_METRICS = {'dieft': True, 'diefk': False, 'tfft': False, 'totaltime': False, 'throughput': True}
+"""Metrics of the leaderboard and whether higher values are better."""
+
+
+def _competition_ranks(values: np.ndarray) -> np.ndarray:
+    """Ranks the values along axis 1 such that lower values are better; ties share the best rank, NaN is not ranked."""
+    order = np.argsort(values, axis=1, kind='stable')
+    ordered = np.take_along_axis(values, order, axis=1)
+    position = np.broadcast_to(np.arange(values.shape[1])[None, :, None], values.shape)
+    new = np.ones(values.shape, dtype=bool)
+    new[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    ranks = np.maximum.accumulate(np.where(new, position, 0), axis=1) + 1.0
+    ranks[np.isnan(ordered)] = np.nan
+    result = np.empty(values.shape)
+    np.put_along_axis(result, order, ranks, axis=1)
+    return result
+
+
+def leaderboard(allmetrics: np.ndarray, diefkDF: np.ndarray = None) -> np.ndarray:
+    """
+    Ranks the approaches across all tests.
+
+    Per test, the approaches are ranked by **dief@t**, **dief@k**, *time for the first tuple*, *total execution time*,
+    and *throughput* (competition ranking, i.e., ties share the best rank). Higher values are better for dief@t and
+    throughput; lower values are better for the others. Across the tests, the leaderboard reports for each approach
+    and metric the mean rank, the number of tests won (rank 1), and the geometric mean of the ratio between the value
+    of the approach and the best value of the test (1.0 is the best; ratios involving 0 are ignored).
+    The approaches are sorted by their mean rank over all metrics.
+
+    :param allmetrics: Dataframe with all the metrics from "Experiment 1".
+    :param diefkDF: (optional) Dataframe with the results from "Experiment 2"; dief@k refers to diefk100.
+                    If not given, dief@k is not part of the leaderboard.
+    :return: Dataframe with the leaderboard. Attributes of the dataframe: approach, rank, and for each metric
+             the attributes <metric>_rank, <metric>_wins, and <metric>_ratio, e.g., dieft_rank.
+
+    **Examples**
+
+    >>> leaderboard(performance_of_approaches_with_dieft(traces, metrics), continuous_efficiency_with_diefk(traces))
+    """
+    metrics = [m for m in LEADERBOARD_METRICS if m != 'diefk' or diefkDF is not None]
+    tests = np.unique(allmetrics['test'])
+    approaches = np.unique(allmetrics['approach'])
+    if diefkDF is not None:
+        tests = np.union1d(tests, diefkDF['test'])
+        approaches = np.union1d(approaches, diefkDF['approach'])
+
+    with stage('leaderboard', rows=len(allmetrics)):
+        # Build the test x approach x metric cube.
+        cube = np.full((len(tests), len(approaches), len(metrics)), np.nan)
+        fields = [m for m in metrics if m != 'diefk']
+        cube[:, :, [metrics.index(m) for m in fields]] = _pivot(allmetrics, fields, tests, approaches)[2]
+        if diefkDF is not None:
+            cube[:, :, metrics.index('diefk')] = _pivot(diefkDF, ['diefk100'], tests, approaches)[2][:, :, 0]
+
+        # Orient the metrics such that lower values are better.
+        higher = np.array([LEADERBOARD_METRICS[m] for m in metrics])
+        oriented = np.where(higher, -cube, cube)
+        ranks = _competition_ranks(oriented)
+
+        best = np.nanmin(oriented, axis=1, keepdims=True) if len(approaches) else oriented
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(higher, best / oriented, oriented / best)
+            log_ratio = np.where(np.isfinite(ratio) & (ratio > 0), np.log(ratio), np.nan)
+            mean_ranks = np.nanmean(ranks, axis=0)
+            mean_log_ratio = np.nanmean(log_ratio, axis=0)
+        wins = (ranks == 1).sum(axis=0)
+
+        dtype = [('approach', allmetrics['approach'].dtype), ('rank', float)]
+        for m in metrics:
+            dtype += [(m + '_rank', float), (m + '_wins', int), (m + '_ratio', float)]
+        df = np.empty(len(approaches), dtype=dtype)
+        df['approach'] = approaches
+        with np.errstate(invalid='ignore'):
+            df['rank'] = np.nanmean(mean_ranks, axis=1) if len(metrics) else np.nan
+        for i, m in enumerate(metrics):
+            df[m + '_rank'] = mean_ranks[:, i]
+            df[m + '_wins'] = wins[:, i]
+            df[m + '_ratio'] = np.exp(mean_log_ratio[:, i])
+    return df[np.argsort(df['rank'], kind='stable')]
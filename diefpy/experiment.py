@@ -0,0 +1,187 @@
+"""
+Lazy evaluation of experiments.
+
+An :class:`Experiment` wraps the answer traces and the other metrics of an experiment. The metrics and plots are
+computed per test when they are accessed for the first time and kept for later accesses. Hence, inspecting a few
+tests of a large experiment only computes the results of these tests.
+"""
+import numpy as np
+
+from diefpy.dief import (DEFAULT_COLORS, continuous_efficiency_with_diefk, diefk, diefk2, dieft, load_metrics,
+                         load_trace, performance_of_approaches_with_dieft, plot_answer_trace,
+                         plot_continuous_efficiency_with_diefk, plot_performance_of_approaches_with_dieft)
+
+
+class _Index:
+    """Row indices of the answer traces and metrics per test; shared by an experiment and its subsets."""
+
+    def __init__(self, traces: np.ndarray, metrics: np.ndarray = None):
+        self.tests = np.unique(traces['test'])
+        self.trace_rows = self._split(traces['test'], self.tests)
+        self.metric_rows = None if metrics is None else self._split(metrics['test'], self.tests)
+
+    @staticmethod
+    def _split(column: np.ndarray, tests: np.ndarray) -> dict:
+        order = np.argsort(column, kind='stable')
+        bounds = np.searchsorted(column[order], tests, side='right')
+        starts = np.concatenate([[0], bounds[:-1]])
+        return {t: order[lo:hi] for t, lo, hi in zip(tests.tolist(), starts, bounds)}
+
+
+class Experiment:
+    """
+    Answer traces and metrics of an experiment with lazily computed and memoized results per test.
+
+    :param traces: Dataframe with the answer traces. Attributes of the dataframe: test, approach, answer, time.
+    :param metrics: (optional) Dataframe with the other metrics. Attributes of the dataframe: test, approach, tfft,
+                    totaltime, comp. Required for the results of "Experiment 1".
+    :param colors: List of colors to use for the different approaches.
+    :param continue_to_end: Indicates whether the AUC should be continued until the end of the time frame
+
+    **Examples**
+
+    >>> experiment = Experiment.from_files("data/traces.csv", "data/metrics.csv")
+    >>> experiment.dieft("Q9.sparql")
+    >>> experiment.subset(approaches=["Random", "Selective"]).plot_answer_trace("Q9.sparql")
+    """
+
+    def __init__(self, traces: np.ndarray, metrics: np.ndarray = None, colors: list = DEFAULT_COLORS,
+                 continue_to_end: bool = True):
+        self.traces = traces
+        self.metrics = metrics
+        self.continue_to_end = continue_to_end
+        self._index = _Index(traces, metrics)
+        self._tests = self._index.tests.tolist()
+        self._all_approaches = np.unique(traces['approach'])
+        self._approaches = self._all_approaches
+        self._colors = dict(zip(self._approaches.tolist(), colors))
+        self._cache = {}
+
+    @classmethod
+    def from_files(cls, traces_file: str, metrics_file: str = None, **kwargs):
+        """
+        Creates an experiment from the files of the answer traces and (optionally) the other metrics.
+
+        :param traces_file: Path to the file readable with ``load_trace``.
+        :param metrics_file: (optional) Path to the file readable with ``load_metrics``.
+        :param kwargs: Additional arguments of :class:`Experiment`.
+        :return: The experiment.
+        """
+        metrics = None if metrics_file is None else load_metrics(metrics_file)
+        return cls(load_trace(traces_file), metrics, **kwargs)
+
+    @property
+    def tests(self) -> list:
+        """The tests of the experiment."""
+        return list(self._tests)
+
+    @property
+    def approaches(self) -> list:
+        """The approaches of the experiment."""
+        return self._approaches.tolist()
+
+    def subset(self, tests: list = None, approaches: list = None):
+        """
+        Restricts the experiment to some tests and approaches.
+
+        The subset shares the answer traces, the metrics, and their index with this experiment; nothing is copied.
+        Restricting the tests keeps the results computed so far.
+
+        :param tests: (optional) The tests to keep; by default, all tests.
+        :param approaches: (optional) The approaches to keep; by default, all approaches.
+        :return: The restricted experiment.
+        """
+        subset = object.__new__(Experiment)
+        subset.__dict__.update(self.__dict__)
+        if tests is not None:
+            subset._tests = [t for t in self._tests if t in set(tests)]
+        if approaches is not None:
+            subset._approaches = self._approaches[np.isin(self._approaches, approaches)]
+            subset._cache = {}
+        return subset
+
+    def _memoize(self, key: tuple, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def _check(self, test: str):
+        if test not in self._tests:
+            raise KeyError("unknown test '%s'" % test)
+
+    def _select(self, df: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        selected = df[rows]
+        if len(self._approaches) < len(self._all_approaches):
+            selected = selected[np.isin(selected['approach'], self._approaches)]
+        return selected
+
+    def subtrace(self, test: str) -> np.ndarray:
+        """Returns the answer traces of a test."""
+        self._check(test)
+        return self._memoize(('trace', test), lambda: self._select(self.traces, self._index.trace_rows[test]))
+
+    def submetrics(self, test: str) -> np.ndarray:
+        """Returns the other metrics of a test."""
+        self._check(test)
+        if self.metrics is None:
+            raise ValueError('the experiment has no metrics')
+        return self._memoize(('metrics', test), lambda: self._select(self.metrics, self._index.metric_rows[test]))
+
+    def _colors_of(self, df: np.ndarray) -> list:
+        return [self._colors[a] for a in np.unique(df['approach']).tolist()]
+
+    def dieft(self, test: str, t: float = -1.0) -> np.ndarray:
+        """Computes the **dief@t** metric of a test; see :func:`diefpy.dief.dieft`."""
+        return self._memoize(('dieft', test, t),
+                             lambda: dieft(self.subtrace(test), test, t, self.continue_to_end))
+
+    def diefk(self, test: str, k: int = -1) -> np.ndarray:
+        """Computes the **dief@k** metric of a test; see :func:`diefpy.dief.diefk`."""
+        return self._memoize(('diefk', test, k), lambda: diefk(self.subtrace(test), test, k))
+
+    def diefk2(self, test: str, kp: float = -1.0) -> np.ndarray:
+        """Computes the **dief@k** metric of a test for a percentage of answers; see :func:`diefpy.dief.diefk2`."""
+        return self._memoize(('diefk2', test, kp), lambda: diefk2(self.subtrace(test), test, kp))
+
+    def performance(self, test: str = None) -> np.ndarray:
+        """
+        Returns the results of "Experiment 1"; see :func:`diefpy.dief.performance_of_approaches_with_dieft`.
+
+        :param test: (optional) Restricts the results to a test; by default, the results of all tests are returned.
+        """
+        if test is None:
+            return np.concatenate([self.performance(t) for t in self._tests])
+        return self._memoize(('performance', test), lambda: performance_of_approaches_with_dieft(
+            self.subtrace(test), self.submetrics(test), self.continue_to_end))
+
+    def continuous_efficiency(self, test: str = None) -> np.ndarray:
+        """
+        Returns the results of "Experiment 2"; see :func:`diefpy.dief.continuous_efficiency_with_diefk`.
+
+        :param test: (optional) Restricts the results to a test; by default, the results of all tests are returned.
+        """
+        if test is None:
+            return np.concatenate([self.continuous_efficiency(t) for t in self._tests])
+        return self._memoize(('continuous_efficiency', test),
+                             lambda: continuous_efficiency_with_diefk(self.subtrace(test)))
+
+    def plot_answer_trace(self, test: str):
+        """Plots the answer traces of a test; see :func:`diefpy.dief.plot_answer_trace`."""
+        def plot():
+            subtrace = self.subtrace(test)
+            return plot_answer_trace(subtrace, test, self._colors_of(subtrace))
+        return self._memoize(('plot_answer_trace', test), plot)
+
+    def plot_performance(self, test: str):
+        """Plots the results of "Experiment 1" of a test; see :func:`diefpy.dief.plot_performance_of_approaches_with_dieft`."""
+        def plot():
+            performance = self.performance(test)
+            return plot_performance_of_approaches_with_dieft(performance, test, self._colors_of(performance))
+        return self._memoize(('plot_performance', test), plot)
+
+    def plot_continuous_efficiency(self, test: str):
+        """Plots the results of "Experiment 2" of a test; see :func:`diefpy.dief.plot_continuous_efficiency_with_diefk`."""
+        def plot():
+            efficiency = self.continuous_efficiency(test)
+            return plot_continuous_efficiency_with_diefk(efficiency, test, self._colors_of(efficiency))
+        return self._memoize(('plot_continuous_efficiency', test), plot)
@@ -0,0 +1,506 @@
+"""
+Incremental computation of **dief@t**, **dief@k**, and the conventional metrics from answer events.
+
+Query engines may report the answers they produce while the test is still running.
+:class:`LiveMetrics` keeps the answer trace of each test and approach together with the running
+area under the curve, such that the metrics can be obtained at any time without recomputing the AUC.
+:class:`LiveMetricsServer` receives the answer events via an asyncio TCP or UNIX socket and
+:class:`TraceTail` follows an answer trace file that is still being written.
+"""
+import asyncio
+import json
+import logging
+import os
+import time as _time
+
+import numpy as np
+
+from diefpy.backends import get_backend
+from diefpy.dief import DEFAULT_COLORS, _key_records, _unique_keys, plot_answer_trace
+
+logger = logging.getLogger('diefpy')
+
+
+class _Series:
+    """Growable answer trace of a single test and approach including the running AUC."""
+    __slots__ = ('answer', 'time', 'auc', 'size')
+
+    def __init__(self, capacity: int = 1024):
+        self.answer = np.empty(capacity, dtype=float)
+        self.time = np.empty(capacity, dtype=float)
+        self.auc = np.empty(capacity, dtype=float)
+        self.size = 0
+
+    def _reserve(self, n: int):
+        capacity = len(self.time)
+        if self.size + n <= capacity:
+            return
+        while capacity < self.size + n:
+            capacity *= 2
+        for name in ('answer', 'time', 'auc'):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def append(self, answer: float, time: float):
+        self._reserve(1)
+        i = self.size
+        self.answer[i] = answer
+        self.time[i] = time
+        if i == 0:
+            self.auc[i] = 0.0
+        else:
+            self.auc[i] = self.auc[i - 1] + (self.answer[i - 1] + answer) * (time - self.time[i - 1]) / 2
+        self.size = i + 1
+
+    def extend(self, answers: np.ndarray, times: np.ndarray):
+        n = len(times)
+        if n == 0:
+            return
+        self._reserve(n)
+        i = self.size
+        self.answer[i:i + n] = answers
+        self.time[i:i + n] = times
+        # Trapezoids between consecutive points, starting with the last point already stored.
+        start = max(i - 1, 0)
+        a = self.answer[start:i + n]
+        t = self.time[start:i + n]
+        increments = np.cumsum((a[1:] + a[:-1]) * np.diff(t) / 2)
+        base = self.auc[i - 1] if i > 0 else 0.0
+        if i == 0:
+            self.auc[0] = 0.0
+            self.auc[1:n] = increments
+        else:
+            self.auc[i:i + n] = base + increments
+        self.size = i + n
+
+    def dieft(self, t: float, continue_to_end: bool) -> float:
+        n = int(np.searchsorted(self.time[:self.size], t, side='right'))
+        if n == 0:
+            return 0.0
+        dief = self.auc[n - 1]
+        if continue_to_end and not (n == 1 and self.answer[0] == 0):
+            dief += (self.answer[n - 1] + n) * (t - self.time[n - 1]) / 2
+        return float(dief)
+
+    def diefk(self, k: float) -> float:
+        n = int(np.searchsorted(self.answer[:self.size], k, side='right'))
+        if n <= 1:
+            return 0.0
+        return float(self.auc[n - 1])
+
+
+class LiveMetrics:
+    """
+    Incrementally maintained answer traces and metrics for all tests and approaches.
+
+    The answer events of a test and approach are expected to arrive in the order they were produced.
+    Adding an event is constant in time (amortized); computing **dief@t** or **dief@k** for a test is
+    logarithmic in the length of its answer traces.
+
+    **Examples**
+
+    >>> live = LiveMetrics()
+    >>> live.add("Q9.sparql", "Selective", 1, 0.24)
+    >>> live.add("Q9.sparql", "Selective", 2, 0.27)
+    >>> live.dieft("Q9.sparql")
+    """
+
+    def __init__(self):
+        self._series = {}
+
+    def __len__(self):
+        return sum(s.size for s in self._series.values())
+
+    def _get(self, test: str, approach: str) -> _Series:
+        series = self._series.get(test)
+        if series is None:
+            series = self._series[test] = {}
+        s = series.get(approach)
+        if s is None:
+            s = series[approach] = _Series()
+        return s
+
+    def add(self, test: str, approach: str, answer: float, time: float):
+        """
+        Adds a single answer event.
+
+        :param test: Name of the executed test.
+        :param approach: Name of the approach that produced the answer.
+        :param answer: Number of the answer produced.
+        :param time: Time elapsed from the start of the execution until the generation of the answer.
+        """
+        self._get(test, approach).append(answer, time)
+
+    def extend(self, trace: np.ndarray):
+        """
+        Adds all answer events of an answer trace.
+
+        :param trace: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
+        """
+        if len(trace) == 0:
+            return
+        first, codes = _unique_keys([trace['test'], trace['approach']])
+        order, starts = get_backend().group(codes, len(first))
+        for i, (test, approach) in enumerate(_key_records(trace, ('test', 'approach'), first).tolist()):
+            rows = trace[order[starts[i]:starts[i + 1]]]
+            self._get(test, approach).extend(rows['answer'], rows['time'])
+
+    def clear(self):
+        """Removes all answer events."""
+        self._series.clear()
+
+    def tests(self) -> list:
+        """Returns the names of the tests seen so far."""
+        return list(self._series)
+
+    def trace(self, test: str = None) -> np.ndarray:
+        """
+        Returns the answer events received so far as answer trace.
+
+        :param test: (optional) Restricts the answer trace to the given test.
+        :return: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
+        """
+        series = [(t, a, s) for t, approaches in self._series.items() if test is None or t == test
+                  for a, s in approaches.items()]
+        df = np.empty(sum(s.size for _, _, s in series),
+                      dtype=[('test', 'U%d' % max([len(t) for t, _, _ in series] + [1])),
+                             ('approach', 'U%d' % max([len(a) for _, a, _ in series] + [1])),
+                             ('answer', float),
+                             ('time', float)])
+        i = 0
+        for t, a, s in series:
+            df['test'][i:i + s.size] = t
+            df['approach'][i:i + s.size] = a
+            df['answer'][i:i + s.size] = s.answer[:s.size]
+            df['time'][i:i + s.size] = s.time[:s.size]
+            i += s.size
+        return df
+
+    def _result(self, test: str, name: str, values: list) -> np.ndarray:
+        approaches = list(self._series.get(test, {}))
+        return np.array([(test, a, v) for a, v in zip(approaches, values)],
+                        dtype=[('test', 'U%d' % max(len(test), 1)),
+                               ('approach', 'U%d' % max([len(a) for a in approaches] + [1])),
+                               (name, float)])
+
+    def dieft(self, test: str, t: float = -1.0, continue_to_end: bool = True) -> np.ndarray:
+        """
+        Computes the **dief@t** metric for a specific test at a given time point *t* from the events received so far.
+
+        :param test: Specifies the specific test to analyze.
+        :param t: Point in time to compute dief@t for. By default, the function computes the maximum of the execution time
+                  among the approaches.
+        :param continue_to_end: Indicates whether the AUC should be continued until the end of the time frame
+        :return: Dataframe with the dief@t values for each approach. Attributes of the dataframe: test, approach, dieft.
+        """
+        series = self._series.get(test, {})
+        if t == -1:
+            t = max((s.time[s.size - 1] for s in series.values()), default=0.0)
+        return self._result(test, 'dieft', [s.dieft(t, continue_to_end) for s in series.values()])
+
+    def diefk(self, test: str, k: int = -1) -> np.ndarray:
+        """
+        Computes the **dief@k** metric for a specific test at a given number of answers *k* from the events received so far.
+
+        :param test: Specifies the specific test to analyze.
+        :param k: Number of answers to compute dief@k for. By default, the function computes the minimum of the total number
+                  of answers produced by the approaches.
+        :return: Dataframe with the dief@k values for each approach. Attributes of the dataframe: test, approach, diefk.
+        """
+        series = self._series.get(test, {})
+        if k == -1:
+            k = min((s.size for s in series.values()), default=0)
+        return self._result(test, 'diefk', [s.diefk(k) for s in series.values()])
+
+    def diefk2(self, test: str, kp: float = -1.0) -> np.ndarray:
+        """
+        Computes the **dief@k** metric for a specific test at a given percentage of answers *kp*.
+
+        :param test: Specifies the specific test to analyze.
+        :param kp: Ratio of answers to compute dief@k for (kp in [0.0;1.0]).
+        :return: Dataframe with the dief@k values for each approach. Attributes of the dataframe: test, approach, diefk.
+        """
+        series = self._series.get(test, {})
+        k = min((s.size for s in series.values()), default=0)
+        if kp > -1:
+            k = k * kp
+        return self.diefk(test, k)
+
+    def metrics(self) -> np.ndarray:
+        """
+        Returns the conventional metrics derived from the events received so far.
+
+        :return: Dataframe with the metrics. Attributes of the dataframe: test, approach, tfft, totaltime, comp.
+        """
+        rows = [(test, a, s.time[0], s.time[s.size - 1], int(s.answer[s.size - 1]))
+                for test, series in self._series.items() for a, s in series.items()]
+        return np.array(rows, dtype=[('test', 'U%d' % max([len(r[0]) for r in rows] + [1])),
+                                     ('approach', 'U%d' % max([len(r[1]) for r in rows] + [1])),
+                                     ('tfft', float),
+                                     ('totaltime', float),
+                                     ('comp', int)])
+
+    def snapshot(self, test: str = None) -> dict:
+        """
+        Returns the current metrics of all approaches per test.
+
+        For each test, dief@t is computed until the slowest approach finishes and dief@k for the minimum number
+        of answers produced by the approaches.
+
+        :param test: (optional) Restricts the snapshot to the given test.
+        :return: Dictionary test -> approach -> metric -> value.
+        """
+        tests = self.tests() if test is None else [test]
+        snapshot = {}
+        for t in tests:
+            series = self._series.get(t, {})
+            dieft_ = self.dieft(t)['dieft']
+            diefk_ = self.diefk(t)['diefk']
+            snapshot[t] = {}
+            for i, (a, s) in enumerate(series.items()):
+                totaltime = float(s.time[s.size - 1])
+                comp = int(s.answer[s.size - 1])
+                snapshot[t][a] = {
+                    'tfft': float(s.time[0]),
+                    'totaltime': totaltime,
+                    'comp': comp,
+                    'throughput': comp / totaltime if totaltime > 0 else 0.0,
+                    'dieft': float(dieft_[i]),
+                    'diefk': float(diefk_[i])
+                }
+        return snapshot
+
+
+class LiveMetricsServer:
+    """
+    Asyncio server receiving answer events and serving the current metrics.
+
+    Clients send newline-delimited messages. An answer event is a CSV line ``test,approach,answer,time``
+    as in the answer trace files; a header line is ignored. A line starting with ``?`` requests the current
+    metrics (see :meth:`LiveMetrics.snapshot`), optionally for a single test given after the ``?``.
+    The server replies to requests with a single line of JSON.
+
+    Events are only appended to the traces when received; the metrics are computed on request.
+    The events of a test and approach are expected to arrive in order, e.g., via the same connection.
+    Messages longer than *max_line* are dropped with a warning, such that a client cannot exhaust the memory
+    of the server by sending data without newlines.
+
+    :param live: (optional) The live metrics to update; a new instance is created by default.
+    :param chunk_size: Number of bytes read from a connection at once.
+    :param max_line: (optional) Maximum length of a message in bytes; by default, 16 times *chunk_size*.
+
+    **Examples**
+
+    >>> server = LiveMetricsServer()
+    >>> asyncio.run(server.serve(port=8765))
+    """
+
+    def __init__(self, live: LiveMetrics = None, chunk_size: int = 65536, max_line: int = None):
+        self.live = live if live is not None else LiveMetrics()
+        self.chunk_size = chunk_size
+        self.max_line = max_line if max_line is not None else 16 * chunk_size
+
+    def _handle_line(self, line: bytes):
+        if line.startswith(b'?'):
+            test = line[1:].strip().decode('utf8') or None
+            return json.dumps(self.live.snapshot(test)).encode('utf8') + b'\n'
+        try:
+            test, approach, answer, time = line.decode('utf8').split(',')
+            self.live.add(test.strip(), approach.strip(), float(answer), float(time))
+        except ValueError:
+            if line != b'test,approach,answer,time':
+                logger.warning('Ignoring malformed answer event: %r', line)
+        return None
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Processes the messages of a single connection until the client closes it."""
+        pending = b''
+        dropping = False
+        try:
+            while True:
+                chunk = await reader.read(self.chunk_size)
+                if not chunk:
+                    break
+                data = pending + chunk
+                if dropping:
+                    # Skip the rest of an overlong message until its end.
+                    end = data.find(b'\n')
+                    pending = b''
+                    if end < 0:
+                        continue
+                    data, dropping = data[end + 1:], False
+                lines = data.split(b'\n')
+                pending = lines.pop()
+                if len(pending) > self.max_line:
+                    logger.warning('Dropping a message of more than %d bytes', self.max_line)
+                    pending, dropping = b'', True
+                for line in lines:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    reply = self._handle_line(line)
+                    if reply is not None:
+                        writer.write(reply)
+                        await writer.drain()
+            if pending.strip():
+                reply = self._handle_line(pending.strip())
+                if reply is not None:
+                    writer.write(reply)
+                    await writer.drain()
+        finally:
+            writer.close()
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0):
+        """Starts listening on a TCP socket and returns the ``asyncio`` server."""
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def start_unix(self, path: str):
+        """Starts listening on a UNIX socket and returns the ``asyncio`` server."""
+        return await asyncio.start_unix_server(self.handle, path)
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 0, path: str = None):
+        """Serves forever on a UNIX socket if *path* is given, otherwise on a TCP socket."""
+        server = await (self.start_unix(path) if path is not None else self.start(host, port))
+        async with server:
+            await server.serve_forever()
+
+
+class TraceTail:
+    """
+    Follows an answer trace file that is still being written, e.g., by a running benchmark.
+
+    The tail remembers the offset in the file up to which the answer events were read. Each call of :meth:`poll`
+    only reads and parses the rows appended since the last call and adds them to the :class:`LiveMetrics`, i.e.,
+    the cost of an update is proportional to the new rows only. A row that is not yet completely written is read
+    with the next poll. If the file is truncated or replaced by another file, it is read again from the start; a file
+    that is rewritten in place, i.e., without creating a new file, to at least the length already read cannot be
+    distinguished from an appended file.
+    The file is a CSV file with a header as read by ``load_trace``; compressed files cannot be followed.
+
+    :param filename: Path to the answer trace file.
+    :param live: (optional) The live metrics to update; a new instance is created by default.
+
+    **Examples**
+
+    >>> tail = TraceTail("traces.csv")
+    >>> tail.poll()
+    ['Q9.sparql']
+    >>> tail.live.snapshot("Q9.sparql")
+    >>> tail.follow(60, plot_dir="plots")
+    """
+
+    def __init__(self, filename: str, live: LiveMetrics = None):
+        self.filename = filename
+        self.live = live if live is not None else LiveMetrics()
+        self.offset = 0
+        self.rows = 0
+        self._columns = None
+        self._inode = None
+
+    def _reset(self):
+        self.live.clear()
+        self.offset = 0
+        self.rows = 0
+        self._columns = None
+
+    def poll(self) -> list:
+        """
+        Reads the rows appended to the file since the last poll.
+
+        Malformed rows are skipped with a warning.
+
+        :return: Names of the tests with new answer events.
+        """
+        try:
+            stat = os.stat(self.filename)
+        except FileNotFoundError:
+            return []
+        if self._inode is not None and (stat.st_dev, stat.st_ino) != self._inode:
+            logger.warning('%s was replaced; reading it again from the start', self.filename)
+            self._reset()
+        elif stat.st_size < self.offset:
+            logger.warning('%s was truncated; reading it again from the start', self.filename)
+            self._reset()
+        self._inode = (stat.st_dev, stat.st_ino)
+        if stat.st_size == self.offset:
+            return []
+
+        with open(self.filename, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(stat.st_size - self.offset)
+        # Only read complete lines; the rest is read with the next poll.
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            return []
+        lines = data[:end].decode('utf8').splitlines()
+
+        columns = self._columns
+        if columns is None:
+            header = [name.strip() for name in lines.pop(0).split(',')]
+            columns = [header.index(name) for name in ('test', 'approach', 'answer', 'time')], len(header)
+        rows = self._parse(lines, *columns)
+        if rows:
+            test, approach, answer, time = zip(*rows)
+            trace = np.empty(len(rows), dtype=[('test', 'U%d' % max(len(t) for t in test)),
+                                               ('approach', 'U%d' % max(len(a) for a in approach)),
+                                               ('answer', float),
+                                               ('time', float)])
+            trace['test'] = test
+            trace['approach'] = approach
+            trace['answer'] = answer
+            trace['time'] = time
+            self.live.extend(trace)
+        # The rows are consumed only once they were added to the live metrics.
+        self._columns = columns
+        self.offset += end
+        self.rows += len(rows)
+        return np.unique(trace['test']).tolist() if rows else []
+
+    def _parse(self, lines: list, indices: list, width: int) -> list:
+        rows = []
+        for line in lines:
+            if not line.strip():
+                continue
+            fields = line.split(',')
+            try:
+                if len(fields) != width:
+                    raise ValueError('expected %d fields' % width)
+                test, approach, answer, time = (fields[i].strip() for i in indices)
+                rows.append((test, approach, float(answer), float(time)))
+            except ValueError:
+                logger.warning('Ignoring malformed row in %s: %r', self.filename, line)
+        return rows
+
+    def follow(self, interval: float = 5.0, callback=None, plot_dir: str = None, colors: list = DEFAULT_COLORS,
+               polls: int = None):
+        """
+        Polls the file periodically.
+
+        :param interval: Seconds to wait between two polls.
+        :param callback: (optional) Function called with the tail and the names of the updated tests after each poll
+                         that read new answer events.
+        :param plot_dir: (optional) Directory in which the plots of the answer traces of the updated tests are refreshed
+                         after each poll, named *answer_trace_<test>.png*.
+        :param colors: List of colors to use for the different approaches in the plots.
+        :param polls: (optional) Number of polls; by default, the file is followed until interrupted.
+        """
+        n = 0
+        while polls is None or n < polls:
+            if n > 0:
+                _time.sleep(interval)
+            n += 1
+            tests = self.poll()
+            if not tests:
+                continue
+            if plot_dir is not None:
+                import matplotlib.pyplot as plt
+
+                os.makedirs(plot_dir, exist_ok=True)
+                for test in tests:
+                    fig = plot_answer_trace(self.live.trace(test), test, colors)
+                    fig.savefig(os.path.join(plot_dir, 'answer_trace_%s.png' % test))
+                    plt.close(fig)
+            if callback is not None:
+                callback(self, tests)
@@ -0,0 +1,200 @@
+"""
+Instrumentation of the computations performed by diefpy.
+
+A :class:`Profiler` records the wall time, the number of rows processed, and (optionally) the peak memory
+of each stage of the computation, e.g., loading the answer traces, filtering them, computing the AUC,
+assembling the results, and plotting. The measurements are kept per stage and test.
+They are reported via ``logging`` and can be retrieved as a structured report.
+
+When no profiler is active, the instrumented stages are no-ops.
+"""
+import logging
+import time
+import tracemalloc
+
+import numpy as np
+
+logger = logging.getLogger('diefpy')
+
+_active = None
+"""The currently active profiler; ``None`` if profiling is disabled."""
+
+
+class _NullStage:
+    """Stage used while profiling is disabled; does nothing."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+    def add_rows(self, rows: int):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """A single measurement of a stage; created by :func:`stage` while a profiler is active."""
+    __slots__ = ('profiler', 'name', 'test', 'rows', 'start', 'memory')
+
+    def __init__(self, profiler, name: str, test, rows: int):
+        self.profiler = profiler
+        self.name = name
+        self.test = test
+        self.rows = rows
+        self.start = 0.0
+        self.memory = 0
+
+    def __enter__(self):
+        if self.profiler.trace_memory:
+            self.memory = self.profiler._push_memory()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        elapsed = time.perf_counter() - self.start
+        peak = 0
+        if self.profiler.trace_memory:
+            peak = max(self.profiler._pop_memory() - self.memory, 0)
+        self.profiler.record(self.name, self.test, elapsed, self.rows, peak)
+        return False
+
+    def add_rows(self, rows: int):
+        self.rows += int(rows)
+
+
+def stage(name: str, test=None, rows: int = 0):
+    """
+    Returns a context manager measuring the stage *name* of the computation.
+
+    If no profiler is active, a shared no-op context manager is returned.
+
+    :param name: Name of the stage, e.g., 'load_trace', 'filter', 'group', 'auc', 'assemble', or 'plot'.
+    :param test: (optional) The test the stage is processing.
+    :param rows: (optional) Number of rows processed; can be increased later using ``add_rows``.
+    :return: Context manager measuring the stage.
+
+    **Examples**
+
+    >>> with stage('filter', 'Q9.sparql') as s:
+    ...     results = traces[traces['test'] == 'Q9.sparql']
+    ...     s.add_rows(len(results))
+    """
+    if _active is None:
+        return _NULL_STAGE
+    return _Stage(_active, name, None if test is None else str(test), rows)
+
+
+class Profiler:
+    """
+    Records wall time, rows processed, and peak memory of each stage and test of the diefpy computations.
+
+    The profiler is activated by using it as a context manager. Measurements are aggregated per stage and test.
+    Each finished stage is logged to the ``diefpy`` logger and passed to the optional callback.
+
+    :param trace_memory: Indicates whether the peak memory of each stage should be recorded (uses ``tracemalloc``).
+    :param log_level: Logging level used for reporting finished stages; ``None`` disables logging.
+    :param callback: (optional) Function called with (stage, test, seconds, rows, peak memory) for each finished stage.
+
+    **Examples**
+
+    >>> with Profiler() as profiler:
+    ...     traces = load_trace("data/traces.csv")
+    ...     performance_of_approaches_with_dieft(traces, metrics)
+    >>> profiler.report()
+    """
+
+    def __init__(self, trace_memory: bool = False, log_level: int = logging.DEBUG, callback=None):
+        self.trace_memory = trace_memory
+        self.log_level = log_level
+        self.callback = callback
+        self._stats = {}
+        self._peaks = []
+        self._previous = None
+        self._started_tracing = False
+
+    def __enter__(self):
+        global _active
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._previous = _active
+        _active = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        global _active
+        _active = self._previous
+        self._previous = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return False
+
+    def _push_memory(self) -> int:
+        # The peak is reset for each stage; the peak of the enclosing stage is preserved on the stack.
+        current, peak = tracemalloc.get_traced_memory()
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], peak)
+        self._peaks.append(current)
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        return current
+
+    def _pop_memory(self) -> int:
+        _, peak = tracemalloc.get_traced_memory()
+        peak = max(self._peaks.pop(), peak)
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], peak)
+        return peak
+
+    def record(self, name: str, test, seconds: float, rows: int = 0, peak: int = 0):
+        """
+        Records a measurement of a stage.
+
+        :param name: Name of the stage.
+        :param test: The test the stage was processing; ``None`` if the stage is not specific to a test.
+        :param seconds: Wall time of the stage in seconds.
+        :param rows: Number of rows processed by the stage.
+        :param peak: Peak memory in bytes allocated during the stage.
+        """
+        key = (name, '' if test is None else test)
+        stats = self._stats.get(key)
+        if stats is None:
+            self._stats[key] = [1, seconds, rows, peak]
+        else:
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] += rows
+            stats[3] = max(stats[3], peak)
+
+        if self.log_level is not None and logger.isEnabledFor(self.log_level):
+            logger.log(self.log_level, 'stage %s [%s]: %.6f s, %d rows, %d bytes peak',
+                       name, key[1], seconds, rows, peak)
+        if self.callback is not None:
+            self.callback(name, test, seconds, rows, peak)
+
+    def report(self) -> np.ndarray:
+        """
+        Returns the aggregated measurements.
+
+        :return: Dataframe with the measurements per stage and test.
+                 Attributes of the dataframe: stage, test, calls, time, rows, peakmem.
+        """
+        width_stage = max([len(k[0]) for k in self._stats] + [1])
+        width_test = max([len(k[1]) for k in self._stats] + [1])
+        return np.array([(k[0], k[1], v[0], v[1], v[2], v[3]) for k, v in self._stats.items()],
+                        dtype=[('stage', 'U%d' % width_stage),
+                               ('test', 'U%d' % width_test),
+                               ('calls', int),
+                               ('time', float),
+                               ('rows', int),
+                               ('peakmem', int)])
+
+    def reset(self):
+        """Discards all measurements recorded so far."""
+        self._stats = {}
@@ -0,0 +1,185 @@
+"""
+Recording of answer traces from Python result iterators.
+
+A :class:`TraceRecorder` stamps each answer produced by an engine with ``time.perf_counter_ns`` and stores the
+timestamps in a preallocated numpy buffer that grows by doubling; no Python object is created per answer.
+Results are recorded either by wrapping an iterator with :meth:`TraceRecorder.record` or by calling the function
+provided by the context manager :meth:`TraceRecorder.recording` for each answer.
+The recorded answer traces can be passed to ``dieft`` and ``diefk`` or saved with ``save_trace``.
+
+For very long streams, the memory can be bounded with *max_answers*. Whenever the buffer of a recording is full,
+every other answer is dropped and only every second answer is recorded from then on. The recorded answer trace is
+an evenly spaced subsample including the first and the last answer, like a sketch created with ``sketch_trace``,
+and the metrics are approximated with ``dieft_approx``, ``diefk_approx``, and ``diefk2_approx``.
+"""
+from contextlib import contextmanager
+from time import perf_counter_ns
+
+import numpy as np
+
+
+class _Recording:
+    """Timestamps of the answers of a single test and approach; calling the recording stamps the next answer."""
+    __slots__ = ('times', 'size', 'stride', 'count', 'last', 'start', 'end', 'max_answers')
+
+    def __init__(self, capacity: int, max_answers: int = None):
+        self.times = np.empty(capacity if max_answers is None else min(capacity, max_answers), dtype=np.int64)
+        self.size = 0
+        self.stride = 1
+        self.count = 0
+        self.last = 0
+        self.max_answers = max_answers
+        self.start = self.end = perf_counter_ns()
+
+    def __call__(self):
+        now = perf_counter_ns()
+        count = self.count
+        self.count = count + 1
+        self.last = now
+        if count % self.stride:
+            return
+        if self.size == len(self.times):
+            self._grow()
+            if count % self.stride:
+                return
+        self.times[self.size] = now
+        self.size += 1
+
+    def _grow(self):
+        if self.max_answers is None or len(self.times) < self.max_answers:
+            capacity = 2 * len(self.times)
+            if self.max_answers is not None:
+                capacity = min(capacity, self.max_answers)
+            times = np.empty(capacity, dtype=np.int64)
+            times[:self.size] = self.times[:self.size]
+            self.times = times
+        else:
+            # Keep every other answer; the answers recorded are 1, 1 + stride, 1 + 2 * stride, ...
+            kept = self.times[:self.size:2]
+            self.size = len(kept)
+            self.times[:self.size] = kept
+            self.stride *= 2
+
+    def trace(self):
+        """Returns the numbers of the answers and their times in nanoseconds since the start of the recording."""
+        if self.count == 0:
+            # A single answer 0 indicates that the approach did not produce any answer.
+            return np.zeros(1, dtype=np.int64), np.array([self.end - self.start], dtype=np.int64)
+        answer = np.arange(self.size, dtype=np.int64) * self.stride + 1
+        time = self.times[:self.size] - self.start
+        if answer[-1] != self.count:
+            answer = np.append(answer, self.count)
+            time = np.append(time, self.last - self.start)
+        return answer, time
+
+
+class TraceRecorder:
+    """
+    Records the answer traces of the tests and approaches executed in a Python process.
+
+    A recording starts when the first answer is requested from the wrapped iterator (or the context manager is
+    entered) and ends when the iterator is exhausted (or the context manager is left). The recorder is not
+    thread-safe; use one recorder per thread.
+
+    :param capacity: Initial number of answers per recording that fit into the buffer.
+    :param max_answers: (optional) Maximum number of answers stored per recording; longer streams are decimated.
+
+    **Examples**
+
+    >>> recorder = TraceRecorder()
+    >>> for row in recorder.record(engine.execute(query), "Q9.sparql", "Selective"):
+    ...     process(row)
+    >>> with recorder.recording("Q9.sparql", "Random") as answer:
+    ...     engine.execute(query, callback=lambda row: answer())
+    >>> dieft(recorder.trace(), "Q9.sparql")
+    """
+
+    def __init__(self, capacity: int = 1024, max_answers: int = None):
+        if max_answers is not None and max_answers < 2:
+            raise ValueError('max_answers must be at least 2')
+        self.capacity = capacity
+        self.max_answers = max_answers
+        self._recordings = []
+
+    @contextmanager
+    def recording(self, test: str, approach: str):
+        """
+        Records the answers of a test and approach; the context manager provides a function to call for each answer.
+
+        :param test: Name of the executed test.
+        :param approach: Name of the approach that produces the answers.
+        """
+        recording = _Recording(self.capacity, self.max_answers)
+        try:
+            yield recording
+        finally:
+            recording.end = perf_counter_ns()
+            self._recordings.append((test, approach, recording))
+
+    def record(self, iterable, test: str, approach: str):
+        """
+        Wraps an iterator and records the time when each item is produced.
+
+        :param iterable: Iterable producing the answers of the test, e.g., a generator of result rows.
+        :param test: Name of the executed test.
+        :param approach: Name of the approach that produces the answers.
+        :return: Iterator over the items of *iterable*.
+        """
+        with self.recording(test, approach) as answer:
+            for item in iterable:
+                answer()
+                yield item
+
+    @property
+    def decimated(self) -> bool:
+        """Indicates whether answers were dropped, i.e., the metrics have to be approximated."""
+        return any(r.stride > 1 for _, _, r in self._recordings)
+
+    def __len__(self):
+        return len(self._recordings)
+
+    def _frame(self, fields: list) -> np.ndarray:
+        return np.empty(len(self._recordings), dtype=[
+            ('test', 'U%d' % max([len(test) for test, _, _ in self._recordings] + [1])),
+            ('approach', 'U%d' % max([len(approach) for _, approach, _ in self._recordings] + [1]))] + fields)
+
+    def trace(self, seconds: bool = True) -> np.ndarray:
+        """
+        Returns the answer traces of all finished recordings.
+
+        :param seconds: Indicates whether the time is given in seconds; otherwise, the time is given in integer
+                        nanoseconds, e.g., to be used with ``time_scale=1e-9``.
+        :return: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
+
+        **Examples**
+
+        >>> recorder.trace()
+        >>> save_trace(recorder.trace(), "traces.csv")
+        """
+        parts = [recording.trace() for _, _, recording in self._recordings]
+        lengths = [len(answer) for answer, _ in parts]
+        keys = self._frame([])
+        df = np.empty(sum(lengths), dtype=keys.dtype.descr + [('answer', int),
+                                                              ('time', float if seconds else np.int64)])
+        keys['test'] = [test for test, _, _ in self._recordings]
+        keys['approach'] = [approach for _, approach, _ in self._recordings]
+        df['test'] = np.repeat(keys['test'], lengths)
+        df['approach'] = np.repeat(keys['approach'], lengths)
+        df['answer'] = np.concatenate([np.empty(0, dtype=np.int64)] + [answer for answer, _ in parts])
+        time = np.concatenate([np.empty(0, dtype=np.int64)] + [time for _, time in parts])
+        df['time'] = time / 1e9 if seconds else time
+        return df
+
+    def metrics(self) -> np.ndarray:
+        """
+        Returns the conventional metrics of all finished recordings.
+
+        The total execution time is measured until the end of the recording, e.g., until the iterator is exhausted.
+
+        :return: Dataframe with the metrics. Attributes of the dataframe: test, approach, tfft, totaltime, comp.
+        """
+        df = self._frame([('tfft', float), ('totaltime', float), ('comp', int)])
+        for i, (test, approach, r) in enumerate(self._recordings):
+            tfft = (r.times[0] - r.start) / 1e9 if r.count else np.nan
+            df[i] = (test, approach, tfft, (r.end - r.start) / 1e9, r.count)
+        return df
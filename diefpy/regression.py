@@ -0,0 +1,179 @@
+"""
+Detection of performance regressions between two runs of an experiment.
+
+:func:`compare_datasets` compares the answer traces (and optionally the other metrics) of a candidate, e.g., a new
+build of an engine, with those of a baseline, e.g., the previous release. The answer traces of both datasets are
+grouped in a single pass; **dief@t** and **dief@k** of both datasets are computed for the same *t* and *k*, i.e.,
+the maximum execution time and the minimum number of answers of the test and approach in both datasets.
+:func:`find_regressions` applies thresholds to the relative changes and :func:`format_regressions` renders a
+compact report. The command line interface ``python -m diefpy compare`` combines these steps and exits with a
+non-zero status if a regression is found.
+"""
+import numpy as np
+
+from diefpy.dief import _dieft_groups, _diefk_groups, _grouped, _join, _reduce_compared, _segment_sum
+from diefpy.profiling import stage
+
+REGRESSION_METRICS = (('dieft', True), ('diefk', False), ('tfft', False), ('totaltime', False), ('comp', True))
+"""Metrics compared by :func:`compare_datasets` and whether higher values are better."""
+
+DEFAULT_THRESHOLDS = {'dieft': 0.1, 'diefk': 0.1, 'tfft': 0.1, 'totaltime': 0.1, 'comp': 0.0}
+"""Default thresholds of the relative changes of the metrics that are tolerated before reporting a regression."""
+
+
+def _combine(baseline: np.ndarray, candidate: np.ndarray) -> np.ndarray:
+    """Stacks two answer traces and marks their rows with the dataset 0 (baseline) or 1 (candidate)."""
+    dtype = [('test', np.promote_types(baseline['test'].dtype, candidate['test'].dtype)),
+             ('approach', np.promote_types(baseline['approach'].dtype, candidate['approach'].dtype)),
+             ('dataset', np.int8),
+             ('answer', np.promote_types(baseline['answer'].dtype, candidate['answer'].dtype)),
+             ('time', np.promote_types(baseline['time'].dtype, candidate['time'].dtype))]
+    compressed = 'count' in baseline.dtype.names or 'count' in candidate.dtype.names
+    if compressed:
+        dtype.append(('count', int))
+    combined = np.empty(len(baseline) + len(candidate), dtype=dtype)
+    for field in ('test', 'approach', 'answer', 'time'):
+        combined[field] = np.concatenate([baseline[field], candidate[field]])
+    combined['dataset'] = np.repeat([0, 1], [len(baseline), len(candidate)])
+    if compressed:
+        combined['count'] = np.concatenate([df['count'] if 'count' in df.dtype.names else np.ones(len(df), dtype=int)
+                                            for df in (baseline, candidate)])
+    return combined
+
+
+def compare_datasets(baseline: np.ndarray, candidate: np.ndarray, baseline_metrics: np.ndarray = None,
+                     candidate_metrics: np.ndarray = None, continue_to_end: bool = True) -> np.ndarray:
+    """
+    Computes the relative changes of the metrics of each test and approach from a baseline to a candidate.
+
+    **dief@t** is computed until the maximum execution time and **dief@k** for the minimum number of answers of the
+    test and approach in both datasets. The other metrics are only compared if the metrics of both datasets are given.
+    Tests and approaches missing in one of the datasets have NaN values for this dataset.
+
+    :param baseline: Dataframe with the answer traces of the baseline. Attributes of the dataframe: test, approach,
+                     answer, time. The answer traces may be compressed with ``compress_trace``.
+    :param candidate: Dataframe with the answer traces of the candidate with the same attributes.
+    :param baseline_metrics: (optional) Dataframe with the other metrics of the baseline.
+                             Attributes of the dataframe: test, approach, tfft, totaltime, comp.
+    :param candidate_metrics: (optional) Dataframe with the other metrics of the candidate.
+    :param continue_to_end: Indicates whether the AUC should be continued until the end of the time frame
+    :return: Dataframe with one row per test and approach. Attributes of the dataframe: test, approach, and for each
+             compared metric *m*: *m*_baseline, *m*_candidate, *m*_change (relative change).
+
+    **Examples**
+
+    >>> compare_datasets(load_trace("release/traces.csv"), load_trace("build/traces.csv"))
+    >>> compare_datasets(baseline, candidate, baseline_metrics, candidate_metrics, continue_to_end=False)
+    """
+    with stage('compare', rows=len(baseline) + len(candidate)):
+        combined = _combine(baseline, candidate)
+        groups, pair, answer, time, count, starts = _grouped(combined, ('test', 'approach', 'dataset'))
+
+        # Both datasets of a test and approach are compared with each other.
+        end = np.maximum.reduceat(time, starts[:-1]) if len(time) else time
+        produced = np.diff(starts) if count is None else _segment_sum(count, starts)
+        values = {
+            'dieft': _dieft_groups(answer, time, count, starts, _reduce_compared(np.maximum, end, pair),
+                                   continue_to_end),
+            'diefk': _diefk_groups(answer, time, count, starts,
+                                   _reduce_compared(np.minimum, produced, pair).astype(float))
+        }
+
+        first = np.flatnonzero(np.r_[True, pair[1:] != pair[:-1]]) if len(pair) else np.zeros(0, dtype=np.intp)
+        keys = groups[first]
+        metrics = [m for m, _ in REGRESSION_METRICS
+                   if m in values or (baseline_metrics is not None and candidate_metrics is not None)]
+        df = np.empty(len(first), dtype=[('test', combined['test'].dtype), ('approach', combined['approach'].dtype)] +
+                      [(m + suffix, float) for m in metrics for suffix in ('_baseline', '_candidate', '_change')])
+        df['test'] = keys['test']
+        df['approach'] = keys['approach']
+
+        datasets = {'_baseline': (0, baseline_metrics), '_candidate': (1, candidate_metrics)}
+        for suffix, (dataset, other) in datasets.items():
+            mine = groups['dataset'] == dataset
+            for m in metrics:
+                df[m + suffix] = np.nan
+                if m in values:
+                    df[m + suffix][pair[mine]] = values[m][mine]
+                else:
+                    j, found = _join(df, other, ('test', 'approach'))
+                    df[m + suffix][found] = other[m][j]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for m in metrics:
+                df[m + '_change'] = (df[m + '_candidate'] - df[m + '_baseline']) / np.abs(df[m + '_baseline'])
+    return df
+
+
+def find_regressions(comparison: np.ndarray, thresholds: dict = None) -> np.ndarray:
+    """
+    Finds the regressions in a comparison of a baseline and a candidate.
+
+    A metric regressed if its relative change is worse than the threshold, i.e., a metric for which higher values
+    are better decreased by more than the threshold and vice versa. If the baseline has a value, but the candidate
+    has not, e.g., because the candidate did not run a test, the metric regressed as well.
+
+    :param comparison: Dataframe computed by :func:`compare_datasets`.
+    :param thresholds: (optional) Thresholds of the relative changes per metric that override ``DEFAULT_THRESHOLDS``,
+                       e.g., ``{"dieft": 0.05}``; a metric with the threshold ``None`` is not checked.
+    :return: Dataframe with one row per regression. Attributes of the dataframe: test, approach, metric, baseline,
+             candidate, change.
+
+    **Examples**
+
+    >>> find_regressions(compare_datasets(baseline, candidate))
+    >>> find_regressions(comparison, {"dieft": 0.05, "tfft": None})
+    """
+    limits = dict(DEFAULT_THRESHOLDS)
+    limits.update(thresholds or {})
+    parts = []
+    for m, higher_is_better in REGRESSION_METRICS:
+        if limits.get(m) is None or m + '_change' not in comparison.dtype.names:
+            continue
+        baseline, candidate, change = comparison[m + '_baseline'], comparison[m + '_candidate'], comparison[m + '_change']
+        worse = -change if higher_is_better else change
+        with np.errstate(invalid='ignore'):
+            regressed = (worse > limits[m]) | (~np.isnan(baseline) & np.isnan(candidate))
+        rows = np.flatnonzero(regressed)
+        part = np.empty(len(rows), dtype=[('test', comparison['test'].dtype),
+                                          ('approach', comparison['approach'].dtype),
+                                          ('metric', 'U9'),
+                                          ('baseline', float),
+                                          ('candidate', float),
+                                          ('change', float)])
+        part['test'] = comparison['test'][rows]
+        part['approach'] = comparison['approach'][rows]
+        part['metric'] = m
+        part['baseline'] = baseline[rows]
+        part['candidate'] = candidate[rows]
+        part['change'] = change[rows]
+        parts.append(part)
+    if not parts:
+        return np.empty(0, dtype=[('test', comparison['test'].dtype), ('approach', comparison['approach'].dtype),
+                                  ('metric', 'U9'), ('baseline', float), ('candidate', float), ('change', float)])
+    regressions = np.concatenate(parts)
+    return regressions[np.lexsort((regressions['approach'], regressions['test']))]
+
+
+def format_regressions(regressions: np.ndarray) -> str:
+    """
+    Renders regressions as a compact report with one line per regression.
+
+    :param regressions: Dataframe computed by :func:`find_regressions`.
+    :return: The report.
+
+    **Examples**
+
+    >>> print(format_regressions(find_regressions(comparison)))
+    1 regression found:
+    Q9.sparql  Random  dieft  27963.9 -> 20232.4  (-27.6%)
+    """
+    if len(regressions) == 0:
+        return 'No regressions found.'
+    rows = [(test, approach, metric, '%.6g -> %s' % (baseline, '-' if np.isnan(candidate) else '%.6g' % candidate),
+             '(missing)' if np.isnan(candidate) else '(%+.1f%%)' % (100 * change))
+            for test, approach, metric, baseline, candidate, change in regressions.tolist()]
+    widths = [max(len(row[i]) for row in rows) for i in range(4)]
+    lines = ['%d regression%s found:' % (len(rows), '' if len(rows) == 1 else 's')]
+    lines.extend('  '.join(value.ljust(width) for value, width in zip(row[:4], widths)) + '  ' + row[4]
+                 for row in rows)
+    return '\n'.join(lines)
@@ -0,0 +1,112 @@
+"""
+Generation of the standard diefpy report of an experiment.
+
+:func:`build_report` computes "Experiment 1" and "Experiment 2" (see :cite:p:`dief`), plots the execution time,
+the answer traces, and the radar plots of all tests, and writes the tables, the figures, and an index page to
+an output directory. The output directory doubles as :class:`diefpy.store.ResultStore`, i.e., when the report is
+built again, only the metrics, tables, and figures whose inputs have changed are recomputed.
+"""
+import os
+from html import escape
+
+import numpy as np
+
+from diefpy.dief import (DEFAULT_COLORS, continuous_efficiency_with_diefk, performance_of_approaches_with_dieft,
+                         plot_answer_trace, plot_continuous_efficiency_with_diefk, plot_execution_time,
+                         plot_performance_of_approaches_with_dieft, save_metrics, sorted_alphanumeric, _write_csv)
+from diefpy.store import ResultStore, content_hash
+
+
+def _table(store: ResultStore, name: str, df: np.ndarray, write) -> str:
+    # Only write the table if its content changed since the last run.
+    path = os.path.join(store.path, name)
+    key = 'table:' + name
+    digest = content_hash(df)
+    if store.get(key) == digest and os.path.exists(path):
+        store.hits += 1
+    else:
+        store.misses += 1
+        write(df, path)
+        store.put(key, digest)
+    return name
+
+
+def build_report(traces: np.ndarray, metrics: np.ndarray, outdir: str, colors: list = DEFAULT_COLORS,
+                 continue_to_end: bool = True, log_scale: bool = False, fmt: str = 'png',
+                 title: str = 'diefpy report') -> str:
+    """
+    Builds the report of an experiment including tables, figures, and an index page.
+
+    The output directory contains the tables *metrics.csv*, *dieft.csv* ("Experiment 1"), and *diefk.csv*
+    ("Experiment 2"), the figures in the subdirectory *figures*, and the index page *index.html*.
+    Figures are named by the content hash of their inputs; a figure is only plotted if its inputs changed
+    and figures of previous runs that are no longer part of the report are removed.
+
+    :param traces: Dataframe with the answer traces. Attributes of the dataframe: test, approach, answer, time.
+    :param metrics: Dataframe with the other metrics. Attributes of the dataframe: test, approach, tfft, totaltime, comp.
+    :param outdir: Path to the output directory; it is created if it does not exist.
+    :param colors: List of colors to use for the different approaches.
+    :param continue_to_end: Indicates whether the AUC should be continued until the end of the time frame
+    :param log_scale: Indicates whether a logarithmic scale is used for the execution time plot.
+    :param fmt: File format of the figures.
+    :param title: Title of the index page.
+    :return: Path to the index page of the report.
+
+    **Examples**
+
+    >>> build_report(traces, metrics, "report")
+    'report/index.html'
+    """
+    colors = list(colors)
+    approaches = np.unique(traces['approach'])
+    tests = sorted_alphanumeric(np.unique(traces['test']))
+
+    with ResultStore(outdir) as store:
+        exp1 = performance_of_approaches_with_dieft(traces, metrics, continue_to_end, store=store)
+        exp2 = continuous_efficiency_with_diefk(traces, store=store)
+
+        tables = [
+            ('Metrics', _table(store, 'metrics.csv', metrics, save_metrics)),
+            ('Experiment 1: dief@t', _table(store, 'dieft.csv', exp1, _write_csv)),
+            ('Experiment 2: dief@k', _table(store, 'diefk.csv', exp2, _write_csv))
+        ]
+
+        def figure(kind, data, plot):
+            key = content_hash(kind, data, approaches, colors, log_scale)
+            return os.path.relpath(store.figure(key, plot, fmt), outdir)
+
+        execution_time = figure('execution_time', metrics,
+                                lambda: plot_execution_time(metrics, colors, log_scale))
+        sections = []
+        for t in tests:
+            subtrace = traces[traces['test'] == t]
+            subexp1 = exp1[exp1['test'] == t]
+            subexp2 = exp2[exp2['test'] == t]
+            sections.append((t, [
+                figure('answer_trace', subtrace, lambda: plot_answer_trace(traces, t, colors)),
+                figure('dieft', subexp1, lambda: plot_performance_of_approaches_with_dieft(exp1, t, colors)),
+                figure('diefk', subexp2, lambda: plot_continuous_efficiency_with_diefk(exp2, t, colors))
+            ]))
+
+    # Remove the figures of previous runs whose inputs have changed.
+    current = {execution_time}.union(*(figures for _, figures in sections))
+    directory = os.path.join(outdir, 'figures')
+    for name in os.listdir(directory):
+        if os.path.join('figures', name) not in current:
+            os.remove(os.path.join(directory, name))
+
+    html = ['<!DOCTYPE html><html><head><meta charset="utf-8"><title>%s</title>' % escape(title),
+            '<style>body{font-family:sans-serif;margin:2em}img{max-width:32%;vertical-align:top}</style>',
+            '</head><body><h1>%s</h1><h2>Tables</h2><ul>' % escape(title)]
+    html.extend('<li><a href="%s">%s</a></li>' % (escape(path), escape(name)) for name, path in tables)
+    html.append('</ul><h2>Execution Time</h2><img src="%s" alt="Execution Time" style="max-width:100%%">'
+                % escape(execution_time))
+    for t, figures in sections:
+        html.append('<h2>%s</h2>' % escape(t))
+        html.extend('<img src="%s" alt="%s">' % (escape(path), escape(t)) for path in figures)
+    html.append('</body></html>\n')
+
+    index = os.path.join(outdir, 'index.html')
+    with open(index, 'w', encoding='utf8') as f:
+        f.write('\n'.join(html))
+    return index
@@ -0,0 +1,266 @@
+"""
+Local HTTP service exposing the diefpy computations.
+
+The :class:`DiefService` loads answer traces (and optionally the other metrics) once, keeps them in memory
+split per test, and serves **dief@t**, **dief@k**, the metrics of "Experiment 1", and plots as JSON or SVG.
+Responses are cached, such that repeated requests are served without recomputation.
+:func:`make_server` exposes a service via ``http.server``; no dependencies beyond the standard library are required.
+
+The service answers GET requests to the following paths:
+
+* ``/datasets``: names of the loaded datasets,
+* ``/<dataset>/tests``: tests and approaches of a dataset,
+* ``/<dataset>/dieft?test=<test>[&t=<t>][&continue_to_end=false]``: dief@t,
+* ``/<dataset>/diefk?test=<test>[&k=<k>|&kp=<kp>]``: dief@k,
+* ``/<dataset>/metrics[?test=<test>]``: results of "Experiment 1"; requires the metrics of the dataset,
+* ``/<dataset>/plot/answer_trace.svg?test=<test>``, ``/<dataset>/plot/execution_time.svg[?log_scale=true]``,
+  ``/<dataset>/plot/dieft.svg?test=<test>``, and ``/<dataset>/plot/diefk.svg?test=<test>``: plots as SVG.
+"""
+import json
+import logging
+import math
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+import numpy as np
+
+from diefpy.dief import (continuous_efficiency_with_diefk, diefk, diefk2, dieft, load_metrics, load_trace,
+                         performance_of_approaches_with_dieft)
+from diefpy.svg import (svg_answer_trace, svg_continuous_efficiency_with_diefk, svg_execution_time,
+                        svg_performance_of_approaches_with_dieft)
+
+logger = logging.getLogger('diefpy')
+
+
+class ServiceError(Exception):
+    """Error answering a request; carries the HTTP status code."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _records(df: np.ndarray) -> list:
+    """Converts a dataframe into a list of dictionaries with plain Python values."""
+    return [dict(zip(df.dtype.names, row)) for row in df.tolist()]
+
+
+def _plain(value):
+    """Replaces the non-finite numbers, e.g., the NaN of missing metrics, by None, which is valid in JSON."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _plain(v) for key, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+
+def _flag(value: str) -> bool:
+    return value.lower() in ('1', 'true', 'yes')
+
+
+class _Dataset:
+    """Answer traces and metrics of a dataset indexed by test; results of experiments are computed lazily."""
+
+    def __init__(self, traces: np.ndarray, metrics: np.ndarray = None):
+        self.traces = traces
+        self.metrics = metrics
+        self.tests = np.unique(traces['test'])
+        self.approaches = np.unique(traces['approach'])
+        order = np.argsort(traces['test'], kind='stable')
+        bounds = np.searchsorted(traces['test'][order], self.tests, side='right')
+        self.subtraces = dict(zip(self.tests.tolist(), np.split(traces[order], bounds[:-1])))
+        self._exp1 = None
+        self._exp2 = None
+        self._lock = threading.Lock()
+
+    def subtrace(self, test: str) -> np.ndarray:
+        if test not in self.subtraces:
+            raise ServiceError(404, "unknown test '%s'" % test)
+        return self.subtraces[test]
+
+    def exp1(self) -> np.ndarray:
+        if self.metrics is None:
+            raise ServiceError(404, 'no metrics loaded for the dataset')
+        # Concurrent requests wait for the first one to compute the results.
+        with self._lock:
+            if self._exp1 is None:
+                self._exp1 = performance_of_approaches_with_dieft(self.traces, self.metrics)
+        return self._exp1
+
+    def exp2(self) -> np.ndarray:
+        with self._lock:
+            if self._exp2 is None:
+                self._exp2 = continuous_efficiency_with_diefk(self.traces)
+        return self._exp2
+
+
+class DiefService:
+    """
+    In-memory datasets of answer traces with cached computations, answering requests given by path and query.
+
+    :param cache_size: Maximum number of responses kept in the cache.
+
+    **Examples**
+
+    >>> service = DiefService()
+    >>> service.load("example", "data/traces.csv", "data/metrics.csv")
+    >>> status, content_type, body = service.request("/example/dieft?test=Q9.sparql")
+    """
+
+    def __init__(self, cache_size: int = 1024):
+        self.cache_size = cache_size
+        self._datasets = {}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, name: str, traces, metrics=None):
+        """
+        Loads a dataset; a dataset with the same name is replaced.
+
+        :param name: Name of the dataset used in the paths of the requests.
+        :param traces: Dataframe with the answer traces or path to a file readable with ``load_trace``.
+        :param metrics: (optional) Dataframe with the other metrics or path to a file readable with ``load_metrics``.
+        """
+        if not isinstance(traces, np.ndarray):
+            traces = load_trace(traces)
+        if metrics is not None and not isinstance(metrics, np.ndarray):
+            metrics = load_metrics(metrics)
+        dataset = _Dataset(traces, metrics)
+        with self._lock:
+            self._datasets[name] = dataset
+            self._generation += 1
+            for key in [key for key in self._cache if key[0] in (name, 'datasets')]:
+                del self._cache[key]
+
+    def datasets(self) -> list:
+        """Returns the names of the loaded datasets."""
+        return sorted(self._datasets)
+
+    def request(self, url: str):
+        """
+        Answers a request.
+
+        :param url: Path and query of the request, e.g., ``/example/dieft?test=Q9.sparql&t=7.5``.
+        :return: Tuple (status, content type, body).
+        """
+        parts = urlsplit(url)
+        path = [unquote(p) for p in parts.path.split('/') if p]
+        query = dict(parse_qsl(parts.query))
+        key = (path[0] if path else '', tuple(path[1:]), tuple(sorted(query.items())))
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            generation = self._generation
+        try:
+            content_type, body = self._answer(path, query)
+            response = (200, content_type, body)
+        except ServiceError as e:
+            return e.status, 'application/json', json.dumps({'error': str(e)}).encode('utf8')
+        except (KeyError, ValueError) as e:
+            return 400, 'application/json', json.dumps({'error': 'invalid request: %s' % e}).encode('utf8')
+        except Exception as e:
+            logger.exception('Error answering %s', url)
+            return 500, 'application/json', json.dumps({'error': 'internal error: %s' % e}).encode('utf8')
+        with self._lock:
+            self.misses += 1
+            # A response computed from a dataset that was replaced in the meantime is not cached.
+            if generation != self._generation:
+                return response
+            self._cache[key] = response
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return response
+
+    def _answer(self, path: list, query: dict):
+        if path == ['datasets']:
+            return self._json(self.datasets())
+        if not path or path[0] not in self._datasets:
+            raise ServiceError(404, 'unknown dataset or path')
+        dataset = self._datasets[path[0]]
+        resource = '/'.join(path[1:])
+
+        if resource == 'tests':
+            return self._json({'tests': dataset.tests.tolist(), 'approaches': dataset.approaches.tolist()})
+        if resource == 'dieft':
+            test = query['test']
+            return self._json(_records(dieft(dataset.subtrace(test), test, float(query.get('t', -1)),
+                                             _flag(query.get('continue_to_end', 'true')))))
+        if resource == 'diefk':
+            test = query['test']
+            if 'kp' in query:
+                return self._json(_records(diefk2(dataset.subtrace(test), test, float(query['kp']))))
+            return self._json(_records(diefk(dataset.subtrace(test), test, float(query.get('k', -1)))))
+        if resource == 'metrics':
+            exp1 = dataset.exp1()
+            if 'test' in query:
+                dataset.subtrace(query['test'])
+                exp1 = exp1[exp1['test'] == query['test']]
+            return self._json(_records(exp1))
+        if resource == 'plot/answer_trace.svg':
+            test = query['test']
+            return self._svg(svg_answer_trace(dataset.subtrace(test), test))
+        if resource == 'plot/execution_time.svg':
+            if dataset.metrics is None:
+                raise ServiceError(404, 'no metrics loaded for the dataset')
+            return self._svg(svg_execution_time(dataset.metrics, log_scale=_flag(query.get('log_scale', 'false'))))
+        if resource == 'plot/dieft.svg':
+            test = query['test']
+            dataset.subtrace(test)
+            return self._svg(svg_performance_of_approaches_with_dieft(dataset.exp1(), test))
+        if resource == 'plot/diefk.svg':
+            test = query['test']
+            dataset.subtrace(test)
+            return self._svg(svg_continuous_efficiency_with_diefk(dataset.exp2(), test))
+        raise ServiceError(404, "unknown path '/%s'" % '/'.join(path))
+
+    @staticmethod
+    def _json(value):
+        return 'application/json', json.dumps(_plain(value), allow_nan=False).encode('utf8')
+
+    @staticmethod
+    def _svg(svg: str):
+        return 'image/svg+xml', svg.encode('utf8')
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def do_GET(self):
+        status, content_type, body = self.service.request(self.path)
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(service: DiefService, host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """
+    Creates an HTTP server answering requests with the given service.
+
+    :param service: The service answering the requests.
+    :param host: Host name or address to listen on; by default, only local connections are accepted.
+    :param port: Port to listen on; by default, a free port is chosen (see ``server.server_address``).
+    :return: The HTTP server; call ``serve_forever`` to start serving.
+
+    **Examples**
+
+    >>> service = DiefService()
+    >>> service.load("example", "data/traces.csv", "data/metrics.csv")
+    >>> make_server(service, port=8080).serve_forever()
+    """
+    handler = type('RequestHandler', (_RequestHandler,), {'service': service})
+    return ThreadingHTTPServer((host, port), handler)
@@ -0,0 +1,200 @@
+"""
+On-disk store of computed results for the incremental re-computation of experiments.
+
+Results are keyed by a content hash of the answer trace of each test and approach together with the
+parameters of the metric. Hence, when new tests or approaches are added to the answer traces,
+only the results of the new or changed answer traces are computed; all others are read from the store.
+The same holds for figures, which are stored keyed by the content hash of their inputs.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from diefpy.dief import _group_approaches, _result, diefk, dieft
+
+
+def content_hash(*arrays, **params) -> str:
+    """
+    Computes a hash of the content of the given arrays and parameters.
+
+    :param arrays: Arrays (or other values) to include in the hash.
+    :param params: Named parameters to include in the hash.
+    :return: Hexadecimal SHA-256 digest.
+
+    **Examples**
+
+    >>> content_hash(subtrace['answer'], subtrace['time'], t=7.5)
+    """
+    h = hashlib.sha256()
+    for a in arrays:
+        if isinstance(a, np.ndarray):
+            a = np.ascontiguousarray(a)
+            h.update(('%s%s' % (a.dtype.descr, a.shape)).encode('utf8'))
+            h.update(a.tobytes())
+        else:
+            h.update(repr(a).encode('utf8'))
+        h.update(b'\0')
+    for name in sorted(params):
+        h.update(('%s=%r\0' % (name, params[name])).encode('utf8'))
+    return h.hexdigest()
+
+
+class ResultStore:
+    """
+    Directory storing computed metrics and figures keyed by the content hash of their inputs.
+
+    The store is used by passing it to :func:`diefpy.dief.performance_of_approaches_with_dieft` or
+    :func:`diefpy.dief.continuous_efficiency_with_diefk`. The results are written to disk by :meth:`save`
+    or when leaving the context if the store is used as a context manager.
+
+    :param path: Path to the directory of the store; it is created if it does not exist.
+
+    **Examples**
+
+    >>> with ResultStore("results") as store:
+    ...     performance_of_approaches_with_dieft(traces, metrics, store=store)
+    ...     continuous_efficiency_with_diefk(traces, store=store)
+    """
+    INDEX = 'results.json'
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        index = os.path.join(path, self.INDEX)
+        self._results = {}
+        if os.path.exists(index):
+            with open(index, 'r', encoding='utf8') as f:
+                self._results = json.load(f)
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.save()
+        return False
+
+    def __len__(self):
+        return len(self._results)
+
+    def get(self, key: str):
+        """Returns the result stored for the key or ``None``."""
+        return self._results.get(key)
+
+    def put(self, key: str, value):
+        """Stores the result for the key."""
+        self._results[key] = value
+        self._dirty = True
+
+    def save(self):
+        """Writes the results to disk."""
+        if not self._dirty:
+            return
+        index = os.path.join(self.path, self.INDEX)
+        with open(index + '.tmp', 'w', encoding='utf8') as f:
+            json.dump(self._results, f)
+        os.replace(index + '.tmp', index)
+        self._dirty = False
+
+    def _cached(self, metric: str, results: np.ndarray, inputtest: str, compute, **params) -> np.ndarray:
+        # Look up the result for the answer trace of each approach; compute only the missing ones.
+        approaches = np.unique(results['approach'])
+        order, starts = _group_approaches(results, approaches)
+        keys = []
+        for i in range(len(approaches)):
+            rows = results[order[starts[i]:starts[i + 1]]]
+            keys.append(content_hash(metric, rows['answer'], rows['time'], **params))
+        values = np.array([self._results.get(key, np.nan) for key in keys], dtype=float)
+
+        missing = np.isnan(values)
+        self.hits += int((~missing).sum())
+        self.misses += int(missing.sum())
+        if missing.any():
+            computed = compute(results[np.isin(results['approach'], approaches[missing])])
+            values[missing] = computed[metric]
+            for key, value in zip(np.array(keys)[missing], computed[metric]):
+                self.put(str(key), float(value))
+        return _result(inputtest, approaches, metric, values, results)
+
+    def dieft(self, inputtrace: np.ndarray, inputtest: str, t: float = -1.0, continue_to_end: bool = True) -> np.ndarray:
+        """
+        Computes the **dief@t** metric like :func:`diefpy.dief.dieft`, reusing stored results.
+
+        :param inputtrace: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
+        :param inputtest: Specifies the specific test to analyze from the answer trace.
+        :param t: Point in time to compute dief@t for. By default, the function computes the maximum of the execution time
+                  among the approaches in the answer trace.
+        :param continue_to_end: Indicates whether the AUC should be continued until the end of the time frame
+        :return: Dataframe with the dief@t values for each approach. Attributes of the dataframe: test, approach, dieft.
+        """
+        results = inputtrace[inputtrace['test'] == inputtest]
+        if t == -1:
+            t = np.max(results['time'])
+        return self._cached('dieft', results, inputtest,
+                            lambda subtrace: dieft(subtrace, inputtest, t, continue_to_end),
+                            t=float(t), continue_to_end=bool(continue_to_end))
+
+    def diefk(self, inputtrace: np.ndarray, inputtest: str, k: int = -1) -> np.ndarray:
+        """
+        Computes the **dief@k** metric like :func:`diefpy.dief.diefk`, reusing stored results.
+
+        :param inputtrace: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
+        :param inputtest: Specifies the specific test to analyze from the answer trace.
+        :param k: Number of answers to compute dief@k for. By default, the function computes the minimum of the total number
+                  of answers produced by the approaches.
+        :return: Dataframe with the dief@k values for each approach. Attributes of the dataframe: test, approach, diefk.
+        """
+        results = inputtrace[inputtrace['test'] == inputtest]
+        if k == -1:
+            _, starts = _group_approaches(results, np.unique(results['approach']))
+            k = np.diff(starts).min()
+        return self._cached('diefk', results, inputtest,
+                            lambda subtrace: diefk(subtrace, inputtest, k),
+                            k=float(k))
+
+    def diefk2(self, inputtrace: np.ndarray, inputtest: str, kp: float = -1.0) -> np.ndarray:
+        """
+        Computes the **dief@k** metric like :func:`diefpy.dief.diefk2`, reusing stored results.
+
+        :param inputtrace: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
+        :param inputtest: Specifies the specific test to analyze from the answer trace.
+        :param kp: Ratio of answers to compute dief@k for (kp in [0.0;1.0]).
+        :return: Dataframe with the dief@k values for each approach. Attributes of the dataframe: test, approach, diefk.
+        """
+        results = inputtrace[inputtrace['test'] == inputtest]
+        _, starts = _group_approaches(results, np.unique(results['approach']))
+        k = np.diff(starts).min()
+        if kp > -1:
+            k = k * kp
+        return self.diefk(results, inputtest, k)
+
+    def figure(self, key: str, plot, fmt: str = 'png', **kwargs) -> str:
+        """
+        Returns the path to the figure stored for the key; the figure is only plotted if it is not yet stored.
+
+        :param key: Key of the figure, e.g., the :func:`content_hash` of the inputs of the plot.
+        :param plot: Function without arguments returning the matplotlib figure.
+        :param fmt: File format of the figure.
+        :param kwargs: Additional arguments passed to ``savefig``.
+        :return: Path to the stored figure.
+
+        **Examples**
+
+        >>> store.figure(content_hash(subtrace, colors), lambda: plot_answer_trace(subtrace, "Q9.sparql"))
+        """
+        import matplotlib.pyplot as plt
+
+        path = os.path.join(self.path, 'figures', '%s.%s' % (key, fmt))
+        if os.path.exists(path):
+            self.hits += 1
+            return path
+        self.misses += 1
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fig = plot()
+        fig.savefig(path, format=fmt, **kwargs)
+        plt.close(fig)
+        return path
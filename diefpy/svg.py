@@ -0,0 +1,282 @@
+"""
+Lightweight rendering of the diefpy plots as SVG.
+
+The functions in this module produce the same charts as the matplotlib-based plotting functions of
+:mod:`diefpy.dief`, i.e., answer traces, execution time, and the radar plots of "Experiment 1" and "Experiment 2",
+from the same inputs. The charts are written directly as SVG markup without using matplotlib, which renders a chart in
+milliseconds. :func:`html_page` combines several charts into a self-contained HTML page.
+"""
+import math
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+from diefpy.dief import DEFAULT_COLORS, pivot_metrics, sorted_alphanumeric
+from diefpy.profiling import stage
+
+_FONT = 'font-family="DejaVu Sans, Arial, sans-serif"'
+
+
+def _ticks(lower: float, upper: float, n: int = 6) -> np.ndarray:
+    """Returns about *n* evenly spaced, round tick values covering [lower, upper]."""
+    if upper <= lower:
+        upper = lower + 1.0
+    raw = (upper - lower) / n
+    magnitude = 10 ** math.floor(math.log10(raw))
+    step = min((s * magnitude for s in (1, 2, 2.5, 5, 10) if s * magnitude >= raw), default=10 * magnitude)
+    return np.arange(math.floor(lower / step) * step, upper + step / 2, step)
+
+
+def _fmt(value: float) -> str:
+    return ('%.6g' % value).replace('e+0', 'e').replace('e-0', 'e-')
+
+
+def _svg(width: int, height: int, body: list) -> str:
+    return ('<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="%d" viewBox="0 0 %d %d">'
+            '<rect width="100%%" height="100%%" fill="white"/>%s</svg>') % (width, height, width, height, ''.join(body))
+
+
+def _text(x: float, y: float, text: str, size: int = 12, anchor: str = 'middle', extra: str = '') -> str:
+    return '<text x="%.1f" y="%.1f" font-size="%d" text-anchor="%s" %s %s>%s</text>' % (
+        x, y, size, anchor, _FONT, extra, escape(str(text)))
+
+
+def _legend(x: float, y: float, labels: list, color_map: dict, marker: str = 'line') -> list:
+    body = []
+    for i, label in enumerate(labels):
+        yy = y + 18 * i
+        if marker == 'line':
+            body.append('<line x1="%.1f" y1="%.1f" x2="%.1f" y2="%.1f" stroke="%s" stroke-width="2"/>' % (
+                x, yy, x + 20, yy, color_map[label]))
+        else:
+            body.append('<rect x="%.1f" y="%.1f" width="12" height="12" fill="%s"/>' % (x + 4, yy - 6, color_map[label]))
+        body.append(_text(x + 26, yy + 4, label, anchor='start'))
+    return body
+
+
+def _axes(left: float, top: float, width: float, height: float, xticks, xpos, yticks, ypos, xlabel: str,
+          ylabel: str, title: str) -> list:
+    body = ['<rect x="%.1f" y="%.1f" width="%.1f" height="%.1f" fill="none" stroke="black"/>' % (left, top, width, height)]
+    for value, x in zip(xticks, xpos):
+        body.append('<line x1="%.1f" y1="%.1f" x2="%.1f" y2="%.1f" stroke="black"/>' % (x, top + height, x, top + height + 4))
+        body.append(_text(x, top + height + 18, _fmt(value), 11))
+    for value, y in zip(yticks, ypos):
+        body.append('<line x1="%.1f" y1="%.1f" x2="%.1f" y2="%.1f" stroke="black"/>' % (left - 4, y, left, y))
+        body.append(_text(left - 7, y + 4, _fmt(value), 11, anchor='end'))
+    body.append(_text(left + width / 2, top + height + 40, xlabel, 13))
+    body.append(_text(left - 50, top + height / 2, ylabel, 13, extra='transform="rotate(-90 %.1f %.1f)"' % (
+        left - 50, top + height / 2)))
+    body.append(_text(left + width / 2, top - 14, title, 16))
+    return body
+
+
+def svg_answer_trace(inputtrace: np.ndarray, inputtest: str, colors: list = DEFAULT_COLORS,
+                     width: int = 800, height: int = 480) -> str:
+    """
+    Renders the answer trace of a given test for all approaches as SVG.
+
+    The chart corresponds to ``plot_answer_trace``. Answers that fall onto the same pixel are drawn only once.
+
+    :param inputtrace: Dataframe with the answer trace. Attributes of the dataframe: test, approach, answer, time.
+    :param inputtest: Specifies the specific test to analyze from the answer trace.
+    :param colors: List of colors to use for the different approaches.
+    :param width: Width of the chart in pixels.
+    :param height: Height of the chart in pixels.
+    :return: SVG markup of the chart.
+
+    **Examples**
+
+    >>> svg_answer_trace(traces, "Q9.sparql")
+    """
+    results = inputtrace[inputtrace['test'] == inputtest]
+    approaches = np.unique(inputtrace['approach'])
+    color_map = dict(zip(approaches, colors))
+
+    with stage('plot', inputtest, len(results)):
+        left, top, right, bottom = 80, 50, 20, 60
+        pw, ph = width - left - right, height - top - bottom
+        xticks = _ticks(0, np.max(results['time']) if len(results) else 1.0)
+        yticks = _ticks(0, np.max(results['answer']) if len(results) else 1.0)
+        xmax, ymax = xticks[-1] or 1.0, yticks[-1] or 1.0
+
+        body = _axes(left, top, pw, ph, xticks, left + xticks / xmax * pw, yticks, top + ph - yticks / ymax * ph,
+                     'Time', '# Answers Produced', inputtest)
+        labels = []
+        for a in approaches:
+            subtrace = results[results['approach'] == a]
+            if subtrace.size == 0:
+                continue
+            labels.append(a)
+            x = np.rint((left + subtrace['time'] / xmax * pw) * 2) / 2
+            y = np.rint((top + ph - subtrace['answer'] / ymax * ph) * 2) / 2
+            points = np.unique(np.stack((x, y), axis=1), axis=0)
+            path = ''.join('M%.1f %.1fh0' % (px, py) for px, py in points)
+            body.append('<path d="%s" stroke="%s" stroke-width="5" stroke-linecap="round"/>' % (path, color_map[a]))
+        body.extend(_legend(left + 12, top + 16, labels, color_map, marker='box'))
+
+    return _svg(width, height, body)
+
+
+def svg_execution_time(metrics: np.ndarray, colors: list = DEFAULT_COLORS, log_scale: bool = False,
+                       height: int = 420) -> str:
+    """
+    Renders a bar chart with the overall *execution time* for all the tests and approaches in the metrics data as SVG.
+
+    The chart corresponds to ``plot_execution_time``.
+
+    :param metrics: Dataframe with the metrics. Attributes of the dataframe: test, approach, tfft, totaltime, comp.
+    :param colors: List of colors to use for the different approaches.
+    :param log_scale: (optional) If log_scale is set to True, logarithmic scale for the y-axis will be used.
+    :param height: Height of the chart in pixels.
+    :return: SVG markup of the chart.
+
+    **Examples**
+
+    >>> svg_execution_time(metrics, log_scale=True)
+    """
+    tests, approaches, pivot = pivot_metrics(metrics)
+    order = np.searchsorted(tests, sorted_alphanumeric(tests))
+    tests = tests[order].tolist()
+    totaltime = np.nan_to_num(pivot['totaltime'][order])
+    color_map = dict(zip(approaches, colors))
+
+    with stage('plot', rows=len(metrics)):
+        left, top, right, bottom = 80, 50, 140, 140
+        pw = max(90 * len(tests), 200)
+        ph = height - top - bottom
+        width = left + pw + right
+
+        if log_scale:
+            positive = totaltime[totaltime > 0]
+            lo = math.floor(math.log10(positive.min())) if positive.size else 0
+            hi = math.ceil(math.log10(positive.max())) if positive.size else 1
+            hi = max(hi, lo + 1)
+            yticks = 10.0 ** np.arange(lo, hi + 1)
+
+            def scale(v):
+                return np.clip((np.log10(np.maximum(v, 10.0 ** lo)) - lo) / (hi - lo), 0, 1)
+        else:
+            yticks = _ticks(0, totaltime.max() if totaltime.size else 1.0)
+
+            def scale(v):
+                return v / (yticks[-1] or 1.0)
+
+        # Without any tests, only the axes are drawn.
+        slot = pw / max(len(tests), 1)
+        body = _axes(left, top, pw, ph, [], [], yticks, top + ph - scale(yticks) * ph,
+                     '', 'Execution Time [s]', 'Execution Time for Performed Tests')
+        bar = 0.8 * slot / max(len(approaches), 1)
+        heights = scale(totaltime) * ph
+        for i, t in enumerate(tests):
+            for j, a in enumerate(approaches):
+                x = left + slot * (i + 0.1) + j * bar
+                body.append('<rect x="%.1f" y="%.1f" width="%.1f" height="%.1f" fill="%s"/>' % (
+                    x, top + ph - heights[i, j], bar, heights[i, j], color_map[a]))
+            cx = left + slot * (i + 0.5)
+            body.append(_text(cx, top + ph + 12, t, 11, anchor='end',
+                              extra='transform="rotate(-90 %.1f %.1f)"' % (cx, top + ph + 12)))
+        body.append(_text(left + pw / 2, height - 12, 'Performed Test', 13))
+        body.extend(_legend(left + pw + 12, top + 10, list(approaches), color_map, marker='box'))
+
+    return _svg(width, height, body)
+
+
+def _svg_radar(values: np.ndarray, labels: list, spoke_labels: list, title: str, color_map: dict, size: int) -> str:
+    # Normalize the values per spoke by their maximum.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = np.nan_to_num(values / values.max(axis=0))
+    n = len(spoke_labels)
+    cx, cy, radius = size / 2, size / 2 + 15, size / 2 - 80
+    theta = np.pi / 2 - 2 * np.pi * np.arange(n) / n
+    ux, uy = np.cos(theta), -np.sin(theta)
+
+    def polygon(r):
+        return ' '.join('%.1f,%.1f' % (cx + ri * x * radius, cy + ri * y * radius) for ri, x, y in zip(r, ux, uy))
+
+    body = []
+    for level in (0.2, 0.4, 0.6, 0.8, 1.0):
+        body.append('<polygon points="%s" fill="none" stroke="%s"/>' % (
+            polygon([level] * n), 'grey' if level == 1.0 else '#dddddd'))
+    for x, y, label in zip(ux, uy, spoke_labels):
+        body.append('<line x1="%.1f" y1="%.1f" x2="%.1f" y2="%.1f" stroke="#dddddd"/>' % (
+            cx, cy, cx + x * radius, cy + y * radius))
+        anchor = 'middle' if abs(x) < 0.1 else ('start' if x > 0 else 'end')
+        body.append(_text(cx + x * (radius + 12), cy + y * (radius + 12) + 5, label, 14, anchor=anchor))
+    for row, label in zip(values, labels):
+        body.append('<polygon points="%s" fill="%s" fill-opacity="0.15" stroke="%s" stroke-width="1.5"/>' % (
+            polygon(row), color_map[label], color_map[label]))
+    body.append(_text(cx, 24, title, 16))
+    body.extend(_legend(size - 130, 50, labels, color_map))
+    return _svg(size, size, body)
+
+
+def svg_performance_of_approaches_with_dieft(allmetrics: np.ndarray, q: str, colors: list = DEFAULT_COLORS,
+                                             size: int = 480) -> str:
+    """
+    Renders the radar plot that compares **dief@t** with conventional metrics for a specific test as SVG.
+
+    The chart corresponds to ``plot_performance_of_approaches_with_dieft``.
+
+    :param allmetrics: Dataframe with all the metrics from "Experiment 1".
+    :param q: ID of the selected test to plot.
+    :param colors: List of colors to use for the different approaches.
+    :param size: Width and height of the chart in pixels.
+    :return: SVG markup of the chart.
+
+    **Examples**
+
+    >>> svg_performance_of_approaches_with_dieft(extended_metrics, "Q9.sparql")
+    """
+    approaches = np.unique(allmetrics['approach'])
+    color_map = dict(zip(approaches, colors))
+    submetrics = allmetrics[allmetrics['test'] == q]
+    submetrics = submetrics[np.argsort(submetrics['approach'], kind='stable')]
+    with stage('plot', q, len(submetrics)):
+        values = np.stack([submetrics[m].astype(float) for m in ('invtfft', 'invtotaltime', 'comp', 'throughput', 'dieft')],
+                          axis=1)
+        return _svg_radar(values, list(submetrics['approach']), ['(TFFT)^-1', '(ET)^-1', 'Comp', 'T', 'dief@t'],
+                          q, color_map, size)
+
+
+def svg_continuous_efficiency_with_diefk(diefkDF: np.ndarray, q: str, colors: list = DEFAULT_COLORS,
+                                         size: int = 480) -> str:
+    """
+    Renders the radar plot that compares **dief@k** at different answer completeness percentages for a specific test as SVG.
+
+    The chart corresponds to ``plot_continuous_efficiency_with_diefk``.
+
+    :param diefkDF: Dataframe with the results from "Experiment 2".
+    :param q: ID of the selected test to plot.
+    :param colors: List of colors to use for the different approaches.
+    :param size: Width and height of the chart in pixels.
+    :return: SVG markup of the chart.
+
+    **Examples**
+
+    >>> svg_continuous_efficiency_with_diefk(diefkDF, "Q9.sparql")
+    """
+    approaches = np.unique(diefkDF['approach'])
+    color_map = dict(zip(approaches, colors))
+    submetrics = diefkDF[diefkDF['test'] == q]
+    submetrics = submetrics[np.argsort(submetrics['approach'], kind='stable')]
+    with stage('plot', q, len(submetrics)):
+        values = np.stack([submetrics[m].astype(float) for m in ('diefk25', 'diefk50', 'diefk75', 'diefk100')], axis=1)
+        return _svg_radar(values, list(submetrics['approach']), ['k=25%', 'k=50%', 'k=75%', 'k=100%'],
+                          q, color_map, size)
+
+
+def html_page(charts: list, title: str = 'diefpy') -> str:
+    """
+    Combines SVG charts into a self-contained HTML page.
+
+    :param charts: List of SVG markups, e.g., produced by the functions of this module.
+    :param title: Title of the page.
+    :return: HTML markup of the page.
+
+    **Examples**
+
+    >>> html_page([svg_execution_time(metrics), svg_answer_trace(traces, "Q9.sparql")], "Report")
+    """
+    return ('<!DOCTYPE html><html><head><meta charset="utf-8"><title>%s</title>'
+            '<style>body{font-family:sans-serif;margin:2em}svg{margin:0.5em;vertical-align:top}</style>'
+            '</head><body><h1>%s</h1>%s</body></html>') % (escape(title), escape(title), '\n'.join(charts))
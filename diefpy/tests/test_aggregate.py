@@ -0,0 +1,68 @@
+import pickle
+
+import numpy as np
+import pytest
+from pkg_resources import resource_filename
+
+import diefpy.dief as diefpy
+from diefpy.aggregate import TraceAggregate
+
+TIMES = [0.5, 5.0, 7.5, 100.0]
+ANSWERS = [1, 2, 6, 100, 1000, 5151]
+
+
+@pytest.fixture(scope="session")
+def traces():
+    input_file_traces = resource_filename('diefpy', 'data/traces.csv')
+    return diefpy.load_trace(input_file_traces)
+
+
+def assert_exact(aggregate, traces):
+    for test in ['Q9.rq', 'Q14.rq']:
+        for t in [-1] + TIMES:
+            for continue_to_end in [True, False]:
+                expected = diefpy.dieft(traces, test, t, continue_to_end)
+                actual = aggregate.dieft(test, t, continue_to_end)
+                assert actual['approach'].tolist() == expected['approach'].tolist()
+                assert actual['dieft'] == pytest.approx(expected['dieft'])
+        for k in ANSWERS:
+            assert aggregate.diefk(test, k)['diefk'] == pytest.approx(diefpy.diefk(traces, test, k)['diefk'])
+
+
+def test_row_chunks(traces):
+    chunks = np.array_split(traces, 7)
+    parts = [TraceAggregate.from_trace(chunk, TIMES, ANSWERS) for chunk in chunks]
+    aggregate = TraceAggregate.merge_all(parts)
+    assert_exact(aggregate, traces)
+    # associative
+    left = (parts[0] + parts[1]) + parts[2]
+    right = parts[0] + (parts[1] + parts[2])
+    assert left.dieft('Q9.rq', 5.0).tolist() == pytest.approx(right.dieft('Q9.rq', 5.0).tolist())
+
+
+def test_time_chunks(traces):
+    ranges = [(0, 1), (1, 3), (3, 50), (50, np.inf)]
+    parts = [TraceAggregate.from_trace(traces[(traces['time'] >= lo) & (traces['time'] < hi)], TIMES, ANSWERS)
+             for lo, hi in ranges]
+    # later chunks may come first
+    aggregate = parts[3] + ((parts[1] + parts[0]) + parts[2])
+    assert_exact(aggregate, traces)
+
+    metrics = aggregate.metrics()
+    for row in metrics:
+        rows = traces[(traces['test'] == row['test']) & (traces['approach'] == row['approach'])]
+        assert row.tolist()[2:] == (rows['time'][0], rows['time'][-1], rows['answer'][-1])
+
+
+def test_pickle_and_errors(traces):
+    aggregate = pickle.loads(pickle.dumps(TraceAggregate.from_trace(traces, TIMES, ANSWERS)))
+    assert len(aggregate) == 6
+    assert_exact(aggregate, traces)
+    with pytest.raises(ValueError):
+        aggregate.dieft('Q9.rq', 3.0)
+    with pytest.raises(ValueError):
+        aggregate.diefk('Q9.rq', 3)
+    with pytest.raises(ValueError):
+        aggregate + TraceAggregate.from_trace(traces, TIMES)
+    with pytest.raises(ValueError):
+        aggregate + TraceAggregate.from_trace(traces, TIMES, ANSWERS)
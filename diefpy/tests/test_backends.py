@@ -0,0 +1,126 @@
+import json
+import pathlib
+
+import numpy as np
+import pytest
+from pkg_resources import resource_filename
+
+import diefpy.dief as diefpy
+from diefpy.backends import available_backends, get_backend, set_backend
+
+
+@pytest.fixture(scope="session")
+def traces():
+    input_file_traces = resource_filename('diefpy', 'data/traces.csv')
+    return diefpy.load_trace(input_file_traces)
+
+
+def expected_values(name):
+    file_name = resource_filename('diefpy', 'tests/expected_values/%s.json' % name)
+    return json.loads(pathlib.Path(file_name).read_text())
+
+
+@pytest.fixture(params=available_backends())
+def backend(request):
+    previous = get_backend().name
+    yield set_backend(request.param)
+    set_backend(previous)
+
+
+def test_expected_values(backend, traces):
+    for approach, tests in expected_values('dieft').items():
+        for test, values in tests.items():
+            for time, value in values.items():
+                res = diefpy.dieft(traces, test, float(time), continue_to_end=False)
+                assert res[res['approach'] == approach]['dieft'][0] == pytest.approx(value, abs=1e-3)
+    for approach, tests in expected_values('diefk').items():
+        for test, values in tests.items():
+            for answers, value in values.items():
+                res = diefpy.diefk(traces, test, int(answers))
+                assert res[res['approach'] == approach]['diefk'][0] == pytest.approx(value, abs=1e-3)
+    for approach, tests in expected_values('diefk2').items():
+        for test, values in tests.items():
+            for percentage, value in values.items():
+                res = diefpy.diefk2(traces, test, float(percentage))
+                assert res[res['approach'] == approach]['diefk'][0] == pytest.approx(value, abs=1e-3)
+
+
+def test_kernels(backend):
+    rng = np.random.default_rng(42)
+    codes = rng.integers(0, 5, size=200)
+    x = rng.random(200)
+    order, starts = backend.group(codes, 6)
+    assert np.array_equal(order, np.argsort(codes, kind='stable'))
+    assert starts[-2] == starts[-1] == 200
+
+    x = x[order]
+    for i in range(6):
+        x[starts[i]:starts[i + 1]].sort()
+    y = np.arange(200)
+    auc = backend.segment_auc(x, y, starts)
+    prefix = backend.prefix_auc(x, y, starts)
+    queries = rng.random(50)
+    segments = rng.integers(0, 6, size=50)
+    found = backend.segment_searchsorted(x, starts, segments, queries, side='right')
+    for i in range(6):
+        seg = slice(starts[i], starts[i + 1])
+        expected = np.trapz(y[seg], x[seg]) if starts[i + 1] - starts[i] > 1 else 0.0
+        assert auc[i] == pytest.approx(expected)
+        if starts[i + 1] > starts[i]:
+            assert prefix[starts[i + 1] - 1] == pytest.approx(expected)
+    for q, s, f in zip(queries, segments, found):
+        assert f == starts[s] + np.searchsorted(x[starts[s]:starts[s + 1]], q, side='right')
+
+
+def test_searchsorted_fractional(backend):
+    # fractional values are not truncated when searching integer arrays
+    a = np.array([1, 2, 3, 4, 1, 2, 3])
+    starts = np.array([0, 4, 7])
+    segments = np.array([0, 0, 1, 1, 1])
+    v = np.array([2.5, 0.5, 2.5, 3.0, 3.5])
+    for side in ('left', 'right'):
+        expected = [starts[s] + np.searchsorted(a[starts[s]:starts[s + 1]], q, side=side) for s, q in zip(segments, v)]
+        assert backend.segment_searchsorted(a, starts, segments, v, side=side).tolist() == expected
+    assert backend.segment_searchsorted(a, starts, segments, 2.5).tolist() == [2, 2, 6, 6, 6]
+
+
+def test_integer_auc(backend):
+    rng = np.random.default_rng(7)
+    # nanosecond timestamps of a long-running test
+    x = np.sort(rng.integers(0, 3600 * 10 ** 9, size=1000)) + 10 ** 15
+    y = np.arange(1, 1001)
+    starts = np.array([0, 400, 1000])
+    expected = [sum(int(x[i] - x[i - 1]) * int(y[i] + y[i - 1]) for i in range(lo + 1, hi)) / 2
+                for lo, hi in zip(starts[:-1], starts[1:])]
+    assert list(backend.segment_auc(x, y, starts)) == expected
+
+    # falls back to floats if the integer accumulation might overflow
+    y = y * 10 ** 9
+    assert backend.segment_auc(x, y, starts) == pytest.approx(backend.segment_auc(x.astype(float), y, starts))
+
+
+def test_nanosecond_trace(backend, traces):
+    traces_ns = traces.astype([('test', traces['test'].dtype), ('approach', traces['approach'].dtype),
+                               ('answer', int), ('time', np.int64)])
+    traces_ns['time'] = np.rint(traces['time'] * 1e9)
+    for test in np.unique(traces['test']):
+        expected = diefpy.dieft(traces, test)['dieft']
+        assert diefpy.dieft(traces_ns, test, time_scale=1e-9)['dieft'] == pytest.approx(expected)
+        expected = diefpy.diefk2(traces, test, 0.5)['diefk']
+        assert diefpy.diefk2(traces_ns, test, 0.5, time_scale=1e-9)['diefk'] == pytest.approx(expected)
+
+
+def test_default_backend(monkeypatch):
+    previous = get_backend().name
+    monkeypatch.delenv('DIEFPY_BACKEND', raising=False)
+    try:
+        assert set_backend().name == 'numpy'
+        monkeypatch.setenv('DIEFPY_BACKEND', available_backends()[-1])
+        assert set_backend().name == available_backends()[-1]
+    finally:
+        set_backend(previous)
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        set_backend('fortran')
@@ -1,10 +1,16 @@
 import json
 import pathlib
+import time
 
+import numpy as np
 import pytest
 from pkg_resources import resource_filename
 
 import diefpy.dief as diefpy
+from diefpy.aggregate import TraceAggregate
+from diefpy.backends import available_backends, get_backend, set_backend
+from diefpy.live import LiveMetrics
+from diefpy.store import ResultStore
 
 
 @pytest.fixture(scope="session")
@@ -147,3 +153,526 @@ def test_diefk2(approach, test, percentage, traces, expected_diefk2):
     res = diefpy.diefk2(traces, test, percentage)
     actual = res[res['approach'] == approach]['diefk'][0]
     assert expected_diefk2 == pytest.approx(actual, abs=1e-3)
+
+
+@pytest.mark.parametrize('extension', ['', '.gz', '.bz2', '.xz'])
+def test_save_and_load_compressed(extension, traces, metrics, tmp_path):
+    trace_file = str(tmp_path / ('traces.csv' + extension))
+    metrics_file = str(tmp_path / ('metrics.csv' + extension))
+    diefpy.save_trace(traces, trace_file)
+    diefpy.save_metrics(metrics, metrics_file)
+
+    loaded_traces = diefpy.load_trace(trace_file)
+    loaded_metrics = diefpy.load_metrics(metrics_file)
+    assert loaded_traces.tolist() == traces.tolist()
+    assert loaded_metrics.tolist() == metrics.tolist()
+
+
+def test_load_compressed_without_extension(traces, tmp_path):
+    trace_file = str(tmp_path / 'traces.gz')
+    diefpy.save_trace(traces, trace_file)
+    renamed = tmp_path / 'traces.csv'
+    (tmp_path / 'traces.gz').rename(renamed)
+    assert renamed.read_bytes()[:2] == b'\x1f\x8b'
+    assert diefpy.load_trace(str(renamed)).tolist() == traces.tolist()
+
+
+@pytest.mark.parametrize('extension', ['', '.gz'])
+def test_load_trace_jsonl(extension, traces, tmp_path):
+    trace_file = tmp_path / ('events.jsonl' + extension)
+    with diefpy.open_file(str(trace_file), 'wt') as f:
+        for row in traces.tolist():
+            f.write(json.dumps(dict(zip(traces.dtype.names, row))) + '\n')
+    loaded = diefpy.load_trace_jsonl(str(trace_file), chunk_size=1000)
+    assert loaded.tolist() == traces.tolist()
+
+
+def test_load_trace_jsonl_nested_fields(traces, tmp_path):
+    trace_file = tmp_path / 'events.jsonl'
+    with open(str(trace_file), 'w') as f:
+        f.write(json.dumps({'event': 'start', 'engine': 'Random'}) + '\n')
+        for test, approach, _, time in traces.tolist():
+            f.write(json.dumps({'event': 'answer', 'query': {'name': test}, 'engine': approach, 'ts': time}) + '\n')
+        f.write('\n')
+    loaded = diefpy.load_trace_jsonl(str(trace_file),
+                                     {'test': 'query.name', 'approach': 'engine', 'answer': None, 'time': 'ts'},
+                                     where={'event': 'answer'}, chunk_size=1000)
+    # the answers are numbered in the order of the events
+    assert loaded.tolist() == traces.tolist()
+
+
+def test_load_trace_jsonl_malformed(tmp_path, caplog):
+    trace_file = tmp_path / 'events.jsonl'
+    trace_file.write_text('{"test": "Q1", "approach": "A", "answer": 5, "time": 0.5}\n'
+                          '{"test": "Q1", "approach": "A", "time": 0.7}\n'
+                          '{"test": "Q1", "approach": "B", "time": 0.8}\n'
+                          '{"test": "Q1", "approach": "A", "answer": 9, "time": 0.9}\n'
+                          '{"test": "Q1", "approach": "B", "answer": 4, "time": 1.0}\n'
+                          '{"test": "Q1", "approach": "A", "answer": 10, "ti')
+    loaded = diefpy.load_trace_jsonl(str(trace_file))
+    # a truncated line is skipped and only the missing answers are numbered
+    assert loaded[['approach', 'answer']].tolist() == [('A', 5), ('A', 6), ('B', 1), ('A', 9), ('B', 4)]
+    assert 'malformed line' in caplog.text
+
+
+@pytest.fixture(scope="session")
+def batched_traces(traces):
+    # answers produced in batches, i.e., with the same time
+    batched = traces.copy()
+    batched['time'] = np.ceil(batched['time'] * 4) / 4
+    return batched
+
+
+def test_compress_trace(batched_traces):
+    compressed = diefpy.compress_trace(batched_traces)
+    assert len(compressed) < len(batched_traces) / 10
+    assert compressed['count'].sum() == len(batched_traces)
+    for test in ['Q9.rq', 'Q14.rq']:
+        for t in [-1, 0.5, 3.3]:
+            for continue_to_end in [True, False]:
+                expected = diefpy.dieft(batched_traces, test, t, continue_to_end)
+                actual = diefpy.dieft(compressed, test, t, continue_to_end)
+                assert actual.tolist() == pytest.approx(expected.tolist())
+        for k in [-1, 1, 10, 2.5, 1000]:
+            assert diefpy.diefk(compressed, test, k).tolist() == pytest.approx(diefpy.diefk(batched_traces, test, k).tolist())
+        for kp in [0.25, 0.5, 1.0]:
+            assert diefpy.diefk2(compressed, test, kp).tolist() == \
+                pytest.approx(diefpy.diefk2(batched_traces, test, kp).tolist())
+
+
+@pytest.fixture(scope="session")
+def sketch(traces):
+    return diefpy.sketch_trace(traces, 50)
+
+
+def test_sketch_trace(traces, sketch):
+    for test in ['Q9.rq', 'Q14.rq']:
+        for approach in ['Selective', 'Random', 'NotAdaptive']:
+            full = traces[(traces['test'] == test) & (traces['approach'] == approach)]
+            part = sketch[(sketch['test'] == test) & (sketch['approach'] == approach)]
+            assert len(part) == min(len(full), 50)
+            assert part[0] == full[0] and part[-1] == full[-1]
+    assert np.array_equal(diefpy.sketch_trace(traces, len(traces)), traces)
+
+
+@pytest.mark.parametrize('test', ['Q9.rq', 'Q14.rq'])
+@pytest.mark.parametrize('time', [-1, 0.3, 7.5, 100])
+@pytest.mark.parametrize('continue_to_end', [True, False])
+def test_dieft_approx(test, time, continue_to_end, traces, sketch):
+    exact = diefpy.dieft(traces, test, time, continue_to_end)
+    approx = diefpy.dieft_approx(sketch, test, time, continue_to_end)
+    assert np.array_equal(exact['approach'], approx['approach'])
+    assert (np.abs(exact['dieft'] - approx['dieft']) <= approx['error'] + 1e-6).all()
+
+
+@pytest.mark.parametrize('test', ['Q9.rq', 'Q14.rq'])
+@pytest.mark.parametrize('percentage', [0.1, 0.25, 1.0])
+def test_diefk2_approx(test, percentage, traces, sketch):
+    exact = diefpy.diefk2(traces, test, percentage)
+    approx = diefpy.diefk2_approx(sketch, test, percentage)
+    assert (np.abs(exact['diefk'] - approx['diefk']) <= approx['error'] + 1e-6).all()
+
+
+def test_experiments_approx(traces, metrics, actual_performance_metrics, monkeypatch):
+    approx = diefpy.performance_of_approaches_with_dieft(traces, metrics, continue_to_end=False, sketch_size=50)
+    assert np.array_equal(approx['approach'], actual_performance_metrics['approach'])
+    assert (np.abs(approx['dieft'] - actual_performance_metrics['dieft']) <= approx['dieft_error'] + 1e-6).all()
+
+    exact = diefpy.continuous_efficiency_with_diefk(traces)
+    approx = diefpy.continuous_efficiency_with_diefk(traces, sketch_size=50)
+    for metric in ['diefk25', 'diefk50', 'diefk75', 'diefk100']:
+        assert (np.abs(approx[metric] - exact[metric]) <= approx[metric + '_error'] + 1e-6).all()
+
+    # a prebuilt sketch is used as is
+    sketch = diefpy.sketch_trace(traces, 50)
+    expected = diefpy.performance_of_approaches_with_dieft(traces, metrics, sketch_size=50)
+    monkeypatch.setattr(diefpy, 'sketch_trace', None)
+    assert diefpy.performance_of_approaches_with_dieft(traces, metrics, sketch=sketch).tolist() == expected.tolist()
+    assert diefpy.continuous_efficiency_with_diefk(traces, sketch=sketch).tolist() == approx.tolist()
+
+
+@pytest.fixture
+def crossing_trace():
+    return np.array([('T', 'A', 1, 1.0), ('T', 'A', 2, 3.0),
+                     ('T', 'B', 1, 1.5), ('T', 'B', 2, 2.0), ('T', 'B', 3, 2.5)],
+                    dtype=[('test', 'U1'), ('approach', 'U1'), ('answer', int), ('time', float)])
+
+
+def test_dominance_intervals(crossing_trace):
+    intervals = diefpy.dominance_intervals(crossing_trace, 'T')
+    assert intervals['leader'].tolist() == ['A', 'B']
+    assert intervals['start'] == pytest.approx([1.0, 1.5 + 1 / 6])
+    assert intervals['end'] == pytest.approx([1.5 + 1 / 6, 3.0])
+
+    crossovers = diefpy.crossover_times(crossing_trace, 'T')
+    assert crossovers['leader'].tolist() == ['B']
+    assert crossovers['time'] == pytest.approx([1.5 + 1 / 6])
+
+
+def test_dominance_matrix(crossing_trace, traces):
+    approaches, matrix = diefpy.dominance_matrix(crossing_trace)
+    assert approaches.tolist() == ['A', 'B']
+    assert matrix['lead'][0, 1] == pytest.approx((2 / 3) / 2)
+    assert matrix['lead'][1, 0] == pytest.approx((4 / 3) / 2)
+    assert matrix['crossovers'].tolist() == [[0, 0], [1, 0]]
+
+    approaches, matrix = diefpy.dominance_matrix(traces)
+    assert matrix.shape == (3, 3)
+    assert ((matrix['lead'] + matrix['lead'].T)[~np.eye(3, dtype=bool)] <= 1 + 1e-9).all()
+
+
+@pytest.mark.parametrize('per_test', [False, True])
+def test_answer_rate_profile(traces, batched_traces, per_test):
+    tests, approaches, edges, rates = diefpy.answer_rate_profile(traces, 20, per_test)
+    assert tests.tolist() == ['Q14.rq', 'Q9.rq']
+    assert approaches.tolist() == ['NotAdaptive', 'Random', 'Selective']
+    assert rates.shape == (2, 3, 20)
+    widths = np.diff(edges, axis=-1)
+    counts = rates * (widths[:, None, :] if per_test else widths)
+    for i, test in enumerate(tests):
+        for j, approach in enumerate(approaches):
+            rows = traces[(traces['test'] == test) & (traces['approach'] == approach)]
+            assert counts[i, j].sum() == pytest.approx(len(rows))
+            end = edges[i, -1] if per_test else edges[-1]
+            expected, _ = np.histogram(rows['time'], bins=20, range=(0, end))
+            assert counts[i, j] == pytest.approx(expected)
+
+    # compressed answer traces yield the same profile
+    expected = diefpy.answer_rate_profile(batched_traces, 20, per_test)[3]
+    assert diefpy.answer_rate_profile(diefpy.compress_trace(batched_traces), 20, per_test)[3] == pytest.approx(expected)
+
+
+def test_leaderboard(traces, metrics):
+    exp1 = diefpy.performance_of_approaches_with_dieft(traces, metrics)
+    exp2 = diefpy.continuous_efficiency_with_diefk(traces)
+    board = diefpy.leaderboard(exp1, exp2)
+    assert board['approach'].tolist() == ['Random', 'Selective', 'NotAdaptive']
+    random = board[0]
+    # Random has the highest dief@t for Q14.rq and the second highest for Q9.rq
+    assert random['dieft_rank'] == 1.5
+    assert random['dieft_wins'] == 1
+    assert random['dieft_ratio'] == pytest.approx(np.sqrt(28563.15769206 / 27963.92935846))
+    assert random['diefk_wins'] == 2
+    assert board['tfft_wins'].sum() == 2
+    assert 'diefk_rank' not in diefpy.leaderboard(exp1).dtype.names
+
+
+def test_leaderboard_ties_and_missing():
+    allmetrics = np.array([('Q1', 'A', 1.0, 2.0, 3.0, 4.0),
+                           ('Q1', 'B', 1.0, 2.0, 3.0, 2.0),
+                           ('Q1', 'C', 2.0, 4.0, 1.0, 2.0),
+                           ('Q2', 'A', 1.0, 1.0, 1.0, 1.0)],
+                          dtype=[('test', 'U2'), ('approach', 'U1'), ('tfft', float), ('totaltime', float),
+                                 ('throughput', float), ('dieft', float)])
+    board = diefpy.leaderboard(allmetrics)
+    board = board[np.argsort(board['approach'])]
+    assert board['tfft_rank'].tolist() == [1.0, 1.0, 3.0]
+    assert board['tfft_wins'].tolist() == [2, 1, 0]
+    assert board['dieft_rank'].tolist() == [1.0, 2.0, 2.0]
+    assert board['dieft_ratio'].tolist() == [1.0, 2.0, 2.0]
+    assert board['totaltime_ratio'].tolist() == [1.0, 1.0, 2.0]
+
+
+def test_pivot_metrics(metrics):
+    tests, approaches, pivot = diefpy.pivot_metrics(metrics[1:])
+    assert tests.tolist() == ['Q14.rq', 'Q9.rq']
+    assert approaches.tolist() == ['NotAdaptive', 'Random', 'Selective']
+    assert pivot.shape == (2, 3)
+    for row in metrics[1:]:
+        i, j = tests.tolist().index(row['test']), approaches.tolist().index(row['approach'])
+        assert pivot[i, j].tolist() == (row['tfft'], row['totaltime'], row['comp'])
+    missing = np.isnan(pivot['totaltime'])
+    assert missing.sum() == 1
+    assert tests[missing.any(axis=1)][0] == metrics[0]['test']
+
+
+def test_time_to_k(traces, batched_traces):
+    result = diefpy.time_to_k(traces, k=[1, 6, 5151])
+    assert len(result) == 6 * 3
+    for row in result:
+        rows = traces[(traces['test'] == row['test']) & (traces['approach'] == row['approach'])]
+        if row['k'] <= len(rows):
+            assert row['time'] == rows['time'][int(row['k']) - 1]
+        else:
+            assert np.isnan(row['time'])
+
+    result = diefpy.time_to_k(traces, fractions=[0.1, 0.5, 1.0])
+    assert result.dtype.names == ('test', 'approach', 'fraction', 'time')
+    q9 = result[(result['test'] == 'Q9.rq') & (result['approach'] == 'Random')]
+    rows = traces[(traces['test'] == 'Q9.rq') & (traces['approach'] == 'Random')]
+    assert q9['time'].tolist() == [rows['time'][515], rows['time'][2575], rows['time'][5150]]
+
+    # compressed answer traces yield the same times
+    expected = diefpy.time_to_k(batched_traces, fractions=[0.25, 0.75])
+    assert diefpy.time_to_k(diefpy.compress_trace(batched_traces), fractions=[0.25, 0.75]).tolist() == expected.tolist()
+
+    # a fractional k is rounded up to the next answer with every backend
+    previous = get_backend().name
+    try:
+        for backend in available_backends():
+            set_backend(backend)
+            result = diefpy.time_to_k(traces, k=[2.5])
+            assert result['time'].tolist() == diefpy.time_to_k(traces, k=[3])['time'].tolist()
+            assert result[(result['test'] == 'Q14.rq') & (result['approach'] == 'NotAdaptive')]['time'][0] == pytest.approx(285.43, abs=1e-2)
+    finally:
+        set_backend(previous)
+
+    with pytest.raises(ValueError):
+        diefpy.time_to_k(traces)
+
+
+def test_answer_gaps(traces):
+    gaps = diefpy.answer_gaps(traces, percentiles=[50, 99.5])
+    assert gaps.dtype.names[-2:] == ('gap50', 'gap99_5')
+    for row in gaps:
+        rows = traces[(traces['test'] == row['test']) & (traces['approach'] == row['approach'])]
+        diffs = np.diff(rows['time'])
+        assert row['gaps'] == len(diffs)
+        assert row['maxgap'] == pytest.approx(diffs.max())
+        assert row['maxgap_start'] == rows['time'][np.argmax(diffs)]
+        assert row['meangap'] == pytest.approx(diffs.mean())
+        assert [row['gap50'], row['gap99_5']] == pytest.approx(np.percentile(diffs, [50, 99.5]))
+
+
+def test_stall_intervals(traces):
+    stalls = diefpy.stall_intervals(traces, 0.5)
+    assert (stalls['duration'] >= 0.5).all()
+    assert stalls['duration'] == pytest.approx(stalls['end'] - stalls['start'])
+    q9 = traces[(traces['test'] == 'Q9.rq') & (traces['approach'] == 'Selective')]
+    expected = (np.diff(q9['time']) >= 0.5).sum()
+    assert ((stalls['test'] == 'Q9.rq') & (stalls['approach'] == 'Selective')).sum() == expected
+
+    top = diefpy.stall_intervals(traces, 0.0, top=2)
+    assert top['duration'].tolist() == sorted(diefpy.answer_gaps(traces)['maxgap'], reverse=True)[:2]
+
+    figure = diefpy.plot_answer_trace(traces, 'Q9.rq', stalls=1.0)
+    assert len(figure.axes[0].patches) == ((stalls['test'] == 'Q9.rq') & (stalls['duration'] >= 1.0)).sum()
+
+
+@pytest.fixture(scope="session")
+def run_traces(traces):
+    # two runs of the experiment; the second run is twice as slow and produces the answers of the first run twice
+    runs = np.empty(3 * len(traces), dtype=[('test', traces['test'].dtype), ('run', int),
+                                            ('approach', traces['approach'].dtype), ('answer', int), ('time', float)])
+    second = np.concatenate([traces, traces])
+    second['answer'][len(traces):] += len(traces)
+    for field in ('test', 'approach', 'answer', 'time'):
+        runs[field] = np.concatenate([traces[field], second[field]])
+    runs['run'] = np.repeat([1, 2], [len(traces), 2 * len(traces)])
+    runs['time'][len(traces):] *= 2
+    return runs
+
+
+@pytest.mark.parametrize('compressed', [False, True])
+def test_dief_by(compressed, traces, batched_traces):
+    inputtrace = diefpy.compress_trace(batched_traces) if compressed else batched_traces
+    for t in [-1, 2.5]:
+        expected = np.concatenate([diefpy.dieft(inputtrace, test, t) for test in ['Q14.rq', 'Q9.rq']])
+        assert diefpy.dieft_by(inputtrace, t=t).tolist() == pytest.approx(expected.tolist())
+    for kp in [-1, 0.25, 0.5]:
+        expected = np.concatenate([diefpy.diefk2(inputtrace, test, kp) for test in ['Q14.rq', 'Q9.rq']])
+        assert diefpy.diefk_by(inputtrace, kp=kp).tolist() == pytest.approx(expected.tolist())
+    expected = np.concatenate([diefpy.diefk(inputtrace, test, 10) for test in ['Q14.rq', 'Q9.rq']])
+    assert diefpy.diefk_by(inputtrace, k=10).tolist() == pytest.approx(expected.tolist())
+
+
+def test_dief_by_keys(run_traces):
+    keys = ('test', 'run', 'approach')
+    dieft = diefpy.dieft_by(run_traces, keys)
+    diefk = diefpy.diefk_by(run_traces, keys, kp=0.5)
+    assert dieft.dtype.names == keys + ('dieft',)
+    assert len(dieft) == len(diefk) == 2 * 2 * 3
+    for run in [1, 2]:
+        subtrace = run_traces[run_traces['run'] == run][['test', 'approach', 'answer', 'time']]
+        for test in ['Q9.rq', 'Q14.rq']:
+            rows = (dieft['test'] == test) & (dieft['run'] == run)
+            assert dieft[rows]['dieft'].tolist() == pytest.approx(diefpy.dieft(subtrace, test)['dieft'].tolist())
+            assert diefk[rows]['diefk'].tolist() == pytest.approx(diefpy.diefk2(subtrace, test, 0.5)['diefk'].tolist())
+
+    efficiency = diefpy.continuous_efficiency_with_diefk(run_traces, keys=keys)
+    assert efficiency[['test', 'run', 'approach']].tolist() == diefk[['test', 'run', 'approach']].tolist()
+    assert efficiency['diefk50'].tolist() == pytest.approx(diefk['diefk'].tolist())
+
+    gaps = diefpy.answer_gaps(run_traces, keys=keys)
+    assert gaps.dtype.names[:4] == keys + ('gaps',)
+    assert (gaps['gaps'] + 1).tolist() == np.unique(run_traces[list(keys)], return_counts=True)[1].tolist()
+
+
+def test_performance_by_keys(traces, metrics, run_traces, actual_performance_metrics):
+    keys = ('test', 'run', 'approach')
+    run_metrics = np.empty(2 * len(metrics), dtype=[('test', metrics['test'].dtype), ('run', int),
+                                                    ('approach', metrics['approach'].dtype), ('tfft', float),
+                                                    ('totaltime', float), ('comp', int)])
+    for field in ('test', 'approach', 'tfft', 'totaltime', 'comp'):
+        run_metrics[field] = np.tile(metrics[field], 2)
+    run_metrics['run'] = np.repeat([1, 2], len(metrics))
+    performance = diefpy.performance_of_approaches_with_dieft(run_traces, run_metrics, False, keys=keys)
+    assert len(performance) == 2 * len(actual_performance_metrics)
+    first = performance[performance['run'] == 1]
+    assert first[['test', 'approach']].tolist() == actual_performance_metrics[['test', 'approach']].tolist()
+    assert first['dieft'].tolist() == pytest.approx(actual_performance_metrics['dieft'].tolist())
+
+    with pytest.raises(ValueError):
+        diefpy.performance_of_approaches_with_dieft(run_traces, run_metrics, sketch_size=10, keys=keys)
+
+
+def test_experiments_nanoseconds(traces, metrics, tmp_path):
+    traces_ns = traces.astype([('test', traces['test'].dtype), ('approach', traces['approach'].dtype),
+                               ('answer', int), ('time', np.int64)])
+    traces_ns['time'] = np.rint(traces['time'] * 1e9)
+    metrics_ns = metrics.copy()
+    for field in ('tfft', 'totaltime'):
+        metrics_ns[field] *= 1e9
+    for kwargs in [{}, {'store': ResultStore(str(tmp_path))}, {'sketch_size': 100}]:
+        expected = diefpy.performance_of_approaches_with_dieft(traces, metrics, **kwargs)
+        actual = diefpy.performance_of_approaches_with_dieft(traces_ns, metrics_ns, time_scale=1e-9, **kwargs)
+        assert actual[['test', 'approach']].tolist() == expected[['test', 'approach']].tolist()
+        for field in expected.dtype.names[2:]:
+            assert actual[field] == pytest.approx(expected[field], rel=1e-6, nan_ok=True)
+
+        expected = diefpy.continuous_efficiency_with_diefk(traces, **kwargs)
+        actual = diefpy.continuous_efficiency_with_diefk(traces_ns, time_scale=1e-9, **kwargs)
+        assert actual[['test', 'approach']].tolist() == expected[['test', 'approach']].tolist()
+        for field in expected.dtype.names[2:]:
+            assert actual[field] == pytest.approx(expected[field], rel=1e-6)
+
+
+def test_unique_keys():
+    rng = np.random.default_rng(3)
+    df = np.empty(5000, dtype=[('test', 'U3'), ('run', int), ('approach', 'U1')])
+    df['test'] = rng.choice(['Q1', 'Q10', 'Q2'], len(df))
+    df['run'] = rng.integers(-3, 3, len(df))
+    df['approach'] = rng.choice(list('abcd'), len(df))
+    df[:1000].sort()
+    keys = ('test', 'run', 'approach')
+    first, codes = diefpy._unique_keys([df[key] for key in keys])
+    groups, inverse = np.unique(df, return_inverse=True)
+    assert df[list(first)].tolist() == groups.tolist()
+    assert codes.tolist() == inverse.ravel().tolist()
+
+
+def _large_trace(tests=20, approaches=3, answers=10000):
+    rng = np.random.default_rng(0)
+    df = np.empty(tests * approaches * answers, dtype=[('test', 'U8'), ('approach', 'U8'), ('answer', int),
+                                                       ('time', float)])
+    df['test'] = np.repeat(['Q%d.rq' % i for i in range(tests)], approaches * answers)
+    df['approach'] = np.tile(np.repeat(['A%d' % i for i in range(approaches)], answers), tests)
+    df['answer'] = np.tile(np.arange(1, answers + 1), tests * approaches)
+    df['time'] = np.tile(np.cumsum(rng.random(answers)), tests * approaches)
+    return df
+
+
+def test_grouping_large_trace(monkeypatch):
+    # the keys are encoded per attribute; sorting the records of the keys is much slower for large answer traces
+    traces = _large_trace()
+    metrics = np.empty(60, dtype=[('test', 'U8'), ('approach', 'U8'), ('tfft', float), ('totaltime', float),
+                                  ('comp', int)])
+    metrics['test'] = np.repeat(np.unique(traces['test']), 3)
+    metrics['approach'] = np.tile(['A0', 'A1', 'A2'], 20)
+    metrics['tfft'], metrics['totaltime'], metrics['comp'] = 1.0, traces['time'].max(), 10000
+    start = time.perf_counter()
+    np.unique(traces[['test', 'approach']], return_inverse=True)
+    records = time.perf_counter() - start
+
+    unique = np.unique
+
+    def unique_columns(ar, *args, **kwargs):
+        assert ar.dtype.names is None or len(ar) <= 60, 'records of the keys of the answer trace are sorted'
+        return unique(ar, *args, **kwargs)
+    monkeypatch.setattr(np, 'unique', unique_columns)
+    # compile the kernels of the backend first
+    diefpy.continuous_efficiency_with_diefk(traces[:100])
+    start = time.perf_counter()
+    diefpy.performance_of_approaches_with_dieft(traces, metrics)
+    diefpy.continuous_efficiency_with_diefk(traces)
+    assert time.perf_counter() - start < max(records, 1.0)
+    diefpy.performance_of_approaches_with_dieft(traces, metrics, sketch_size=100)
+    diefpy.continuous_efficiency_with_diefk(traces, sketch_size=100)
+    diefpy.compress_trace(traces)
+    TraceAggregate.from_trace(traces)
+    LiveMetrics().extend(traces[:1000])
+
+
+def test_performance_missing_metrics(traces, metrics, tmp_path):
+    # the metrics of Q9.rq/Random are unknown, those of Q14.rq/Selective are missing
+    unknown = metrics.copy()
+    row = (unknown['test'] == 'Q9.rq') & (unknown['approach'] == 'Random')
+    unknown['tfft'][row], unknown['totaltime'][row] = np.nan, np.nan
+    unknown = unknown[(unknown['test'] != 'Q14.rq') | (unknown['approach'] != 'Selective')]
+    for kwargs in [{}, {'store': ResultStore(str(tmp_path))}, {'sketch_size': 100}]:
+        performance = diefpy.performance_of_approaches_with_dieft(traces, unknown, **kwargs)
+        assert len(performance) == 5
+        assert ('Q14.rq', 'Selective') not in performance[['test', 'approach']].tolist()
+        nan = performance[(performance['test'] == 'Q9.rq') & (performance['approach'] == 'Random')]
+        assert np.isnan(nan['totaltime'][0]) and np.isnan(nan['throughput'][0]) and np.isnan(nan['invtfft'][0])
+        assert nan['dieft'][0] > 0
+
+
+def test_performance_many_keys():
+    # the product of the numbers of values of the keys exceeds the range of int64
+    n = 10000
+    keys = ('test', 'host', 'run', 'seed', 'approach')
+    fields = [(key, int) for key in keys]
+    traces = np.empty(n, dtype=fields + [('answer', int), ('time', float)])
+    metrics = np.empty(n, dtype=fields + [('tfft', float), ('totaltime', float), ('comp', int)])
+    for key in keys:
+        traces[key] = np.arange(n)
+        metrics[key] = np.arange(n)[::-1]
+    traces['answer'], traces['time'] = 1, 1.0
+    metrics['tfft'], metrics['totaltime'], metrics['comp'] = 1.0, 2.0, np.arange(n)[::-1]
+    performance = diefpy.performance_of_approaches_with_dieft(traces, metrics, keys=keys)
+    assert len(performance) == n
+    assert performance['comp'].tolist() == performance['test'].tolist()
+
+
+def test_workload_trace(traces):
+    offsets, weights = {'Q14.rq': 5.0}, {'Q9.rq': 0.5}
+    workload = diefpy.workload_trace(traces, offsets, weights, 'mix')
+    assert set(workload['test']) == {'mix'}
+    for approach in ['NotAdaptive', 'Random', 'Selective']:
+        rows = traces[traces['approach'] == approach]
+        time = rows['time'] + np.where(rows['test'] == 'Q14.rq', 5.0, 0.0)
+        order = np.argsort(time, kind='stable')
+        expected = np.cumsum(np.where(rows['test'] == 'Q9.rq', 0.5, 1.0)[order])
+        actual = workload[workload['approach'] == approach]
+        assert actual['time'].tolist() == time[order].tolist()
+        assert actual['answer'] == pytest.approx(expected)
+
+    # runs of compressed answer traces are expanded into their first and last answer
+    expected = diefpy.workload_trace(traces)
+    assert expected['answer'].dtype == int
+    assert diefpy.workload_trace(diefpy.compress_trace(traces)).tolist() == expected.tolist()
+    rounded = traces.copy()
+    rounded['time'] = np.round(rounded['time'])
+    compressed = diefpy.workload_trace(diefpy.compress_trace(rounded), weights={'Q9.rq': 2})
+    assert 'count' not in compressed.dtype.names
+    assert set(compressed[['approach', 'answer', 'time']].tolist()) <= \
+        set(diefpy.workload_trace(rounded, weights={'Q9.rq': 2})[['approach', 'answer', 'time']].tolist())
+
+
+def test_workload_dief(traces):
+    dief = diefpy.workload_dief(traces)
+    workload = diefpy.workload_trace(traces)
+    assert dief.dtype.names == ('test', 'approach', 'dieft', 'diefk')
+    assert dief['dieft'].tolist() == diefpy.dieft(workload, 'workload')['dieft'].tolist()
+    assert dief['diefk'].tolist() == diefpy.diefk(workload, 'workload', 5151 + 3)['diefk'].tolist()
+
+    # uniform weights scale the metrics linearly
+    weighted = diefpy.workload_dief(traces, weights={'Q9.rq': 2, 'Q14.rq': 2})
+    assert weighted['dieft'] == pytest.approx(2 * dief['dieft'])
+    assert weighted['diefk'] == pytest.approx(2 * dief['diefk'])
+
+    # compressed answer traces yield the same metrics
+    rounded = traces.copy()
+    rounded['time'] = np.round(rounded['time'])
+    for weights in [None, {'Q9.rq': 0.5}]:
+        expected = diefpy.workload_dief(rounded, {'Q14.rq': 1.0}, weights)
+        actual = diefpy.workload_dief(diefpy.compress_trace(rounded), {'Q14.rq': 1.0}, weights)
+        assert actual[['dieft', 'diefk']].tolist() == pytest.approx(expected[['dieft', 'diefk']].tolist())
+    assert expected['dieft'][1] != diefpy.dieft(diefpy.workload_trace(rounded, {'Q14.rq': 1.0}, weights),
+                                                'workload')['dieft'][1]
+
+    # an approach without answers in any test
+    silent = np.append(traces[traces['approach'] != 'Random'], np.array([('Q9.rq', 'Random', 0, 3.0)], dtype=traces.dtype))
+    assert diefpy.workload_trace(silent)[['approach', 'answer', 'time']].tolist()[5154] == ('Random', 0, 3.0)
+    assert diefpy.workload_dief(silent)['dieft'].tolist()[1] == 0
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from pkg_resources import resource_filename
+
+import diefpy.dief as diefpy
+from diefpy.experiment import Experiment
+
+
+@pytest.fixture(scope="session")
+def traces():
+    input_file_traces = resource_filename('diefpy', 'data/traces.csv')
+    return diefpy.load_trace(input_file_traces)
+
+
+@pytest.fixture(scope="session")
+def metrics():
+    input_file_metrics = resource_filename('diefpy', 'data/metrics.csv')
+    return diefpy.load_metrics(input_file_metrics)
+
+
+@pytest.fixture
+def experiment():
+    return Experiment.from_files(resource_filename('diefpy', 'data/traces.csv'),
+                                 resource_filename('diefpy', 'data/metrics.csv'))
+
+
+def test_results(experiment, traces, metrics):
+    assert experiment.tests == ['Q14.rq', 'Q9.rq']
+    assert experiment.dieft('Q9.rq').tolist() == diefpy.dieft(traces, 'Q9.rq').tolist()
+    assert experiment.diefk('Q9.rq', 100).tolist() == diefpy.diefk(traces, 'Q9.rq', 100).tolist()
+    assert experiment.diefk2('Q14.rq', 0.5).tolist() == diefpy.diefk2(traces, 'Q14.rq', 0.5).tolist()
+    assert experiment.performance().tolist() == diefpy.performance_of_approaches_with_dieft(traces, metrics).tolist()
+    assert experiment.continuous_efficiency().tolist() == diefpy.continuous_efficiency_with_diefk(traces).tolist()
+
+
+def test_lazy(experiment):
+    assert experiment.dieft('Q9.rq') is experiment.dieft('Q9.rq')
+    assert experiment.plot_answer_trace('Q9.rq') is experiment.plot_answer_trace('Q9.rq')
+    # only the results of the accessed test are computed
+    assert all('Q14.rq' not in key for key in experiment._cache)
+    with pytest.raises(KeyError):
+        experiment.dieft('Q1')
+
+
+def test_subset(experiment, traces):
+    experiment.dieft('Q9.rq')
+    subset = experiment.subset(tests=['Q9.rq'])
+    assert subset.tests == ['Q9.rq']
+    assert subset.traces is experiment.traces
+    assert subset.dieft('Q9.rq') is experiment.dieft('Q9.rq')
+
+    subset = experiment.subset(approaches=['Random', 'Selective'])
+    assert subset.approaches == ['Random', 'Selective']
+    subtrace = traces[(traces['test'] == 'Q9.rq') & np.isin(traces['approach'], ['Random', 'Selective'])]
+    assert subset.dieft('Q9.rq').tolist() == diefpy.dieft(subtrace, 'Q9.rq').tolist()
+    assert len(subset.performance('Q14.rq')) == 2
+    figure = subset.plot_performance('Q9.rq')
+    assert figure.axes
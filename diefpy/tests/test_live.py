@@ -0,0 +1,158 @@
+import asyncio
+import json
+import os
+
+import pytest
+from pkg_resources import resource_filename
+
+import diefpy.dief as diefpy
+from diefpy.live import LiveMetrics, LiveMetricsServer, TraceTail
+
+
+@pytest.fixture(scope="session")
+def traces():
+    input_file_traces = resource_filename('diefpy', 'data/traces.csv')
+    return diefpy.load_trace(input_file_traces)
+
+
+@pytest.fixture(scope="session")
+def live(traces):
+    live = LiveMetrics()
+    live.extend(traces[:100])
+    for row in traces[100:].tolist():
+        live.add(*row)
+    return live
+
+
+@pytest.mark.parametrize('test', ['Q9.rq', 'Q14.rq'])
+@pytest.mark.parametrize('time', [-1, 7.5])
+@pytest.mark.parametrize('continue_to_end', [True, False])
+def test_live_dieft(test, time, continue_to_end, traces, live):
+    expected = diefpy.dieft(traces, test, time, continue_to_end)
+    actual = live.dieft(test, time, continue_to_end)
+    for a in expected['approach']:
+        assert actual[actual['approach'] == a]['dieft'][0] == \
+               pytest.approx(expected[expected['approach'] == a]['dieft'][0])
+
+
+@pytest.mark.parametrize('test', ['Q9.rq', 'Q14.rq'])
+@pytest.mark.parametrize('percentage', [0.25, 0.5, 1.0])
+def test_live_diefk2(test, percentage, traces, live):
+    expected = diefpy.diefk2(traces, test, percentage)
+    actual = live.diefk2(test, percentage)
+    for a in expected['approach']:
+        assert actual[actual['approach'] == a]['diefk'][0] == \
+               pytest.approx(expected[expected['approach'] == a]['diefk'][0])
+
+
+def test_live_server(traces):
+    q9 = traces[traces['test'] == 'Q9.rq']
+
+    async def send(port, rows):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b'test,approach,answer,time\n')
+        writer.write(''.join('%s,%s,%d,%r\n' % row for row in rows.tolist()).encode())
+        writer.write(b'?Q9.rq\n')
+        await writer.drain()
+        reply = await reader.readline()
+        writer.close()
+        return json.loads(reply)
+
+    async def run():
+        server = LiveMetricsServer()
+        srv = await server.start()
+        port = srv.sockets[0].getsockname()[1]
+        async with srv:
+            await asyncio.gather(*[send(port, q9[q9['approach'] == a]) for a in ['Selective', 'Random', 'NotAdaptive']])
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b'?\n')
+            reply = json.loads(await reader.readline())
+            writer.close()
+        return reply
+
+    snapshot = asyncio.run(run())
+    expected = diefpy.dieft(traces, 'Q9.rq')
+    for a in ['Selective', 'Random', 'NotAdaptive']:
+        assert snapshot['Q9.rq'][a]['comp'] == 5151
+        assert snapshot['Q9.rq'][a]['dieft'] == pytest.approx(expected[expected['approach'] == a]['dieft'][0])
+
+
+def test_live_server_long_message(caplog):
+    async def run():
+        server = LiveMetricsServer(chunk_size=64)
+        srv = await server.start()
+        port = srv.sockets[0].getsockname()[1]
+        async with srv:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b'Q1,A,1,0.5\n' + b'x' * 5000)
+            await writer.drain()
+            writer.write(b'x' * 5000 + b'\nQ1,A,2,0.7\n?Q1\n')
+            reply = json.loads(await reader.readline())
+            writer.close()
+        return server, reply
+
+    server, snapshot = asyncio.run(run())
+    # the message without newline is dropped, the following messages are processed
+    assert server.max_line == 1024
+    assert snapshot['Q1']['A']['comp'] == 2
+    assert 'Dropping a message' in caplog.text
+
+
+def test_trace_tail(traces, tmp_path):
+    trace_file = tmp_path / 'traces.csv'
+    lines = ['test,approach,answer,time\n'] + ['%s,%s,%d,%r\n' % row for row in traces.tolist()]
+    tail = TraceTail(str(trace_file))
+    assert tail.poll() == []
+
+    # the benchmark writes the file in pieces that end within a row
+    content = ''.join(lines)
+    cuts = [0, 10, 30, len(content) // 3, len(content) // 3 + 5, len(content) - 7, len(content)]
+    updated = set()
+    for start, end in zip(cuts[:-1], cuts[1:]):
+        with open(str(trace_file), 'a') as f:
+            f.write(content[start:end])
+        updated.update(tail.poll())
+        assert tail.offset == content.rfind('\n', 0, end) + 1
+    assert updated == {'Q9.rq', 'Q14.rq'}
+    assert tail.rows == len(traces)
+    assert tail.poll() == []
+
+    for test in ['Q9.rq', 'Q14.rq']:
+        expected = diefpy.dieft(traces, test)
+        actual = tail.live.dieft(test)
+        for a in expected['approach']:
+            assert actual[actual['approach'] == a]['dieft'][0] == \
+                   pytest.approx(expected[expected['approach'] == a]['dieft'][0])
+    assert len(tail.live.trace('Q14.rq')) == 3 + 6 + 5
+
+    # a new benchmark replaces the file
+    with open(str(trace_file), 'w') as f:
+        f.write('approach,test,time,answer\nRandom,Q1,0.5,1\n')
+    assert tail.poll() == ['Q1']
+    assert tail.live.tests() == ['Q1']
+    assert tail.live.trace().tolist() == [('Q1', 'Random', 1.0, 0.5)]
+
+    # malformed rows are skipped without losing the other rows
+    with open(str(trace_file), 'a') as f:
+        f.write('Random,Q1,0.7,2\nRandom,Q1,0.9\nRandom,Q1,late,3\n')
+    assert tail.poll() == ['Q1']
+    assert tail.rows == 2
+    assert tail.poll() == []
+    assert tail.live.trace()['answer'].tolist() == [1.0, 2.0]
+
+    # a longer file replacing the followed file is read from the start
+    replacement = tmp_path / 'replacement.csv'
+    replacement.write_text(''.join(lines[:1] + lines[-3:]))
+    os.replace(str(replacement), str(trace_file))
+    assert tail.poll() == ['Q14.rq']
+    assert tail.rows == 3
+    assert tail.live.tests() == ['Q14.rq']
+
+
+def test_trace_tail_follow(traces, tmp_path):
+    trace_file = tmp_path / 'traces.csv'
+    diefpy.save_trace(traces[traces['test'] == 'Q14.rq'], str(trace_file))
+    calls = []
+    TraceTail(str(trace_file)).follow(0, lambda tail, tests: calls.append(tests), str(tmp_path / 'plots'), polls=2)
+    assert calls == [['Q14.rq']]
+    assert (tmp_path / 'plots' / 'answer_trace_Q14.rq.png').exists()
@@ -0,0 +1,45 @@
+import pytest
+from pkg_resources import resource_filename
+
+import diefpy.dief as diefpy
+from diefpy.profiling import Profiler, stage
+
+
+@pytest.fixture(scope="session")
+def input_file_traces():
+    return resource_filename('diefpy', 'data/traces.csv')
+
+
+def test_stage_disabled():
+    with stage('filter', 'Q9.rq') as s:
+        s.add_rows(10)
+    assert stage('filter') is stage('auc')
+
+
+def test_profiler_report(input_file_traces):
+    with Profiler() as profiler:
+        traces = diefpy.load_trace(input_file_traces)
+        diefpy.dieft(traces, 'Q9.rq')
+    report = profiler.report()
+
+    stages = set(report['stage'].tolist())
+    assert {'load_trace', 'filter', 'group', 'auc', 'assemble'} <= stages
+    # each stage of dieft is recorded once per call
+    assert report[(report['stage'] == 'filter') & (report['test'] == 'Q9.rq')]['calls'].tolist() == [1]
+    assert report[(report['stage'] == 'group') & (report['test'] == 'Q9.rq')]['calls'].tolist() == [1]
+    load = report[report['stage'] == 'load_trace']
+    assert load['rows'][0] == len(traces)
+    assert load['calls'][0] == 1
+    auc = report[(report['stage'] == 'auc') & (report['test'] == 'Q9.rq')]
+    assert auc['calls'][0] == 1
+    assert (report['time'] >= 0).all()
+
+
+def test_profiler_memory_and_callback(input_file_traces):
+    calls = []
+    with Profiler(trace_memory=True, callback=lambda *args: calls.append(args)) as profiler:
+        diefpy.load_trace(input_file_traces)
+    report = profiler.report()
+    assert report[report['stage'] == 'load_trace']['peakmem'][0] > 0
+    assert calls[0][0] == 'load_trace'
+    assert stage('load_trace') is stage('plot')
@@ -0,0 +1,67 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import diefpy.dief as diefpy
+import diefpy.recorder
+from diefpy.recorder import TraceRecorder
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # deterministic clock advancing by 1 ms per call
+    ticks = itertools.count(0, 1000000)
+    monkeypatch.setattr(diefpy.recorder, 'perf_counter_ns', lambda: next(ticks))
+
+
+def test_record_iterator(clock):
+    recorder = TraceRecorder(capacity=4)
+    assert list(recorder.record(range(100), 'Q1', 'Selective')) == list(range(100))
+    with recorder.recording('Q1', 'Random') as answer:
+        for _ in range(10):
+            answer()
+    with recorder.recording('Q1', 'NotAdaptive'):
+        pass
+
+    trace = recorder.trace()
+    assert trace.dtype.names == ('test', 'approach', 'answer', 'time')
+    assert len(trace) == 100 + 10 + 1
+    selective = trace[trace['approach'] == 'Selective']
+    assert selective['answer'].tolist() == list(range(1, 101))
+    assert selective['time'] == pytest.approx(np.arange(1, 101) * 0.001)
+    assert trace[trace['approach'] == 'NotAdaptive'][['answer', 'time']].tolist() == [(0, 0.001)]
+    assert recorder.trace(seconds=False)['time'][:2].tolist() == [1000000, 2000000]
+    assert not recorder.decimated
+
+    metrics = recorder.metrics()
+    assert metrics[['approach', 'comp']].tolist() == [('Selective', 100), ('Random', 10), ('NotAdaptive', 0)]
+    assert metrics['totaltime'][0] == pytest.approx(0.101)
+    assert np.isnan(metrics['tfft'][2])
+
+    dieft = diefpy.dieft(trace, 'Q1')
+    assert dieft[dieft['approach'] == 'NotAdaptive']['dieft'].tolist() == [0]
+    assert diefpy.performance_of_approaches_with_dieft(trace, metrics)['dieft'].tolist() == dieft['dieft'].tolist()
+
+
+def test_record_decimated(clock):
+    recorder = TraceRecorder(capacity=4, max_answers=64)
+    list(recorder.record(range(5000), 'Q1', 'Selective'))
+    exact = TraceRecorder()
+    list(exact.record(range(5000), 'Q1', 'Selective'))
+
+    assert recorder.decimated
+    assert len(recorder._recordings[0][2].times) == 64
+    sketch = recorder.trace()
+    assert len(sketch) <= 65
+    assert sketch['answer'][[0, -1]].tolist() == [1, 5000]
+    assert len(np.unique(np.diff(sketch['answer'][:-1]))) == 1
+
+    trace = exact.trace()
+    trace['time'] -= trace['time'][0] - sketch['time'][0]
+    for t in [-1, 2.5]:
+        approx = diefpy.dieft_approx(sketch, 'Q1', t)
+        assert abs(approx['dieft'][0] - diefpy.dieft(trace, 'Q1', t)['dieft'][0]) <= approx['error'][0] + 1e-9
+
+    with pytest.raises(ValueError):
+        TraceRecorder(max_answers=1)
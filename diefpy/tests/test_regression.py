@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from pkg_resources import resource_filename
+
+import diefpy.dief as diefpy
+from diefpy.cli import main
+from diefpy.regression import compare_datasets, find_regressions, format_regressions
+
+
+@pytest.fixture(scope="session")
+def traces():
+    input_file_traces = resource_filename('diefpy', 'data/traces.csv')
+    return diefpy.load_trace(input_file_traces)
+
+
+@pytest.fixture(scope="session")
+def metrics():
+    input_file_metrics = resource_filename('diefpy', 'data/metrics.csv')
+    return diefpy.load_metrics(input_file_metrics)
+
+
+@pytest.fixture(scope="session")
+def slower(traces, metrics):
+    # the approach Random is 50% slower in the candidate
+    candidate, candidate_metrics = traces.copy(), metrics.copy()
+    candidate['time'][candidate['approach'] == 'Random'] *= 1.5
+    candidate_metrics['totaltime'][candidate_metrics['approach'] == 'Random'] *= 1.5
+    return candidate, candidate_metrics
+
+
+def test_compare_same_datasets(traces, metrics):
+    comparison = compare_datasets(traces, traces, metrics, metrics)
+    assert len(comparison) == 6
+    # each approach is compared with itself, i.e., until its own execution time
+    for row in comparison:
+        subtrace = traces[traces['approach'] == row['approach']]
+        assert row['dieft_baseline'] == pytest.approx(diefpy.dieft(subtrace, row['test'])['dieft'][0])
+        assert row['diefk_baseline'] == pytest.approx(diefpy.diefk(subtrace, row['test'])['diefk'][0])
+    for m in ('dieft', 'diefk', 'tfft', 'totaltime', 'comp'):
+        assert (comparison[m + '_change'] == 0).all()
+    assert len(find_regressions(comparison)) == 0
+    assert format_regressions(find_regressions(comparison)) == 'No regressions found.'
+
+
+def test_find_regressions(traces, metrics, slower):
+    comparison = compare_datasets(traces, slower[0], metrics, slower[1])
+    regressions = find_regressions(comparison)
+    assert set(regressions['approach']) == {'Random'}
+    assert regressions[['test', 'metric']].tolist() == [('Q14.rq', 'dieft'), ('Q14.rq', 'diefk'), ('Q14.rq', 'totaltime'),
+                                                        ('Q9.rq', 'dieft'), ('Q9.rq', 'diefk'), ('Q9.rq', 'totaltime')]
+    assert regressions[regressions['metric'] != 'dieft']['change'] == pytest.approx(0.5)
+
+    # thresholds
+    assert len(find_regressions(comparison, {'diefk': 0.6, 'totaltime': None})) == 2
+    assert len(find_regressions(comparison, {'dieft': 0.3, 'diefk': 0.6, 'totaltime': None})) == 1
+
+    report = format_regressions(regressions).splitlines()
+    assert report[0] == '6 regressions found:'
+    assert report[3].split() == ['Q14.rq', 'Random', 'totaltime', '184.766', '->', '277.149', '(+50.0%)']
+
+
+def test_compare_missing_approach(traces, slower):
+    candidate = diefpy.compress_trace(slower[0][slower[0]['approach'] != 'Selective'])
+    comparison = compare_datasets(traces, candidate)
+    assert comparison.dtype.names[-1] == 'diefk_change'
+    assert np.isnan(comparison[comparison['approach'] == 'Selective']['dieft_candidate']).all()
+    regressions = find_regressions(comparison)
+    assert len(regressions[regressions['approach'] == 'Selective']) == 4
+    assert '(missing)' in format_regressions(regressions)
+
+
+def test_cli_compare(traces, metrics, slower, tmp_path, capsys):
+    files = {}
+    for name, df, save in [('baseline', traces, diefpy.save_trace), ('candidate', slower[0], diefpy.save_trace),
+                           ('baseline_metrics', metrics, diefpy.save_metrics),
+                           ('candidate_metrics', slower[1], diefpy.save_metrics)]:
+        files[name] = str(tmp_path / (name + '.csv'))
+        save(df, files[name])
+
+    assert main(['compare', files['baseline'], files['baseline']]) == 0
+    assert capsys.readouterr().out == 'No regressions found.\n'
+
+    args = ['compare', files['baseline'], files['candidate'],
+            '--baseline-metrics', files['baseline_metrics'], '--candidate-metrics', files['candidate_metrics']]
+    assert main(args) == 1
+    assert capsys.readouterr().out.startswith('6 regressions found:')
+    assert main(args + ['--threshold', 'dieft=none', '--threshold', 'diefk=0.6', '--threshold', 'totaltime=0.6']) == 0
+
+    with pytest.raises(SystemExit):
+        main(args + ['--threshold', 'throughput=0.1'])
+    assert main(args[:5]) == 2
@@ -0,0 +1,53 @@
+import os
+
+import pytest
+from pkg_resources import resource_filename
+
+import diefpy.dief as diefpy
+from diefpy.report import build_report
+
+
+@pytest.fixture(scope="session")
+def traces():
+    input_file_traces = resource_filename('diefpy', 'data/traces.csv')
+    return diefpy.load_trace(input_file_traces)
+
+
+@pytest.fixture(scope="session")
+def metrics():
+    input_file_metrics = resource_filename('diefpy', 'data/metrics.csv')
+    return diefpy.load_metrics(input_file_metrics)
+
+
+def test_build_report(tmp_path, traces, metrics):
+    outdir = str(tmp_path)
+    index = build_report(traces, metrics, outdir, fmt='svg')
+    assert index == os.path.join(outdir, 'index.html')
+    for table in ['metrics.csv', 'dieft.csv', 'diefk.csv']:
+        assert os.path.exists(os.path.join(outdir, table))
+    figures = os.listdir(os.path.join(outdir, 'figures'))
+    # execution time plus answer trace and two radar plots per test
+    assert len(figures) == 1 + 3 * 2
+    with open(index, encoding='utf8') as f:
+        page = f.read()
+    assert all('figures/' + name in page for name in figures)
+    assert 'dieft' in diefpy._read_csv(os.path.join(outdir, 'dieft.csv')).dtype.names
+
+
+def test_build_report_reuses_outputs(tmp_path, traces, metrics):
+    outdir = str(tmp_path)
+    build_report(traces, metrics, outdir, fmt='svg')
+    mtimes = {name: os.stat(os.path.join(outdir, 'figures', name)).st_mtime_ns
+              for name in os.listdir(os.path.join(outdir, 'figures'))}
+    table = os.stat(os.path.join(outdir, 'dieft.csv')).st_mtime_ns
+
+    # only the figures of the changed test are regenerated; the outdated ones are removed
+    changed = traces.copy()
+    changed['time'][changed['test'] == 'Q9.rq'] *= 2
+    build_report(changed, metrics, outdir, fmt='svg')
+    figures = os.listdir(os.path.join(outdir, 'figures'))
+    unchanged = [name for name in mtimes if name in figures]
+    assert len(unchanged) == len(mtimes) - 3
+    assert len(figures) == len(mtimes)
+    assert all(os.stat(os.path.join(outdir, 'figures', name)).st_mtime_ns == mtimes[name] for name in unchanged)
+    assert os.stat(os.path.join(outdir, 'dieft.csv')).st_mtime_ns != table
@@ -0,0 +1,131 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+from pkg_resources import resource_filename
+
+import diefpy.dief as diefpy
+import diefpy.service
+from diefpy.service import DiefService, make_server
+
+
+@pytest.fixture(scope="module")
+def service():
+    service = DiefService()
+    service.load('example', resource_filename('diefpy', 'data/traces.csv'),
+                 resource_filename('diefpy', 'data/metrics.csv'))
+    return service
+
+
+def request_json(service, url):
+    status, content_type, body = service.request(url)
+    assert content_type == 'application/json'
+    return status, json.loads(body.decode('utf8'))
+
+
+def test_requests(service):
+    traces = diefpy.load_trace(resource_filename('diefpy', 'data/traces.csv'))
+    assert request_json(service, '/datasets') == (200, ['example'])
+    status, tests = request_json(service, '/example/tests')
+    assert tests['tests'] == ['Q14.rq', 'Q9.rq']
+
+    status, values = request_json(service, '/example/dieft?test=Q9.rq&t=7.5')
+    assert status == 200
+    assert [v['dieft'] for v in values] == diefpy.dieft(traces, 'Q9.rq', 7.5)['dieft'].tolist()
+    status, values = request_json(service, '/example/diefk?test=Q9.rq&kp=0.5')
+    assert [v['diefk'] for v in values] == diefpy.diefk2(traces, 'Q9.rq', 0.5)['diefk'].tolist()
+    status, values = request_json(service, '/example/metrics?test=Q14.rq')
+    assert len(values) == 3 and all(v['test'] == 'Q14.rq' for v in values)
+
+    for plot in ['answer_trace', 'dieft', 'diefk']:
+        status, content_type, body = service.request('/example/plot/%s.svg?test=Q9.rq' % plot)
+        assert (status, content_type) == (200, 'image/svg+xml')
+        assert body.startswith(b'<svg')
+
+
+def test_errors(service):
+    assert request_json(service, '/unknown/tests')[0] == 404
+    assert request_json(service, '/example/dieft?test=Q1')[0] == 404
+    assert request_json(service, '/example/dieft')[0] == 400
+    assert request_json(service, '/example/dieft?test=Q9.rq&t=abc')[0] == 400
+
+
+def test_empty_dataset():
+    service = DiefService()
+    traces = diefpy.load_trace(resource_filename('diefpy', 'data/traces.csv'))
+    metrics = diefpy.load_metrics(resource_filename('diefpy', 'data/metrics.csv'))
+    service.load('empty', traces[:0], metrics[:0])
+    status, content_type, body = service.request('/empty/plot/execution_time.svg')
+    assert (status, content_type) == (200, 'image/svg+xml')
+
+
+def test_internal_error(service, monkeypatch):
+    def fail(*args):
+        raise RuntimeError('out of memory')
+    monkeypatch.setattr(diefpy.service, 'diefk2', fail)
+    assert request_json(service, '/example/diefk?test=Q9.rq&kp=0.25') == (500, {'error': 'internal error: out of memory'})
+
+
+def test_missing_values():
+    # an approach without answers has no time for the first answer
+    traces = diefpy.load_trace(resource_filename('diefpy', 'data/traces.csv'))
+    metrics = diefpy.load_metrics(resource_filename('diefpy', 'data/metrics.csv'))
+    metrics['tfft'][0] = float('nan')
+    service = DiefService()
+    service.load('example', traces, metrics)
+    status, content_type, body = service.request('/example/metrics')
+    assert status == 200
+    assert b'NaN' not in body
+    values = json.loads(body.decode('utf8'))
+    missing = [v for v in values if v['tfft'] is None]
+    assert [(v['test'], v['approach']) for v in missing] == [(metrics['test'][0], metrics['approach'][0])]
+    assert missing[0]['invtfft'] is None
+
+
+def test_experiments_computed_once(monkeypatch):
+    calls = []
+
+    def performance(traces, metrics):
+        calls.append(threading.get_ident())
+        time.sleep(0.05)
+        return diefpy.performance_of_approaches_with_dieft(traces, metrics)
+    monkeypatch.setattr(diefpy.service, 'performance_of_approaches_with_dieft', performance)
+    service = DiefService()
+    service.load('example', resource_filename('diefpy', 'data/traces.csv'),
+                 resource_filename('diefpy', 'data/metrics.csv'))
+    threads = [threading.Thread(target=service.request, args=('/example/metrics?test=%s' % test,))
+               for test in ['Q9.rq', 'Q14.rq'] * 4]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+
+
+def test_cache(service):
+    misses = service.misses
+    first = service.request('/example/diefk?test=Q14.rq')
+    hits = service.hits
+    assert service.request('/example/diefk?test=Q14.rq') is first
+    assert service.hits == hits + 1
+    assert service.misses == misses + 1
+
+
+def test_http_server(service):
+    server = make_server(service)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = 'http://%s:%d' % server.server_address
+        with urllib.request.urlopen(url + '/example/dieft?test=Q9.rq') as response:
+            assert response.headers['Content-Type'] == 'application/json'
+            assert len(json.loads(response.read().decode('utf8'))) == 3
+        with pytest.raises(urllib.error.HTTPError) as e:
+            urllib.request.urlopen(url + '/missing')
+        assert e.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from pkg_resources import resource_filename
+
+import diefpy.dief as diefpy
+import diefpy.store
+from diefpy.store import ResultStore, content_hash
+
+
+@pytest.fixture(scope="session")
+def traces():
+    input_file_traces = resource_filename('diefpy', 'data/traces.csv')
+    return diefpy.load_trace(input_file_traces)
+
+
+@pytest.fixture(scope="session")
+def metrics():
+    input_file_metrics = resource_filename('diefpy', 'data/metrics.csv')
+    return diefpy.load_metrics(input_file_metrics)
+
+
+def test_content_hash():
+    a = np.arange(5)
+    assert content_hash(a, t=1.0) == content_hash(np.arange(5), t=1.0)
+    assert content_hash(a, t=1.0) != content_hash(a, t=2.0)
+    assert content_hash(a) != content_hash(a.astype(float))
+
+
+def test_store_reuses_results(tmp_path, traces, metrics, monkeypatch):
+    expected_dieft = diefpy.performance_of_approaches_with_dieft(traces, metrics)
+    expected_diefk = diefpy.continuous_efficiency_with_diefk(traces)
+
+    with ResultStore(str(tmp_path)) as store:
+        actual = diefpy.performance_of_approaches_with_dieft(traces, metrics, store=store)
+        assert np.allclose(actual['dieft'], expected_dieft['dieft'])
+        actual = diefpy.continuous_efficiency_with_diefk(traces, store=store)
+        for field in ['diefk25', 'diefk50', 'diefk75', 'diefk100']:
+            assert np.allclose(actual[field], expected_diefk[field])
+        assert store.hits == 0
+
+    def fail(*args, **kwargs):
+        raise AssertionError('unchanged results must not be recomputed')
+    monkeypatch.setattr(diefpy.store, 'dieft', fail)
+    monkeypatch.setattr(diefpy.store, 'diefk', fail)
+
+    store = ResultStore(str(tmp_path))
+    actual = diefpy.performance_of_approaches_with_dieft(traces, metrics, store=store)
+    assert np.allclose(actual['dieft'], expected_dieft['dieft'])
+    actual = diefpy.continuous_efficiency_with_diefk(traces, store=store)
+    assert np.allclose(actual['diefk100'], expected_diefk['diefk100'])
+    assert store.misses == 0
+
+
+def test_store_recomputes_changed_traces(tmp_path, traces):
+    store = ResultStore(str(tmp_path))
+    store.dieft(traces, 'Q14.rq')
+    assert store.misses == 3
+
+    changed = traces.copy()
+    changed['time'][(changed['test'] == 'Q14.rq') & (changed['approach'] == 'Random')] *= 0.5
+    store.hits = store.misses = 0
+    # dief@t is computed until the slowest approach finishes, which remains the same.
+    actual = store.dieft(changed, 'Q14.rq')
+    assert (store.hits, store.misses) == (2, 1)
+    expected = diefpy.dieft(changed, 'Q14.rq')
+    assert np.allclose(actual['dieft'], expected['dieft'])
+
+
+def test_store_figure(tmp_path, traces):
+    store = ResultStore(str(tmp_path))
+    subtrace = traces[traces['test'] == 'Q14.rq']
+    key = content_hash(subtrace)
+    path = store.figure(key, lambda: diefpy.plot_answer_trace(subtrace, 'Q14.rq'))
+    assert store.figure(key, lambda: pytest.fail('figure must be reused')) == path
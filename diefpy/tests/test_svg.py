@@ -0,0 +1,66 @@
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+
+import pytest
+from pkg_resources import resource_filename
+
+import diefpy.dief as diefpy
+from diefpy.svg import (html_page, svg_answer_trace, svg_continuous_efficiency_with_diefk, svg_execution_time,
+                        svg_performance_of_approaches_with_dieft)
+
+SVG = '{http://www.w3.org/2000/svg}'
+
+
+@pytest.fixture(scope="session")
+def traces():
+    input_file_traces = resource_filename('diefpy', 'data/traces.csv')
+    return diefpy.load_trace(input_file_traces)
+
+
+@pytest.fixture(scope="session")
+def metrics():
+    input_file_metrics = resource_filename('diefpy', 'data/metrics.csv')
+    return diefpy.load_metrics(input_file_metrics)
+
+
+def test_svg_answer_trace(traces):
+    root = ET.fromstring(svg_answer_trace(traces, 'Q9.rq'))
+    assert root.tag == SVG + 'svg'
+    # one path of answers per approach
+    assert len(root.findall(SVG + 'path')) == 3
+    assert 'Q9.rq' in [t.text for t in root.iter(SVG + 'text')]
+
+
+@pytest.mark.parametrize('log_scale', [False, True])
+def test_svg_execution_time(metrics, log_scale):
+    root = ET.fromstring(svg_execution_time(metrics, log_scale=log_scale))
+    bars = [r for r in root.findall(SVG + 'rect') if r.get('fill') != 'none' and r.get('height') not in ('100%', '12')]
+    assert len(bars) == len(metrics)
+    assert all(float(r.get('height')) >= 0 for r in bars)
+
+    # without metrics, an empty chart is rendered
+    root = ET.fromstring(svg_execution_time(metrics[:0], log_scale=log_scale))
+    assert [r for r in root.findall(SVG + 'rect') if r.get('fill') not in ('none', 'white')] == []
+
+
+def test_svg_radar(traces, metrics):
+    exp1 = diefpy.performance_of_approaches_with_dieft(traces, metrics)
+    root = ET.fromstring(svg_performance_of_approaches_with_dieft(exp1, 'Q9.rq'))
+    assert len([p for p in root.findall(SVG + 'polygon') if p.get('fill-opacity')]) == 3
+    exp2 = diefpy.continuous_efficiency_with_diefk(traces)
+    root = ET.fromstring(svg_continuous_efficiency_with_diefk(exp2, 'Q9.rq'))
+    assert 'k=100%' in [t.text for t in root.iter(SVG + 'text')]
+
+
+def test_html_page(metrics):
+    page = html_page([svg_execution_time(metrics)], title='A & B')
+    assert page.startswith('<!DOCTYPE html>')
+    assert '<title>A &amp; B</title>' in page
+    assert page.count('<svg') == 1
+
+
+def test_svg_without_matplotlib():
+    # the SVG charts do not import matplotlib, e.g., in a headless service
+    code = "import sys, diefpy.svg; assert 'matplotlib' not in sys.modules, sorted(sys.modules)"
+    subprocess.run([sys.executable, '-c', code], check=True)
@@ -21,7 +21,8 @@ setup(name='diefpy',
       long_description=long_description,
       long_description_content_type="text/markdown",
       keywords='metrics benchmarking efficiency diefficiency-metrics dief python',
-      install_requires=['matplotlib>=3.2.2', 'numpy>=1.8.0'],
+      install_requires=['matplotlib>=3.2.2', 'numpy>=1.15.0'],
+      extras_require={'numba': ['numba>=0.50.0']},
       include_package_data=True,
       package_data={'dief': ['data/*']},
       python_requires='>=3.7',